@@ -0,0 +1,7 @@
+"""Microbenchmarks for evelink.
+
+Run them from the repository root, e.g.::
+
+    python -m benchmarks.auto_call
+
+"""
@@ -0,0 +1,145 @@
+"""Per-call overhead of auto_call decorated methods.
+
+Compares the precompiled call plan with the previous per-call argument
+mapping (get_args_and_defaults/map_func_args/translate_args), and the
+memoized cache key with the previous one, on its own and within a cache
+hit of Char.wallet_info().
+
+    python -m benchmarks.auto_call [--number N]
+"""
+from __future__ import print_function
+
+import argparse
+import functools
+import hashlib
+
+from evelink import api
+from evelink import char
+
+from benchmarks.timing import bench
+
+
+WALLET_INFO = b"""<?xml version='1.0' encoding='UTF-8'?>
+<eveapi version="2">
+    <currentTime>2009-10-18 17:05:31</currentTime>
+    <result>
+        <rowset name="accounts" key="accountID" columns="accountID,accountKey,balance">
+            <row accountID="1" accountKey="1000" balance="209127923.31" />
+        </rowset>
+    </result>
+    <cachedUntil>2009-10-18 17:20:31</cachedUntil>
+</eveapi>
+"""
+
+
+def legacy_auto_call(path, prop_to_param=(), map_params=None):
+    """auto_call as it was before call plans: arguments are mapped on
+    every call."""
+    map_params = map_params or {}
+
+    def decorator(method):
+        args, defaults = api.get_args_and_defaults(method)
+        args = args[1:]
+        args.remove('api_result')
+        defaults.pop('api_result')
+
+        @functools.wraps(method)
+        def wrapper(client, *a, **kw):
+            if 'api_result' in kw:
+                return method(client, *a, **kw)
+            args_map = api.map_func_args(a, kw, args, defaults)
+            for attr_name in prop_to_param:
+                args_map[attr_name] = getattr(client, attr_name, None)
+            params = api.translate_args(args_map, map_params)
+            params = dict((k, v) for k, v in params.items() if v is not None)
+            kw['api_result'] = client.api.get(path, params=params)
+            return method(client, *a, **kw)
+        return wrapper
+    return decorator
+
+
+def legacy_cache_key(path, params):
+    """API._cache_key as it was before memoization."""
+    sorted_params = sorted(params.items())
+    return '%s-%s' % ('1', hashlib.sha1(str([path, sorted_params]).encode("utf-8")).hexdigest())
+
+
+class StubAPI(object):
+    """Returns the same result for every call, to isolate the wrapper."""
+
+    def __init__(self):
+        self.result = api.APIResult(None, 0, 0)
+
+    def get(self, path, params=None):
+        return self.result
+
+
+def _journal(self, before_id=None, limit=None, account=None, api_result=None):
+    return api_result
+
+_journal_map = {
+    'char_id': 'characterID', 'before_id': 'fromID',
+    'limit': 'rowCount', 'account': 'accountKey',
+}
+
+
+class PlanClient(object):
+    def __init__(self, api):
+        self.api = api
+        self.char_id = 1
+
+    journal = api.auto_call(
+        'char/WalletJournal', prop_to_param=('char_id',),
+        map_params=dict(_journal_map))(_journal)
+
+
+class LegacyClient(PlanClient):
+    journal = legacy_auto_call(
+        'char/WalletJournal', prop_to_param=('char_id',),
+        map_params=dict(_journal_map))(_journal)
+
+
+def cached_char():
+    """A Char whose wallet_info() is served from a primed cache."""
+    eve_api = api.API(api_key=(1, 'abc'), cache=api.APICache())
+    client = char.Char(1, eve_api)
+    params = eve_api._request_params('char/AccountBalance', {'characterID': 1})
+    key = eve_api._cache_key('char/AccountBalance', params)
+    eve_api.cache.put(key, WALLET_INFO, 10**9)
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000)
+    number = parser.parse_args().number
+
+    legacy = LegacyClient(StubAPI())
+    plan = PlanClient(StubAPI())
+
+    print('wrapper overhead (stub API):')
+    old = bench('  legacy, positional', lambda: legacy.journal(10, 50), number)
+    new = bench('  call plan, positional', lambda: plan.journal(10, 50), number)
+    print('  %.1fx faster' % (old / new))
+    old = bench('  legacy, keywords', lambda: legacy.journal(limit=50), number)
+    new = bench('  call plan, keywords', lambda: plan.journal(limit=50), number)
+    print('  %.1fx faster' % (old / new))
+
+    print('cache key (authenticated call):')
+    eve_api = api.API(api_key=(1, 'abc'))
+    params = eve_api._request_params(
+        'char/WalletJournal', {'characterID': 1, 'rowCount': 50})
+    old = bench('  legacy', lambda: legacy_cache_key('char/WalletJournal', params), number)
+    new = bench('  memoized', lambda: eve_api._cache_key('char/WalletJournal', params), number)
+    print('  %.1fx faster' % (old / new))
+
+    print('Char.wallet_info() cache hit:')
+    client = cached_char()
+    new = bench('  memoized cache key', client.wallet_info, number)
+    client.api._cache_key = legacy_cache_key
+    old = bench('  legacy cache key', client.wallet_info, number)
+    print('  %.1fx faster' % (old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark inputs: the tests/xml fixtures, and larger generated responses.
+
+The fixtures hold the <result> element of a response; document() wraps
+one into a complete EVE API response. The generators build responses of
+any size with the same shape as the fixtures.
+"""
+
+import copy
+import os
+from xml.etree import ElementTree
+
+XML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'tests', 'xml')
+
+_HEAD = (b"<?xml version='1.0' encoding='UTF-8'?>\n<eveapi version=\"2\">\n"
+         b"<currentTime>%s</currentTime>\n")
+_TAIL = b"\n<cachedUntil>%s</cachedUntil>\n</eveapi>\n"
+
+
+def fixture(path):
+    """The bytes of a tests/xml fixture."""
+    with open(os.path.join(XML_DIR, path), 'rb') as f:
+        return f.read()
+
+
+def document(result, current_time=b'2009-10-18 17:05:31',
+             cached_until=b'2009-10-18 18:05:31'):
+    """A complete response wrapping the bytes of a <result> element."""
+    return (_HEAD.replace(b'%s', current_time) + result.strip() +
+            _TAIL.replace(b'%s', cached_until))
+
+
+def load(path, rows):
+    """The result element of a fixture, with its rows repeated to 'rows'."""
+    result = ElementTree.fromstring(fixture(path))
+    rowset = result.find('rowset')
+    template = rowset.findall('row')
+    for row in template:
+        rowset.remove(row)
+    for i in range(rows):
+        rowset.append(copy.deepcopy(template[i % len(template)]))
+    return result
+
+
+def count_rows(data):
+    """The number of <row> elements in a response."""
+    return data.count(b'<row ')
+
+
+def _ts(i):
+    """A timestamp string, one minute apart for successive i."""
+    day, minute = divmod(i, 24 * 60)
+    return '2010-%02d-%02d %02d:%02d:00' % (
+        day // 28 % 12 + 1, day % 28 + 1, minute // 60, minute % 60)
+
+
+def _result(rowset, rows, key):
+    return ('<result>\n<rowset name="%s" key="%s">\n%s\n</rowset>\n</result>' % (
+        rowset, key, '\n'.join(rows))).encode('utf-8')
+
+
+def wallet_journal(rows):
+    """A WalletJournal response with 'rows' entries."""
+    template = ('<row date="%s" refID="%d" refTypeID="%d" ownerName1="Pilot %d"'
+                ' ownerID1="%d" ownerName2="Secure Commerce Commission"'
+                ' ownerID2="1000132" argName1="%d" argID1="0" amount="-%d.00"'
+                ' balance="%d.53" reason="" taxReceiverID="%s" taxAmount="%s"'
+                ' owner1TypeID="2" owner2TypeID="1378" />')
+    return document(_result('entries', [
+        template % (_ts(i), 3605306236 - i, i % 120, i % 500, 150337897 + i % 500,
+                    35402980 + i, 10000 + i % 977, 985580165 - i,
+                    '' if i % 3 else '1000132', '' if i % 3 else '%d.00' % (i % 50))
+        for i in range(rows)], 'refID'))
+
+
+def assets(items):
+    """An AssetList response with 'items' items, nested three deep.
+
+    Items come in groups of ten: a container at a location, holding
+    seven items and a second container, which holds one more item.
+    """
+    groups = []
+    for g in range(max(1, items // 10)):
+        base = 1007221285456 + g * 10
+        contents = ''.join(
+            '<row itemID="%d" typeID="34" quantity="%d" flag="42" singleton="0"/>'
+            % (base + i, 100 + i) for i in range(1, 8))
+        groups.append(
+            '<row itemID="%d" locationID="%d" typeID="16216" quantity="1" flag="0"'
+            ' singleton="1" rawQuantity="-1"><rowset name="contents" key="itemID">'
+            '%s<row itemID="%d" typeID="3467" quantity="1" flag="5" singleton="1"'
+            ' rawQuantity="-1"><rowset name="contents" key="itemID">'
+            '<row itemID="%d" typeID="819" quantity="1" flag="0" singleton="0"/>'
+            '</rowset></row></rowset></row>'
+            % (base, 60000000 + g % 5000, contents, base + 8, base + 9))
+    return document(_result('assets', groups, 'itemID'))
+
+
+def members(rows):
+    """An extended MemberTracking response with 'rows' members."""
+    template = ('<row characterID="%d" name="Member %d" startDateTime="%s"'
+                ' baseID="0" base="" title="Title %d" logonDateTime="%s"'
+                ' logoffDateTime="%s" locationID="%d"'
+                ' location="Bourynes VII - Moon 2 - University of Caille School"'
+                ' shipTypeID="%d" shipType="Velator" roles="%d" grantableRoles="0"/>')
+    return document(_result('members', [
+        template % (150336922 + i, i, _ts(i), i % 20, _ts(i + 7), _ts(i + 60),
+                    60011566 + i % 300, 606 + i % 50, i * 4096)
+        for i in range(rows)], 'characterID'))
+
+
+def kills(rows, attackers=50, items=20):
+    """A KillLog response with 'rows' kills.
+
+    Each has 'attackers' attackers and 'items' items, every fifth of
+    which is a container holding two more.
+    """
+    victim = ('<victim characterID="%d" characterName="Pilot %d"'
+              ' corporationID="1254875843" corporationName="Starbase Anchoring Corp"'
+              ' allianceID="1254074" allianceName="EVE Gurus" factionID="0"'
+              ' factionName="" damageTaken="%d" shipTypeID="670" x="1.4"'
+              ' y="-20.0" z="3000" />')
+    attacker = ('<row characterID="%d" characterName="Attacker %d"'
+                ' corporationID="224588600" corporationName="Inkblot Squad"'
+                ' allianceID="5514808" allianceName="Authorities of EVE"'
+                ' factionID="0" factionName="" securityStatus="-0.44128753"'
+                ' damageDone="%d" finalBlow="%d" weaponTypeID="2881"'
+                ' shipTypeID="17932" />')
+    item = '<row typeID="%d" flag="%d" qtyDropped="%d" qtyDestroyed="%d" singleton="0"%s'
+    nested = ('><rowset name="items">'
+              '<row typeID="819" flag="0" qtyDropped="0" qtyDestroyed="1" singleton="0"/>'
+              '<row typeID="4394" flag="0" qtyDropped="1" qtyDestroyed="0" singleton="0"/>'
+              '</rowset></row>')
+    result = []
+    for k in range(rows):
+        parts = ['<row killID="%d" solarSystemID="%d" killTime="%s" moonID="0">' % (
+            15640551 + k, 30001160 + k % 1000, _ts(k))]
+        parts.append(victim % (150080271 + k, k, 446 + k % 1000))
+        parts.append('<rowset name="attackers">')
+        parts.extend(attacker % (935091361 + k * attackers + a, a, 10 + a, a == 0)
+                     for a in range(attackers))
+        parts.append('</rowset><rowset name="items">')
+        parts.extend(item % (1319 + i, i % 100, i % 2, 1 - i % 2,
+                             nested if i % 5 == 4 else '/>')
+                     for i in range(items))
+        parts.append('</rowset></row>')
+        result.append(''.join(parts))
+    return document(_result('kills', result, 'killID'))
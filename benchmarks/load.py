@@ -0,0 +1,248 @@
+"""Load driver: API, Char and Corp calls against the stand-in server.
+
+For each combination of HTTP transport ('requests', if installed,
+'pool' and 'urllib', see TRANSPORT_CLASSES) and cache backend, a shared API is hammered by --threads
+threads for --duration seconds, each looping over CALLS for one of
+--characters characters (so that calls aren't all cached after the
+first). Reports the calls made per second and the percentiles of their
+latency, and how many failed (with HTTP or API errors).
+
+    python -m benchmarks.load [--threads 8] [--duration 5]
+        [--transport urllib] [--cache lru] [--url http://host:port]
+        [--rate-limit 30] [--output results.json] [stand-in server options]
+
+Unless --url is given, a stand-in server (see benchmarks.stand_in) is
+started in this process, with the given options, e.g. --latency 0.05
+--api-error-rate 0.01 --amplify 100.
+
+With --record FILE, the responses received (through the 'pool'
+transport) are appended to FILE; --replay FILE then serves them again
+without any server, as fast as they were received or --replay-speed
+times faster (0: at once), see evelink.transports. Calls that weren't
+recorded fail with HTTP 404 errors.
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from evelink import api
+from evelink import char
+from evelink import corp
+from evelink import ratelimit
+from evelink import transports
+from evelink.cache import lru
+from evelink.cache import sqlite
+from evelink.cache import tiered
+
+from benchmarks import stand_in
+from benchmarks import suite
+
+# (name, function of (API, character ID)) of the calls each thread makes.
+CALLS = [
+    ('API.server_status', lambda eve_api, char_id: eve_api.get('server/ServerStatus')),
+    ('API.character_name', lambda eve_api, char_id: eve_api.get(
+        'eve/CharacterName', {'IDs': [char_id]})),
+    ('Char.wallet_info', lambda eve_api, char_id: char.Char(char_id, eve_api).wallet_info()),
+    ('Char.wallet_journal', lambda eve_api, char_id: char.Char(char_id, eve_api).wallet_journal()),
+    ('Char.assets', lambda eve_api, char_id: char.Char(char_id, eve_api).assets()),
+    ('Char.orders', lambda eve_api, char_id: char.Char(char_id, eve_api).orders()),
+    ('Char.skill_queue', lambda eve_api, char_id: char.Char(char_id, eve_api).skill_queue()),
+    ('Corp.members', lambda eve_api, char_id: corp.Corp(eve_api).members()),
+    ('Corp.wallet_journal', lambda eve_api, char_id: corp.Corp(eve_api).wallet_journal()),
+    ('Corp.assets', lambda eve_api, char_id: corp.Corp(eve_api).assets()),
+    ('Corp.industry_jobs', lambda eve_api, char_id: corp.Corp(eve_api).industry_jobs()),
+]
+
+TRANSPORTS = ['requests', 'pool', 'urllib']
+TRANSPORT_CLASSES = {
+    'requests': api.RequestsTransport,
+    'pool': api.PooledTransport,
+    'urllib': api.UrllibTransport,
+}
+
+# Functions of a scratch directory returning a cache.
+CACHE_NAMES = ['none', 'memory', 'lru', 'sqlite', 'tiered']
+CACHES = {
+    'none': lambda tmp: suite.NullCache(),
+    'memory': lambda tmp: api.APICache(),
+    'lru': lambda tmp: lru.LRUCache(),
+    'sqlite': lambda tmp: sqlite.ConcurrentSqliteCache(os.path.join(tmp, 'sqlite.db')),
+    'tiered': lambda tmp: tiered.TieredCache(
+        sqlite.ConcurrentSqliteCache(os.path.join(tmp, 'tiered.db'))),
+}
+
+PERCENTILES = [50, 90, 99]
+
+
+def available_transports():
+    return [t for t in TRANSPORTS if t != 'requests' or api.requests is not None]
+
+
+def percentile(sorted_values, p):
+    """The nearest-rank p-th percentile of a sorted list."""
+    if not sorted_values:
+        return None
+    rank = int(math.ceil(p / 100.0 * len(sorted_values))) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+def run(base_url, transport, cache, threads, duration, characters,
+        rate_limiter=None):
+    """Drive an API for 'duration' seconds; return its statistics.
+
+    'transport' is one of TRANSPORTS, or an api.Transport instance.
+    """
+    own_transport = not isinstance(transport, api.Transport)
+    if own_transport:
+        transport = TRANSPORT_CLASSES[transport]()
+    eve_api = api.API(base_url=base_url, cache=cache, api_key=(1, 'abc'),
+                      transport=transport, rate_limiter=rate_limiter)
+    latencies = []
+    errors = collections.defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def work(worker):
+        own_latencies = []
+        own_errors = collections.defaultdict(int)
+        i = worker
+        while time.time() < deadline:
+            _, call = CALLS[i % len(CALLS)]
+            char_id = i // len(CALLS) % characters
+            i += threads
+            start = time.time()
+            try:
+                call(eve_api, char_id)
+            except Exception as e:
+                own_errors[type(e).__name__] += 1
+            own_latencies.append(time.time() - start)
+        with lock:
+            latencies.extend(own_latencies)
+            for name, count in own_errors.items():
+                errors[name] += count
+
+    try:
+        workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+        start = time.time()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.time() - start
+    finally:
+        if own_transport:
+            transport.close()
+
+    latencies.sort()
+    stats = {
+        'calls': len(latencies),
+        'calls_per_second': len(latencies) / elapsed,
+        'errors': dict(errors),
+        'max_ms': latencies[-1] * 1000 if latencies else None,
+    }
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        stats['p%d_ms' % p] = value * 1000 if value is not None else None
+    return stats
+
+
+def _ms(value):
+    return '%.2f' % value if value is not None else '-'
+
+
+def report(results):
+    print('%-10s %-8s %8s %9s %8s %8s %8s %8s %7s' % (
+        'transport', 'cache', 'calls', 'calls/s', 'p50 ms', 'p90 ms', 'p99 ms',
+        'max ms', 'errors'))
+    for (transport, cache), stats in results:
+        print('%-10s %-8s %8d %9.1f %8s %8s %8s %8s %7d' % (
+            transport, cache, stats['calls'], stats['calls_per_second'],
+            _ms(stats['p50_ms']), _ms(stats['p90_ms']), _ms(stats['p99_ms']),
+            _ms(stats['max_ms']), sum(stats['errors'].values())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--url', help='base URL of a running stand-in server')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5,
+                        help='seconds to run each transport and cache for')
+    parser.add_argument('--characters', type=int, default=100,
+                        help='number of characters to make calls for')
+    parser.add_argument('--transport', action='append', choices=TRANSPORTS,
+                        help='only use this transport (repeatable)')
+    parser.add_argument('--cache', action='append', choices=CACHE_NAMES,
+                        help='only use this cache (repeatable)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--rate-limit', type=float, metavar='RATE',
+                        help='pace requests with an evelink.ratelimit.Limiter '
+                             'allowing RATE requests per second')
+    parser.add_argument('--record', metavar='FILE',
+                        help='append the responses received to FILE')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='serve the responses recorded in FILE instead of a server')
+    parser.add_argument('--replay-speed', type=float, default=1,
+                        help='replay responses this many times faster (0: at once)')
+    stand_in.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    # (name, transport) pairs, see run().
+    if args.replay:
+        transports_used = [('replay', transports.ReplayTransport(
+            args.replay, speed=args.replay_speed or None))]
+    elif args.record:
+        transports_used = [('record', transports.RecordingTransport(args.record))]
+    else:
+        transports_used = [(t, t) for t in available_transports()
+                           if not args.transport or t in args.transport]
+    caches = [c for c in CACHE_NAMES if not args.cache or c in args.cache]
+
+    server = None
+    base_url = args.url
+    if base_url is None and args.replay:
+        base_url = 'http://replay'
+    elif base_url is None:
+        server = stand_in.StandInServer(**stand_in.server_options(args)).start()
+        base_url = server.base_url
+    tmp = tempfile.mkdtemp()
+    results = []
+    try:
+        for label, transport in transports_used:
+            for name in caches:
+                cache = CACHES[name](tmp)
+                try:
+                    limiter = None
+                    if args.rate_limit:
+                        limiter = ratelimit.Limiter(host_rate=args.rate_limit)
+                    stats = run(base_url, transport, cache, args.threads,
+                                args.duration, args.characters, limiter)
+                finally:
+                    for c in (cache, getattr(cache, 'l2', None)):
+                        if hasattr(c, 'close'):
+                            c.close()
+                results.append(((label, name), stats))
+    finally:
+        shutil.rmtree(tmp)
+        if server is not None:
+            server.stop()
+
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'options': vars(args),
+                'results': [dict(stats, transport=t, cache=c)
+                            for (t, c), stats in results],
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
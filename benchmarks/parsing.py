@@ -0,0 +1,146 @@
+"""Row decoding: hand-written parsers vs. schema decoders.
+
+Parses the tests/xml fixtures, with their rows repeated to make the
+responses larger, using the parsers as they were written before
+evelink.parsing.schema and the current schema based ones, and times a
+projected decode of a few fields. The schemas' compiled decoders are
+also compared with decoders interpreting the same fields at each row.
+
+    python -m benchmarks.parsing [--rows N] [--number N]
+"""
+from __future__ import print_function
+
+import argparse
+
+from evelink import api
+from evelink import constants
+from evelink.parsing import orders
+from evelink.parsing import schema
+from evelink.parsing import wallet_transactions
+
+from benchmarks.fixtures import load
+from benchmarks.timing import bench
+
+
+def legacy_parse_market_orders(api_result):
+    rowset = api_result.find('rowset')
+    rows = rowset.findall('row')
+    result = {}
+    for row in rows:
+        a = row.attrib
+        id = int(a['orderID'])
+        result[id] = {
+            'id': id,
+            'char_id': int(a['charID']),
+            'station_id': int(a['stationID']),
+            'amount': int(a['volEntered']),
+            'amount_left': int(a['volRemaining']),
+            'status': constants.Market().order_status[int(a['orderState'])],
+            'type_id': int(a['typeID']),
+            'range': int(a['range']),
+            'account_key': int(a['accountKey']),
+            'duration': int(a['duration']),
+            'escrow': float(a['escrow']),
+            'price': float(a['price']),
+            'type': 'buy' if a['bid'] == '1' else 'sell',
+            'timestamp': api.parse_ts(a['issued']),
+        }
+    return result
+
+
+def legacy_parse_wallet_transactions(api_result):
+    rowset = api_result.find('rowset')
+    result = []
+    for row in rowset.findall('row'):
+        a = row.attrib
+        entry = {
+            'timestamp': api.parse_ts(a['transactionDateTime']),
+            'id': int(a['transactionID']),
+            'journal_id': int(a['journalTransactionID']),
+            'quantity': int(a['quantity']),
+            'type': {
+                'id': int(a['typeID']),
+                'name': a['typeName'],
+            },
+            'price': float(a['price']),
+            'client': {
+                'id': int(a['clientID']),
+                'name': a['clientName'],
+            },
+            'station': {
+                'id': int(a['stationID']),
+                'name': a['stationName'],
+            },
+            'action': a['transactionType'],
+            'for': a['transactionFor'],
+        }
+        if 'characterID' in a:
+            entry['char'] = {
+                'id': int(a['characterID']),
+                'name': a['characterName'],
+            }
+        result.append(entry)
+    return result
+
+
+def interpreted_decoder(fields):
+    """A decoder walking the schema's fields for every row, rather than
+    compiling them into a function."""
+    def value(field, a):
+        if isinstance(field, schema.Group):
+            return decode_fields(field.fields, a)
+        if isinstance(field, schema.Computed):
+            return field.func(a)
+        if field.default is schema._REQUIRED:
+            v = a[field.attr]
+        else:
+            v = a.get(field.attr) or field.default
+        return v if field.convert is None else field.convert(v)
+
+    def decode_fields(fields, a):
+        return dict((f.key, value(f, a)) for f in fields
+                    if f.condition is None or f.condition in a)
+
+    return lambda row: decode_fields(fields, row.attrib)
+
+
+CASES = [
+    ('orders', 'char/orders.xml', legacy_parse_market_orders,
+     orders.parse_market_orders, orders._schema, ['id', 'price']),
+    ('wallet transactions', 'char/wallet_transactions.xml',
+     legacy_parse_wallet_transactions,
+     wallet_transactions.parse_wallet_transactions,
+     wallet_transactions._schema, ['id', 'type.id']),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    for name, path, legacy, parse, row_schema, fields in CASES:
+        result = load(path, args.rows)
+        assert legacy(result) == parse(result)
+        print('%s (%d rows):' % (name, args.rows))
+        old = bench('  hand-written', lambda: legacy(result), args.number, unit='msec')
+        new = bench('  schema', lambda: parse(result), args.number, unit='msec')
+        print('  %.1fx faster' % (old / new))
+        new = bench('  schema, fields=%s' % ','.join(fields),
+                    lambda: parse(result, fields), args.number, unit='msec')
+        print('  %.1fx faster' % (old / new))
+
+        rows = result.find('rowset').findall('row')
+        compiled = row_schema.decoder()
+        interpreted = interpreted_decoder(row_schema.fields)
+        assert [compiled(r) for r in rows] == [interpreted(r) for r in rows]
+        old = bench('  interpreted decoder',
+                    lambda: [interpreted(r) for r in rows], args.number, unit='msec')
+        new = bench('  compiled decoder',
+                    lambda: [compiled(r) for r in rows], args.number, unit='msec')
+        print('  %.1fx faster' % (old / new))
+
+
+if __name__ == '__main__':
+    main()
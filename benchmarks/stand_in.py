@@ -0,0 +1,320 @@
+"""A local stand-in for the EVE API, serving the tests/xml fixtures.
+
+Each path the Account, Char, Corp, EVE, Map and Server methods call,
+e.g. /char/WalletJournal.xml.aspx, is answered with the fixture the
+benchmark suite uses for that method, wrapped in a response whose
+currentTime is the time of the request and whose cachedUntil stays
+the same for repeated calls (with the same parameters) until it has
+passed, like the EVE API's.
+
+Responses can be made slower (latency, jitter), flaky (a share of
+HTTP 5xx responses, or of API errors with a given code), gzip encoded
+(for clients sending Accept-Encoding: gzip) and larger (the rows of
+each top level rowset repeated 'amplify' times, with distinct keys).
+
+    python -m benchmarks.stand_in [--port 8080] [--latency 0.1] ...
+
+serves until interrupted; point an API at it with
+API(base_url='http://127.0.0.1:8080'). From Python:
+
+    with StandInServer(latency=0.05) as server:
+        eve_api = api.API(base_url=server.base_url)
+"""
+from __future__ import print_function
+
+import argparse
+import copy
+import random
+import threading
+import time
+import zlib
+from xml.etree import ElementTree
+
+from evelink.thirdparty.six.moves import BaseHTTPServer
+from evelink.thirdparty.six.moves import socketserver
+from evelink.thirdparty.six.moves import urllib
+
+from benchmarks import fixtures
+from benchmarks import suite
+
+# Fixtures of paths that no wrapped method calls directly.
+PATH_FIXTURES = {
+    'corp/MemberTracking': 'corp/members.xml',
+}
+
+# How long responses are cached for, in seconds, by path (roughly the
+# EVE API's); other paths are cached for DEFAULT_CACHE_TIME.
+CACHE_TIMES = {
+    'char/AccountBalance': 900,
+    'char/AssetList': 21600,
+    'char/KillMails': 1800,
+    'char/MarketOrders': 3600,
+    'char/SkillQueue': 900,
+    'char/WalletJournal': 1800,
+    'char/WalletTransactions': 1800,
+    'corp/AccountBalance': 900,
+    'corp/AssetList': 21600,
+    'corp/MemberTracking': 21600,
+    'corp/WalletJournal': 1800,
+    'corp/WalletTransactions': 1800,
+    'eve/CharacterName': 2592000,
+    'server/ServerStatus': 180,
+}
+DEFAULT_CACHE_TIME = 3600
+
+# (HTTP status, message) of the API errors that can be injected.
+API_ERRORS = {
+    106: (400, 'Must provide userID or keyID parameter for authentication.'),
+    203: (403, 'Authentication failure.'),
+    221: (403, 'Illegal page request! Please verify the access granted by the key you are using!'),
+    222: (403, 'Key has expired. Contact key owner for access renewal.'),
+    520: (500, 'Unexpected failure accessing database.'),
+    901: (503, 'Web site database temporarily disabled.'),
+    904: (503, 'Your IP address has been temporarily blocked because it is causing too many errors.'),
+}
+
+HTTP_ERRORS = [500, 502, 503]
+
+# Offset added to the key attribute of each copy of an amplified row.
+_KEY_STRIDE = 10 ** 13
+
+
+def path_fixtures():
+    """A dict of the fixture paths of each API path."""
+    paths = dict(PATH_FIXTURES)
+    for name, cls, attr in suite.request_methods():
+        specs = getattr(getattr(cls, attr), '_request_specs', None)
+        if specs is not None:
+            paths.setdefault(specs['path'], suite.method_fixture(name, cls))
+    return paths
+
+
+def amplify(data, factor):
+    """The bytes of a fixture with each top level rowset's rows repeated."""
+    result = ElementTree.fromstring(data)
+    for rowset in result.findall('rowset'):
+        key = rowset.get('key')
+        rows = rowset.findall('row')
+        for copy_number in range(1, factor):
+            for row in rows:
+                row = copy.deepcopy(row)
+                value = row.get(key) if key else None
+                if value is not None and value.isdigit():
+                    row.set(key, str(int(value) + copy_number * _KEY_STRIDE))
+                rowset.append(row)
+    return ElementTree.tostring(result, encoding='utf-8')
+
+
+def _ts(t):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(t)).encode('ascii')
+
+
+def gzip_encode(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, keep-alive
+    # clients wait for delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._respond(urllib.parse.urlsplit(self.path).query)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self._respond(self.rfile.read(length).decode('utf-8'))
+
+    def _respond(self, query):
+        path = urllib.parse.urlsplit(self.path).path
+        params = urllib.parse.parse_qsl(query)
+        gzip = 'gzip' in (self.headers.get('Accept-Encoding') or '')
+        status, headers, body = self.server.respond(path, params, gzip)
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class StandInServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """A threaded HTTP server answering EVE API requests with fixtures.
+
+    'latency' seconds (plus up to 'jitter' more) are waited before
+    each response. 'http_error_rate' and 'api_error_rate' are the
+    shares of requests answered with a 5xx error page and with the API
+    error 'api_error_code' (see API_ERRORS). 'cached_for' overrides
+    CACHE_TIMES. Port 0 picks a free port; see base_url.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, jitter=0,
+                 http_error_rate=0, api_error_rate=0, api_error_code=904,
+                 gzip=True, amplify=1, cached_for=None, seed=None,
+                 verbose=False):
+        if api_error_code not in API_ERRORS:
+            raise ValueError("Unknown API error code: %r" % api_error_code)
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.http_error_rate = http_error_rate
+        self.api_error_rate = api_error_rate
+        self.api_error_code = api_error_code
+        self.gzip = gzip
+        self.amplify = amplify
+        self.cached_for = cached_for
+        self.verbose = verbose
+        self.requests_served = 0
+        self._random = random.Random(seed)
+        self.fixtures = path_fixtures()
+        self._bodies = {}
+        self._expiries = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return 'http://%s:%d' % self.server_address[:2]
+
+    def start(self):
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def respond(self, path, params, gzip):
+        """The (status, headers, body) of the response to a request."""
+        with self._lock:
+            self.requests_served += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            http_error = self._random.random() < self.http_error_rate
+            api_error = self._random.random() < self.api_error_rate
+        if delay:
+            time.sleep(delay)
+
+        headers = [('Content-Type', 'text/html; charset=utf-8')]
+        if http_error:
+            status = self._random.choice(HTTP_ERRORS)
+            body = ('<html><body><h1>%d %s</h1></body></html>' % (
+                status, _Handler.responses[status][0])).encode('utf-8')
+            return status, headers, body
+
+        api_path = path.strip('/')
+        if api_path.endswith('.xml.aspx'):
+            api_path = api_path[:-len('.xml.aspx')]
+        result = self._result(api_path)
+        if result is None:
+            return 404, headers, b'<html><body><h1>404 Not Found</h1></body></html>'
+
+        now = time.time()
+        expires = self._expiry(api_path, params, now)
+        status = 200
+        if api_error:
+            status, message = API_ERRORS[self.api_error_code]
+            result = ('<error code="%d">%s</error>' % (
+                self.api_error_code, message)).encode('utf-8')
+        body = fixtures.document(result, _ts(now), _ts(expires))
+
+        headers = [('Content-Type', 'application/xml; charset=utf-8')]
+        if self.gzip and gzip:
+            body = gzip_encode(body)
+            headers.append(('Content-Encoding', 'gzip'))
+        return status, headers, body
+
+    def _result(self, api_path):
+        """The (amplified) bytes of the fixture of a path, or None."""
+        body = self._bodies.get(api_path)
+        if body is None and api_path in self.fixtures:
+            body = fixtures.fixture(self.fixtures[api_path])
+            if self.amplify > 1:
+                body = amplify(body, self.amplify)
+            self._bodies[api_path] = body
+        return body
+
+    def _expiry(self, api_path, params, now):
+        """The cachedUntil time of a call: the same until it has passed."""
+        key = (api_path, tuple(sorted(params)))
+        with self._lock:
+            expires = self._expiries.get(key)
+            if expires is None or expires <= now:
+                if len(self._expiries) >= 100000:
+                    self._expiries = dict(
+                        (k, v) for k, v in self._expiries.items() if v > now)
+                duration = self.cached_for
+                if duration is None:
+                    duration = CACHE_TIMES.get(api_path, DEFAULT_CACHE_TIME)
+                expires = self._expiries[key] = int(now) + duration
+            return expires
+
+
+def add_arguments(parser):
+    """Add the StandInServer options to an argparse parser."""
+    parser.add_argument('--latency', type=float, default=0,
+                        help='seconds to wait before each response')
+    parser.add_argument('--jitter', type=float, default=0,
+                        help='up to this many more seconds to wait')
+    parser.add_argument('--http-error-rate', type=float, default=0,
+                        help='share of requests answered with HTTP 5xx errors')
+    parser.add_argument('--api-error-rate', type=float, default=0,
+                        help='share of requests answered with API errors')
+    parser.add_argument('--api-error-code', type=int, default=904,
+                        choices=sorted(API_ERRORS), help='code of the API errors')
+    parser.add_argument('--no-gzip', dest='gzip', action='store_false',
+                        help='never gzip encode responses')
+    parser.add_argument('--amplify', type=int, default=1,
+                        help='repeat the rows of each response this many times')
+    parser.add_argument('--cached-for', type=int, default=None,
+                        help='seconds responses are cached for')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='seed of the random latency and errors')
+
+
+def server_options(args):
+    """The StandInServer keyword arguments of parsed add_arguments() options."""
+    return dict((name, getattr(args, name)) for name in (
+        'latency', 'jitter', 'http_error_rate', 'api_error_rate',
+        'api_error_code', 'gzip', 'amplify', 'cached_for', 'seed'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.host, args.port, verbose=args.verbose,
+                           **server_options(args))
+    print("Serving %d API paths on %s" % (len(server.fixtures), server.base_url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,422 @@
+"""Benchmark suite: every endpoint method and parser, plus large responses.
+
+Runs, against the tests/xml fixtures:
+
+- every public method of Account, Char, Corp, EVE, Map and Server that
+  makes a request, end to end (the request is answered with the fixture
+  and nothing is cached, so each call parses the response);
+- every parse_* function of evelink.parsing, on the fixture's result
+  element.
+
+It also runs the methods whose responses get the largest against
+generated responses: 100k-entry wallet journals, 1M-item nested asset
+lists, 50k-member member tracking and 10k kills with many attackers.
+--scale multiplies these sizes.
+
+For each case it reports the wall time of one call (the best of
+--repeat runs), the peak memory allocated during a call (measured with
+tracemalloc in a separate run) and the memory blocks still allocated
+after a call, i.e. held by its result, per row of the response (as
+counted by sys.getallocatedblocks).
+
+    python -m benchmarks.suite [--scale S] [--filter NAME]
+        [--output results.json] [--baseline baseline.json]
+
+With --baseline, the results are compared with those of a previous run
+(saved with --output) of the same Python version, and the exit status
+is 1 if any case got slower or used more memory than the tolerances
+allow. Timings are only comparable between runs on the same machine;
+--no-time leaves them out.
+
+benchmarks/baseline.json is the baseline of memory use the test suite
+checks against (see tests/test_benchmarks.py). After a change that
+affects memory use on purpose, record it again with:
+
+    python -m benchmarks.suite --scale 0.01 --no-time \
+        --output benchmarks/baseline.json
+"""
+from __future__ import print_function
+
+import argparse
+import collections
+import gc
+import inspect
+import json
+import os
+import platform
+import sys
+from xml.etree import ElementTree
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from evelink import account
+from evelink import api
+from evelink import char
+from evelink import corp
+from evelink import eve
+from evelink import map
+from evelink import server
+from evelink.parsing import assets
+from evelink.parsing import bookmarks
+from evelink.parsing import contact_list
+from evelink.parsing import contract_bids
+from evelink.parsing import contract_items
+from evelink.parsing import contracts
+from evelink.parsing import industry_jobs
+from evelink.parsing import kills
+from evelink.parsing import members
+from evelink.parsing import orders
+from evelink.parsing import planetary_interactions
+from evelink.parsing import wallet_journal
+from evelink.parsing import wallet_transactions
+
+from benchmarks import fixtures
+from benchmarks.timing import time_call
+
+
+CLIENTS = [
+    (account.Account, 'account'),
+    (char.Char, 'char'),
+    (corp.Corp, 'corp'),
+    (eve.EVE, 'eve'),
+    (map.Map, 'map'),
+    (server.Server, 'server'),
+]
+
+# Fixtures of methods not named after their method (by default the
+# fixture of Class.method is <module>/<method>.xml, or that of the
+# method without its _iter suffix).
+METHOD_FIXTURES = {
+    'Char.assets': 'corp/assets.xml',
+    'Char.contacts': 'char/contact_list.xml',
+    'Char.contracts': 'corp/contracts.xml',
+    'Char.industry_jobs_history': 'char/industry_jobs.xml',
+    'Char.kill_log': 'char/kills.xml',
+    'Corp.bookmarks': 'char/bookmarks.xml',
+    'Corp.contacts': 'corp/contact_list.xml',
+    'Corp.contract_bids': 'char/contract_bids.xml',
+    'Corp.contract_items': 'char/contract_items.xml',
+    'Corp.customs_offices': 'corp/customsoffices.xml',
+    'Corp.industry_jobs': 'char/industry_jobs.xml',
+    'Corp.industry_jobs_history': 'char/industry_jobs.xml',
+    'Corp.kill_log': 'char/kills.xml',
+    'Corp.kills': 'char/kills.xml',
+    'Corp.orders': 'char/orders.xml',
+    'Corp.wallet_transactions': 'char/wallet_transactions.xml',
+    'EVE.affiliations_for_character': 'eve/character_affiliation_single.xml',
+    'EVE.affiliations_for_characters': 'eve/character_affiliation.xml',
+    'EVE.character_id_from_name': 'eve/character_id_single.xml',
+    'EVE.character_ids_from_names': 'eve/character_id.xml',
+    'EVE.character_info_from_id': 'eve/character_info.xml',
+    'EVE.character_name_from_id': 'eve/character_name_single.xml',
+    'EVE.character_names_from_ids': 'eve/character_name.xml',
+    'EVE.type_name_from_id': 'eve/typename_single.xml',
+    'EVE.type_names_from_ids': 'eve/typename.xml',
+}
+
+# Arguments of methods with required ones.
+METHOD_ARGS = {
+    'Char.calendar_attendees': ([123, 234],),
+    'Char.contract_items': (1,),
+    'Char.locations': ((1009661446486, 1007448817800),),
+    'Char.message_bodies': ([297023723, 297023208, 297023210, 297023211],),
+    'Char.notification_texts': ([1234],),
+    'Char.planetary_links': (1,),
+    'Char.planetary_pins': (1,),
+    'Char.planetary_routes': (1,),
+    'Corp.contract_items': (1,),
+    'Corp.locations': ((1009661446486, 1007448817800),),
+    'Corp.starbase_details': (123,),
+    'Corp.station_services': (123,),
+    'EVE.affiliations_for_character': (92168909,),
+    'EVE.affiliations_for_characters': ([92168909, 401111892, 1979087900],),
+    'EVE.character_id_from_name': ('EVE System',),
+    'EVE.character_ids_from_names': (['EVE System', 'EVE Central Bank'],),
+    'EVE.character_info_from_id': (1234,),
+    'EVE.character_name_from_id': (1,),
+    'EVE.character_names_from_ids': ([1, 2],),
+    'EVE.type_name_from_id': (12345,),
+    'EVE.type_names_from_ids': ([12345, 23456],),
+}
+
+# Public methods that aren't run, and why.
+SKIPPED = {
+    'Char.event_attendees': 'the calendar_attendees fixture holds several events',
+    'Char.planetary_route_map': "doesn't make a request",
+}
+
+PARSERS = [
+    (assets.parse_assets, 'corp/assets.xml'),
+    (bookmarks.parse_bookmarks, 'char/bookmarks.xml'),
+    (contact_list.parse_contact_list, 'char/contact_list.xml'),
+    (contract_bids.parse_contract_bids, 'char/contract_bids.xml'),
+    (contract_items.parse_contract_items, 'char/contract_items.xml'),
+    (contracts.parse_contracts, 'corp/contracts.xml'),
+    (industry_jobs.parse_industry_jobs, 'char/industry_jobs.xml'),
+    (kills.parse_kills, 'char/kills.xml'),
+    (members.parse_members, 'corp/members.xml'),
+    (orders.parse_market_orders, 'char/orders.xml'),
+    (planetary_interactions.parse_planetary_colonies, 'char/planetary_colonies.xml'),
+    (planetary_interactions.parse_planetary_links, 'char/planetary_links.xml'),
+    (planetary_interactions.parse_planetary_pins, 'char/planetary_pins.xml'),
+    (planetary_interactions.parse_planetary_routes, 'char/planetary_routes.xml'),
+    (wallet_journal.parse_wallet_journal, 'char/wallet_journal.xml'),
+    (wallet_transactions.parse_wallet_transactions, 'char/wallet_transactions.xml'),
+]
+
+# (name, methods, generator, size): the generated responses, with the
+# size they have at --scale 1.
+SCALE_UPS = [
+    ('wallet_journal_100k', ['Char.wallet_journal', 'Char.wallet_journal_iter'],
+     fixtures.wallet_journal, 100000),
+    ('assets_1m', ['Corp.assets', 'Corp.assets_iter'], fixtures.assets, 1000000),
+    ('members_50k', ['Corp.members', 'Corp.members_iter'], fixtures.members, 50000),
+    ('kills_10k', ['Char.kills', 'Char.kills_iter'], fixtures.kills, 10000),
+]
+
+
+class NullCache(api.APICache):
+    """A cache that never holds anything."""
+
+    def put(self, key, value, duration):
+        pass
+
+
+class FixtureAPI(api.API):
+    """An API answering every request with self.response."""
+
+    def __init__(self, xml_backend=None):
+        super(FixtureAPI, self).__init__(api_key=(1, 'abc'), cache=NullCache(),
+                                         xml_backend=xml_backend)
+        self.response = None
+
+    def send_request(self, full_path, params):
+        return self.response, None
+
+    def send_request_stream(self, full_path, params):
+        return api._slices(self.response, api.stream_chunk_size), None
+
+
+Case = collections.namedtuple('Case', 'name, rows, run')
+
+
+def request_methods():
+    """Yield (name, client class, method name) for each request method."""
+    for cls, module in CLIENTS:
+        for attr, value in sorted(vars(cls).items()):
+            name = '%s.%s' % (cls.__name__, attr)
+            if attr.startswith('_') or not inspect.isfunction(value):
+                continue
+            if name not in SKIPPED:
+                yield name, cls, attr
+
+
+def method_fixture(name, cls):
+    if name in METHOD_FIXTURES:
+        return METHOD_FIXTURES[name]
+    if name.endswith('_iter'):
+        return method_fixture(name[:-len('_iter')], cls)
+    module = dict((c, m) for c, m in CLIENTS)[cls]
+    return '%s/%s.xml' % (module, name.split('.', 1)[1])
+
+
+def call(eve_api, cls, attr, args, response):
+    """A function calling the method with the response, consuming iterators."""
+    client = cls(1, eve_api) if cls is char.Char else cls(eve_api)
+    method = getattr(client, attr)
+
+    def run():
+        eve_api.response = response
+        result = method(*args)
+        if not isinstance(result, api.APIResult):
+            result = list(result)
+        return result
+    return run
+
+
+def method_cases(eve_api):
+    missing = []
+    for name, cls, attr in request_methods():
+        path = method_fixture(name, cls)
+        if not os.path.exists(os.path.join(fixtures.XML_DIR, path)):
+            missing.append('%s (%s)' % (name, path))
+            continue
+        response = fixtures.document(fixtures.fixture(path))
+        yield Case(name, fixtures.count_rows(response),
+                   call(eve_api, cls, attr, METHOD_ARGS.get(name, ()), response))
+    if missing:
+        raise ValueError("No fixture for: %s" % ', '.join(missing))
+
+
+def parser_cases():
+    for parse, path in PARSERS:
+        data = fixtures.fixture(path)
+        result = ElementTree.fromstring(data)
+        name = '%s.%s' % (parse.__module__, parse.__name__)
+        yield Case(name, fixtures.count_rows(data), lambda parse=parse, result=result: parse(result))
+
+
+def scale_up_cases(eve_api, scale):
+    methods = dict((name, (cls, attr)) for name, cls, attr in request_methods())
+    for label, names, generate, size in SCALE_UPS:
+        size = max(1, int(size * scale))
+        response = None
+        for name in names:
+            if response is None:
+                response = generate(size)
+            cls, attr = methods[name]
+            yield Case('%s[%s]' % (name, label), fixtures.count_rows(response),
+                       call(eve_api, cls, attr, (), response))
+
+
+def measure_memory(func):
+    """Return (peak bytes allocated during a call, blocks held by its result).
+
+    Either is None where the interpreter can't tell.
+    """
+    peak = held = None
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        gc.collect()
+    if hasattr(sys, 'getallocatedblocks'):
+        blocks = sys.getallocatedblocks()
+        result = func()
+        gc.collect()
+        held = sys.getallocatedblocks() - blocks
+        del result
+    return peak, held
+
+
+def run_case(case, repeat, memory, timing=True):
+    seconds = time_call(case.run, repeat) if timing else None
+    peak, held = measure_memory(case.run) if memory else (None, None)
+    rows = max(case.rows, 1)
+    return {
+        'rows': case.rows,
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'peak_bytes_per_row': None if peak is None else peak / float(rows),
+        'blocks_per_row': None if held is None else held / float(rows),
+    }
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """Print the changes from baseline; return the names of regressions."""
+    regressions = []
+    for name in sorted(results):
+        old = baseline['results'].get(name)
+        if old is None:
+            print('  new: %s' % name)
+            continue
+        new = results[name]
+        # Small absolute changes aren't noticed: a call's time or memory
+        # varies a little from run to run, and so do the memory blocks
+        # held by memoization (e.g. of timestamps) after the first ones.
+        for key, tolerance, slack in [('seconds', time_tolerance, 50e-6),
+                                      ('peak_bytes', memory_tolerance, 64 * 1024),
+                                      ('blocks_per_row', memory_tolerance,
+                                       64.0 / max(new['rows'], 1))]:
+            if new[key] is None or old[key] is None:
+                continue
+            if new[key] > old[key] * (1 + tolerance) + slack:
+                regressions.append(name)
+                print('  REGRESSION: %s %s %.4g -> %.4g (%+.0f%%)' % (
+                    name, key, old[key], new[key], 100.0 * (new[key] / old[key] - 1)))
+            elif new[key] < old[key] * (1 - tolerance) - slack:
+                print('  improved: %s %s %.4g -> %.4g (%+.0f%%)' % (
+                    name, key, old[key], new[key], 100.0 * (new[key] / old[key] - 1)))
+    return regressions
+
+
+def same_interpreter(report):
+    """Whether 'report' was recorded with this Python version.
+
+    Memory use is only comparable between runs of the same version.
+    """
+    return (report['implementation'] == platform.python_implementation() and
+            report['python'].split('.')[:2] == platform.python_version().split('.')[:2])
+
+
+def format_result(name, result):
+    line = '%-60s %8d rows' % (name, result['rows'])
+    if result['seconds'] is not None:
+        line += ' %12.1f usec' % (result['seconds'] * 1e6)
+    if result['peak_bytes'] is not None:
+        line += ' %10.1f KiB peak' % (result['peak_bytes'] / 1024.0)
+    if result['blocks_per_row'] is not None:
+        line += ' %8.1f blocks/row' % result['blocks_per_row']
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplies the sizes of the generated responses')
+    parser.add_argument('--filter', action='append', default=[],
+                        help='only run cases whose name contains this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="don't measure memory use")
+    parser.add_argument('--no-time', action='store_true',
+                        help="don't measure wall time (e.g. to compare with "
+                             "a baseline recorded on another machine)")
+    parser.add_argument('--xml-backend', default=None)
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare with this JSON file')
+    parser.add_argument('--time-tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-tolerance', type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['scale'] != args.scale:
+            parser.error('The baseline was recorded with --scale %s.' % baseline['scale'])
+        if not same_interpreter(baseline):
+            parser.error('The baseline was recorded with %s %s.' % (
+                baseline['implementation'], baseline['python']))
+
+    eve_api = FixtureAPI(args.xml_backend)
+    cases = [method_cases(eve_api), parser_cases(), scale_up_cases(eve_api, args.scale)]
+    results = {}
+    for case in (case for group in cases for case in group):
+        if args.filter and not any(f in case.name for f in args.filter):
+            continue
+        results[case.name] = run_case(case, args.repeat, not args.no_memory,
+                                      not args.no_time)
+        print(format_result(case.name, results[case.name]))
+        sys.stdout.flush()
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'xml_backend': eve_api.xml_backend.name,
+        'scale': args.scale,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if baseline is not None:
+        print('compared with %s:' % args.baseline)
+        regressions = compare(results, baseline, args.time_tolerance,
+                              args.memory_tolerance)
+        if regressions:
+            print('%d regressions' % len(set(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Timestamp decoding: parse_ts vs. the previous strptime version.
+
+Times decoding the same timestamp (all hits in the date memo), a day's
+worth of distinct timestamps, timestamps spread over a year, and a full
+parse of market orders scaled up to N rows.
+
+    python -m benchmarks.timestamps [--rows N] [--number N]
+"""
+from __future__ import print_function
+
+import argparse
+import calendar
+import time
+
+import mock
+
+from evelink import api
+from benchmarks.fixtures import load
+from benchmarks.parsing import legacy_parse_market_orders
+from benchmarks.timing import bench
+
+
+def legacy_parse_ts(v):
+    """parse_ts as it was before the date memo."""
+    if v == '':
+        return None
+    ts = calendar.timegm(time.strptime(v, "%Y-%m-%d %H:%M:%S"))
+    return ts if ts > 0 else None
+
+
+def timestamps(start, step, count):
+    return [time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * step))
+            for i in range(count)]
+
+
+def compare(label, values, number):
+    assert [legacy_parse_ts(v) for v in values] == [api.parse_ts(v) for v in values]
+    print('%s (%d timestamps):' % (label, len(values)))
+    old = bench('  strptime', lambda: [legacy_parse_ts(v) for v in values], number)
+    new = bench('  parse_ts', lambda: [api.parse_ts(v) for v in values], number)
+    print('  %.1fx faster' % (old / new))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    start = 1339459200
+    compare('same timestamp', ['2012-06-12 12:04:33'] * 1000, args.number)
+    compare('one day', timestamps(start, 86, 1000), args.number)
+    compare('one year', timestamps(start, 31536, 1000), args.number)
+
+    # The hand-written orders parser looks api.parse_ts up on every call.
+    result = load('char/orders.xml', args.rows)
+    parse = legacy_parse_market_orders
+    print('market orders (%d rows):' % args.rows)
+    with mock.patch.object(api, 'parse_ts', legacy_parse_ts):
+        legacy = parse(result)
+        old = bench('  strptime', lambda: parse(result), args.number)
+    assert legacy == parse(result)
+    new = bench('  parse_ts', lambda: parse(result), args.number)
+    print('  %.1fx faster' % (old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""Timing helpers shared by the benchmarks."""
+from __future__ import print_function
+
+import timeit
+
+# Multipliers turning seconds into each unit bench() reports in.
+UNITS = {'sec': 1, 'msec': 1e3, 'usec': 1e6}
+
+
+def time_call(func, repeat=5, number=None):
+    """The best time of one call of func, in seconds, out of 'repeat' runs.
+
+    Each run calls func 'number' times; by default, enough times for a
+    run to take at least 0.2 seconds.
+    """
+    if number is None:
+        number = 1
+        while True:
+            elapsed = timeit.timeit(func, number=number)
+            if elapsed >= 0.2 or number >= 1 << 20:
+                break
+            number *= 2 if elapsed > 0.02 else 10
+        times = [elapsed] + timeit.repeat(func, number=number, repeat=repeat - 1)
+    else:
+        times = timeit.repeat(func, number=number, repeat=repeat)
+    return min(times) / number
+
+
+def bench(label, func, number=None, unit='usec'):
+    """Print and return the time of one call of func, in 'unit's."""
+    value = time_call(func, number=number) * UNITS[unit]
+    print('%-40s %10.2f %s/call' % (label, value, unit))
+    return value
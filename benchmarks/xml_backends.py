@@ -0,0 +1,74 @@
+"""Response parsing with each XML backend.
+
+Parses the wallet journal and asset fixtures, with their rows repeated
+to make the responses larger, with every available backend of
+evelink.parsing.backends: the document alone, the document plus the
+row parser, and streaming the rows.
+
+    python -m benchmarks.xml_backends [--rows N] [--number N]
+"""
+from __future__ import print_function
+
+import argparse
+from xml.etree import ElementTree
+
+from evelink import api
+from evelink.parsing import assets
+from evelink.parsing import backends
+from evelink.parsing import wallet_journal
+
+from benchmarks import fixtures
+from benchmarks.timing import bench
+
+
+CASES = [
+    ('wallet journal', 'char/wallet_journal.xml',
+     wallet_journal.parse_wallet_journal,
+     wallet_journal.parse_wallet_journal_row),
+    ('assets', 'corp/assets.xml', assets.parse_assets, assets.parse_asset_row),
+]
+
+
+def document(path, rows):
+    """An EVE API response wrapping the fixture, with 'rows' rows."""
+    return fixtures.document(ElementTree.tostring(fixtures.load(path, rows)))
+
+
+def available():
+    names = ['etree']
+    if backends.lxml is not None:
+        names.append('lxml')
+    return [backends.get(name) for name in names]
+
+
+def stream(backend, data, parse_row):
+    eve_api = api.API(xml_backend=backend)
+    reader = api._ResponseReader(api._slices(data, api.stream_chunk_size))
+    for row in eve_api._stream_rows(reader, None, parse_row):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    for name, path, parse, parse_row in CASES:
+        data = document(path, args.rows)
+        print('%s (%d rows, %d bytes):' % (name, args.rows, len(data)))
+        expected = parse(ElementTree.fromstring(data).find('result'))
+        for backend in available():
+            result = backend.fromstring(data).find('result')
+            assert parse(result) == expected
+            bench('  %s: fromstring' % backend.name,
+                  lambda: backend.fromstring(data), args.number, unit='msec')
+            bench('  %s: fromstring + parse' % backend.name,
+                  lambda: parse(backend.fromstring(data).find('result')),
+                  args.number, unit='msec')
+            bench('  %s: stream' % backend.name,
+                  lambda: stream(backend, data, parse_row), args.number, unit='msec')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,22 +4,27 @@ import functools
 import zlib
 import inspect
 import logging
+import marshal
+import mmap
+import os
 import re
+import socket
+import sys
+import tempfile
+import threading
 import time
 import hashlib
-from xml.etree import ElementTree
-
+from evelink import pool as evelink_pool
+from evelink.parsing import backends
 from evelink.thirdparty import six
+from evelink.thirdparty.six.moves import http_client
+from evelink.thirdparty.six.moves import queue
 from evelink.thirdparty.six.moves import urllib
 
 _log = logging.getLogger('evelink.api')
 
-# Python 2.6's ElementTree raises xml.parsers.expat.ExpatError instead
-# of ElementTree.ParseError
-_xml_error = getattr(ElementTree, 'ParseError', None)
-if _xml_error is None:
-    import xml.parsers.expat
-    _xml_error = xml.parsers.expat.ExpatError
+# Raised by every XML backend for malformed responses.
+_xml_error = backends.ParseError
 
 # Allows zlib.decompress to decompress gzip-compressed strings as well.
 # From zlib.h header file, not documented in Python.
@@ -35,15 +40,79 @@ _user_agent = None
 # cache instance for all API instances. Note: instance, not class.
 default_cache = None
 
+# Can be set to the XML backend (or the name of one) used by API
+# instances that aren't given one, see evelink.parsing.backends. If None,
+# lxml is used if it is installed, and ElementTree otherwise.
+default_xml_backend = None
+
+# Paths of EVE API endpoints that don't require credentials. API.get
+# neither sends an API key or SSO token for these nor includes it in the
+# cache key, so API instances sharing a cache also share their entries.
+# Add to this set to register other unauthenticated endpoints. (Note
+# that endpoints which return more data when authenticated, such as
+# eve/CharacterInfo and corp/CorporationSheet, don't belong here.)
+public_paths = set([
+    'eve/AllianceList',
+    'eve/CharacterAffiliation',
+    'eve/CharacterID',
+    'eve/CharacterName',
+    'eve/ConquerableStationlist',
+    'eve/ErrorList',
+    'eve/FacWarStats',
+    'eve/FacWarTopStats',
+    'eve/RefTypes',
+    'eve/SkillTree',
+    'eve/TypeName',
+    'map/FacWarSystems',
+    'map/Jumps',
+    'map/Kills',
+    'map/Sovereignty',
+    'server/ServerStatus',
+])
+
 # The timeout to use for API HTTP requests, in seconds (default 1 minute).
 http_request_timeout = 60
 
+# API.stream() reads responses in chunks of stream_chunk_size bytes. A
+# copy of streamed responses is kept for the cache, in memory up to
+# stream_spill_size bytes and in a memory-mapped temporary file beyond.
+stream_chunk_size = 64 * 1024
+stream_spill_size = 16 * 1024 * 1024
+
+# The number of connections the transports created by API instances
+# keep open per host (unless given a pool_size). Threads sharing an
+# instance beyond this many still get a connection, but it isn't kept
+# open for reuse.
+requests_pool_size = 10
+
+# Functions decorated with auto_api (e.g. the constructors of EVE, Map
+# and Server) are given default_api(), an API instance shared by the
+# whole process, when no api is passed; set share_default_api to False
+# to give them a new API() each time instead. The shared instance keeps
+# default_api_pool_size connections open (None: requests_pool_size).
+share_default_api = True
+default_api_pool_size = None
+
+# The default number of requests API.get_many sends concurrently. This
+# is kept below requests_pool_size, so every worker can reuse a pooled
+# connection.
+get_many_max_workers = 8
+
+# Memoized cache keys, see API._cache_key. Cleared when it grows past
+# cache_key_memo_size entries.
+cache_key_memo_size = 4096
+_cache_keys = {}
+
 try:
     import requests
-    _has_requests = True
 except ImportError:
-    _log.info('`requests` not available, falling back to urllib2')
-    _has_requests = None
+    _log.info('`requests` not available, falling back to a PooledTransport')
+    requests = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 def _clean(v):
     """Convert parameters into an acceptable format for the API."""
@@ -57,11 +126,32 @@ def decompress(s):
     return zlib.decompress(s, ZLIB_DECODE_AUTO)
 
 
+_ts_re = re.compile(
+    r'([0-9]{4}-[0-9]{2}-[0-9]{2}) ([01][0-9]|2[0-3]):([0-5][0-9]):([0-5][0-9]|6[01])$')
+
+# Unix timestamps of the midnights of recently parsed dates, see parse_ts.
+# Cleared when it grows past ts_date_memo_size entries.
+ts_date_memo_size = 4096
+_ts_dates = {}
+
+
 def parse_ts(v):
     """Parse a timestamp from EVE API XML into a unix-ish timestamp."""
     if v == '':
         return None
-    ts = calendar.timegm(time.strptime(v, "%Y-%m-%d %H:%M:%S"))
+    match = _ts_re.match(v)
+    if match is None:
+        # Let strptime accept (or reject) anything unusual.
+        ts = calendar.timegm(time.strptime(v, "%Y-%m-%d %H:%M:%S"))
+    else:
+        date, hours, minutes, seconds = match.groups()
+        day = _ts_dates.get(date)
+        if day is None:
+            day = calendar.timegm(time.strptime(date, "%Y-%m-%d"))
+            if len(_ts_dates) >= ts_date_memo_size:
+                _ts_dates.clear()
+            _ts_dates[date] = day
+        ts = day + int(hours) * 3600 + int(minutes) * 60 + int(seconds)
     # Deal with EVE's nonexistent 0001-01-01 00:00:00 timestamp
     return ts if ts > 0 else None
 
@@ -111,13 +201,13 @@ def get_bool_value(elem, field):
 def elem_getters(elem):
     """Returns a tuple of (_str, _int, _float, _bool, _ts) functions.
 
-    These are getters closed around the provided element.
+    These are getters bound to the provided element.
     """
-    _str = lambda key: get_named_value(elem, key)
-    _int = lambda key: get_int_value(elem, key)
-    _float = lambda key: get_float_value(elem, key)
-    _bool = lambda key: get_bool_value(elem, key)
-    _ts = lambda key: get_ts_value(elem, key)
+    _str = functools.partial(get_named_value, elem)
+    _int = functools.partial(get_int_value, elem)
+    _float = functools.partial(get_float_value, elem)
+    _bool = functools.partial(get_bool_value, elem)
+    _ts = functools.partial(get_ts_value, elem)
 
     return _str, _int, _float, _bool, _ts
 
@@ -179,14 +269,33 @@ class APICache(object):
         key:
             a string hash key
         """
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def get_entry(self, key):
+        """Return a (value, expiration) tuple for 'key' if it is cached.
+
+        Used by caches layered on top of this one (see
+        evelink.cache.tiered), which need to know when entries expire.
+        """
         result = self.cache.get(key)
         if not result:
             return None
         value, expiration = result
         if expiration < time.time():
-            del self.cache[key]
+            # Another thread may be removing it too.
+            self.cache.pop(key, None)
             return None
-        return value
+        return result
+
+    def entries(self):
+        """Yield a (key, value, expiration) tuple for each unexpired entry."""
+        now = time.time()
+        for key, (value, expiration) in list(self.cache.items()):
+            if expiration >= now:
+                yield key, value, expiration
 
     def put(self, key, value, duration):
         """Cache the provided value, referenced by 'key', for the given duration.
@@ -202,19 +311,491 @@ class APICache(object):
         self.cache[key] = (value, expiration)
 
 
+class _Flight(object):
+    """A call in progress, as tracked by SingleFlight."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """Coalesces concurrent calls that share a key into a single call.
+
+    While a call for a given key is in progress, other threads asking
+    for the same key wait for it to finish and share its result (or
+    its exception) instead of making a call of their own.
+
+    lock_dir:
+        Optional. A directory in which to take an exclusive file lock
+        around each call, so that the coalescing also extends to other
+        processes using the same directory. Combined with a shared
+        persistent cache (e.g. SqliteCache), only one process fetches
+        a given response and the others find it in the cache. Keys are
+        spread over 'lock_stripes' lock files. Requires fcntl.
+
+    Coroutines of AsyncAPI instances sharing a SingleFlight are
+    coalesced too, with those of the same event loop (and without file
+    locks, which would block the loop).
+    """
+
+    def __init__(self, lock_dir=None, lock_stripes=64):
+        if lock_dir is not None and fcntl is None:
+            raise ValueError("File locking requires the fcntl module.")
+        self.lock_dir = lock_dir
+        self.lock_stripes = lock_stripes
+        self._lock = threading.Lock()
+        self._flights = {}
+        # (event loop, key): asyncio future, see evelink.asyncio.api.
+        self._async_flights = {}
+
+    def do(self, key, func):
+        """Call func() unless a call for 'key' is already in progress.
+
+        Returns the result of the call, or raises its exception.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            _log.debug("Waiting for in-flight call for %s", key)
+            flight.done.wait()
+            if flight.exc_info is not None:
+                six.reraise(*flight.exc_info)
+            return flight.result
+
+        try:
+            flight.result = self._call(key, func)
+        except Exception:
+            flight.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    def _call(self, key, func):
+        if self.lock_dir is None:
+            return func()
+
+        stripe = zlib.crc32(key.encode('utf-8')) % self.lock_stripes
+        lock_path = os.path.join(self.lock_dir, 'evelink-%d.lock' % stripe)
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                return func()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 APIResult = collections.namedtuple("APIResult", [
         "result",
         "timestamp",
         "expires",
     ])
+APIResult.stale = False
+
+
+class StaleAPIResult(APIResult):
+    """An APIResult built from a cached response that has expired.
+
+    Returned when a CachePolicy allows serving stale data; its 'stale'
+    attribute is True. It otherwise behaves exactly like an APIResult.
+    """
+    __slots__ = ()
+    stale = True
+
+
+def _mark_stale(api_result, result):
+    """Carry the staleness of 'api_result' over to the derived 'result'."""
+    if getattr(api_result, 'stale', False) is True and isinstance(result, APIResult):
+        return StaleAPIResult(*result)
+    return result
+
+
+class CachePolicy(object):
+    """Lets API.get serve expired cached responses in some situations.
+
+    stale_while_revalidate:
+        For this many seconds after a cached response expires, it is
+        returned straight away (as a StaleAPIResult) while a fresh one
+        is fetched in a background thread.
+    stale_if_error:
+        For this many seconds after a cached response expires, it is
+        returned (as a StaleAPIResult) if fetching a fresh one fails
+        with a network or HTTP error, or an EVE API server-side error
+        (code 500 and up).
+
+    With a policy, each response is stored once, together with the
+    time at which it expires, for the larger of the two windows past
+    that; whether it's fresh is told from that time when it's read.
+    API instances without a policy treat such entries as misses once
+    they have expired, so they can share a cache with those that have
+    one. Expiry is measured from the response's own currentTime and
+    cachedUntil, so it doesn't depend on our clock agreeing with the
+    API's.
+    """
+
+    def __init__(self, stale_while_revalidate=0, stale_if_error=0):
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+
+    @property
+    def grace(self):
+        return max(self.stale_while_revalidate, self.stale_if_error)
+
+
+_network_errors = (urllib.error.URLError, socket.error, socket.timeout,
+                   http_client.HTTPException)
+if requests is not None:
+    _network_errors += (requests.RequestException,)
+
+
+def _is_upstream_error(e):
+    """Whether 'e' is a network error or a server-side HTTP or API error."""
+    if isinstance(e, APIError):
+        try:
+            return int(e.code) >= 500
+        except (TypeError, ValueError):
+            return False
+    if isinstance(e, urllib.error.HTTPError):
+        return e.code >= 500
+    if requests is not None and isinstance(e, requests.HTTPError):
+        return e.response is None or e.response.status_code >= 500
+    return isinstance(e, _network_errors)
+
+
+# Clock used to time the phases of API calls.
+_clock = getattr(time, 'perf_counter', time.time)
+
+
+class CallEvent(object):
+    """What happened during one API call, as passed to APIObserver.observe.
+
+    path:
+        the API path, e.g. 'char/AssetList'.
+    method:
+        the qualified name of the wrapped method making the call, e.g.
+        'evelink.char.assets', or None for API.get() calls.
+    cache:
+        'hit' (a cached response), 'stale' (an expired cached
+        response, see CachePolicy), 'miss' (a request was sent),
+        'coalesced' (the result of an identical call in progress was
+        used, see SingleFlight) or 'result' (a result cache hit, see
+        API.get_parsed).
+    bytes, status:
+        the size of the response body and, if a request was sent,
+        its HTTP status.
+    network_time, parse_time, result_time:
+        seconds spent sending the request and receiving the response,
+        parsing the XML, and in the wrapped method's parser; None for
+        phases that didn't happen. For streamed calls (see
+        API.stream), parsing is interleaved with consuming the rows,
+        so only network_time is set.
+    total_time:
+        seconds the whole call took.
+    error, error_code:
+        the exception the call raised, and its code if it was an
+        APIError.
+    """
+
+    __slots__ = ('path', 'method', 'cache', 'bytes', 'status',
+                 'network_time', 'parse_time', 'result_time', 'total_time',
+                 'error', 'error_code')
+
+    def __init__(self, path, method=None):
+        self.path = path
+        self.method = method
+        self.cache = None
+        self.bytes = None
+        self.status = None
+        self.network_time = None
+        self.parse_time = None
+        self.result_time = None
+        self.total_time = None
+        self.error = None
+        self.error_code = None
+
+    def set_error(self, error):
+        self.error = error
+        if isinstance(error, APIError):
+            self.error_code = error.code
+
+    def __repr__(self):
+        return 'CallEvent(%s)' % ', '.join(
+            '%s=%r' % (attr, getattr(self, attr)) for attr in self.__slots__)
+
+
+class APIObserver(object):
+    """Interface of objects notified of every call an API makes.
+
+    Pass instances to API(observers=[...]). observe() is called once
+    a call is over, from the thread that made it; exceptions it raises
+    are logged and otherwise ignored. See evelink.observers for an
+    implementation keeping statistics per endpoint.
+    """
+
+    def observe(self, event):
+        """Handle the CallEvent of a finished call."""
+        pass
+
+
+class Transport(object):
+    """Interface of objects sending the requests of API instances.
+
+    Pass an instance to API(transport=...) to use it instead of a new
+    default_transport. Transports may be shared by threads and API
+    instances. See evelink.transports for implementations that don't
+    use the network.
+    """
+
+    def request(self, full_path, params, headers):
+        """Send a request; return its (decompressed) body and response.
+
+        The request is a POST of 'params' if there are any, a GET
+        otherwise, and 'headers' is a dict of headers to send. The
+        response object is passed to API.maybe_raise_http_error if the
+        body isn't XML, and its status_code, status or code attribute
+        is the HTTP status reported to observers.
+        """
+        raise NotImplementedError()
+
+    def request_stream(self, full_path, params, headers):
+        """Like request(), but without reading the response body.
+
+        Returns an iterator over the (decompressed) chunks of the body,
+        and the response object. Closing the iterator closes the
+        response. By default, the body is read by request().
+        """
+        body, robj = self.request(full_path, params, headers)
+        return _slices(body, stream_chunk_size), robj
+
+    def close(self):
+        """Release the resources held, such as open connections."""
+        pass
+
+
+class PooledTransport(Transport):
+    """Sends requests over persistent http.client connections.
+
+    Up to 'size' (default: requests_pool_size) idle connections per
+    host are kept open, see evelink.pool.ConnectionPool; 'timeout'
+    defaults to http_request_timeout. Responses are gzip-encoded.
+    """
+
+    def __init__(self, size=None, timeout=None):
+        self.pool = evelink_pool.ConnectionPool(
+            size or requests_pool_size,
+            http_request_timeout if timeout is None else timeout)
+
+    def _open(self, full_path, params, headers):
+        headers = dict(headers, **{'Accept-Encoding': 'gzip'})
+        if params:
+            # POST request
+            _log.debug("POSTing request")
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            body = urllib.parse.urlencode(params)
+            r = self.pool.request('POST', full_path, body, headers)
+        else:
+            # GET request
+            _log.debug("GETting request")
+            r = self.pool.request('GET', full_path, None, headers)
+        _log.debug("Response status code: %s", r.status)
+        return r
+
+    def request(self, full_path, params, headers):
+        r = self._open(full_path, params, headers)
+        return r.read(stream_chunk_size), r
+
+    def request_stream(self, full_path, params, headers):
+        r = self._open(full_path, params, headers)
+        return r.iter_content(stream_chunk_size), r
+
+    def close(self):
+        self.pool.close()
+
+
+class RequestsTransport(Transport):
+    """Sends requests with a `requests` session.
+
+    The session is created on first use, keeping up to 'size' (default:
+    requests_pool_size) connections open per host, unless one is given,
+    e.g. to share its connection pool between transports; a given
+    session is used as it is. 'timeout' defaults to http_request_timeout.
+    """
+
+    def __init__(self, size=None, timeout=None, session=None):
+        if requests is None:
+            raise ValueError("RequestsTransport requires `requests`.")
+        self.size = size
+        self.timeout = timeout
+        self.session = session
+        self._lock = threading.Lock()
+
+    def _session(self):
+        session = self.session
+        if session is None:
+            with self._lock:
+                session = self.session
+                if session is None:
+                    session = self.session = self._new_session()
+        return session
+
+    def _new_session(self):
+        session = requests.Session()
+        size = self.size or requests_pool_size
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=size, pool_maxsize=size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _send(self, full_path, params, headers, stream=False):
+        session = self._session()
+        timeout = http_request_timeout if self.timeout is None else self.timeout
+        if params:
+            # POST request
+            _log.debug("POSTing request")
+            r = session.post(full_path, data=params, headers=headers,
+                timeout=timeout, stream=stream)
+        else:
+            # GET request
+            _log.debug("GETting request")
+            r = session.get(full_path, headers=headers,
+                timeout=timeout, stream=stream)
+        _log.debug("Response status code: %s", r.status_code)
+        return r
+
+    def request(self, full_path, params, headers):
+        r = self._send(full_path, params, headers)
+        return r.content, r
+
+    def request_stream(self, full_path, params, headers):
+        r = self._send(full_path, params, headers, stream=True)
+        return _iter_content(r), r
+
+    def close(self):
+        session, self.session = self.session, None
+        if session is not None:
+            session.close()
+
+
+class UrllibTransport(Transport):
+    """Sends each request over a new connection, with urllib2.
+
+    'timeout' defaults to http_request_timeout. Responses are
+    gzip-encoded.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def _open(self, full_path, params, headers):
+        if params:
+            # POST request
+            _log.debug("POSTing request")
+            params = urllib.parse.urlencode(params)
+            req = urllib.request.Request(full_path, data=params.encode())
+        else:
+            # GET request
+            req = urllib.request.Request(full_path)
+            _log.debug("GETting request")
+
+        req.add_header('Accept-Encoding', 'gzip')
+        for name, value in headers.items():
+            req.add_header(name, value)
+        timeout = http_request_timeout if self.timeout is None else self.timeout
+        try:
+            return urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            # urllib2 handles non-2xx responses by raising an exception that
+            # can also behave as a file-like object. The EVE API will return
+            # non-2xx HTTP codes on API errors (since Odyssey, apparently)
+            return e
+
+    def request(self, full_path, params, headers):
+        r = self._open(full_path, params, headers)
+        try:
+            if r.info().get('Content-Encoding') == 'gzip':
+                return decompress(r.read()), r
+            else:
+                return r.read(), r
+        finally:
+            r.close()
+
+    def request_stream(self, full_path, params, headers):
+        r = self._open(full_path, params, headers)
+        return _read_chunks(r, r.info().get('Content-Encoding') == 'gzip'), r
+
+
+# The Transport API instances send requests with unless given one,
+# called with their pool_size: a RequestsTransport if `requests` is
+# available, a PooledTransport otherwise.
+default_transport = RequestsTransport if requests is not None else PooledTransport
+
+
+class RateLimiter(object):
+    """Interface of objects pacing the requests API instances send.
+
+    Pass an instance to API(rate_limiter=...), which calls acquire()
+    before sending each request and release() once its response (or
+    the headers of a streamed one) is in. Limiters may be shared by
+    threads and API instances. See evelink.ratelimit for an
+    implementation.
+    """
+
+    def acquire(self, host, path, key):
+        """Block until a request may be sent; return a token for release().
+
+        host, path:
+            the host the request is sent to, and the path of its URL
+        key:
+            the keyID of the API key it uses (or an identifier of its
+            SSO token), or None for public calls.
+        """
+        return None
+
+    def release(self, token, latency, status):
+        """Called once the request acquired with 'token' is done.
+
+        It took 'latency' seconds and got a response with HTTP 'status',
+        which is None if no response was received.
+        """
+        pass
+
+    def cancel(self, token):
+        """Called instead of release() if the request wasn't sent after all."""
+        pass
+
+
+def _http_status(robj):
+    """The HTTP status of a requests, urllib or aiohttp response, if any."""
+    for attr in ('status_code', 'status', 'code'):
+        status = getattr(robj, attr, None)
+        if isinstance(status, int):
+            return status
+    return None
 
 
 class API(object):
-    """A wrapper around the EVE API."""
+    """A wrapper around the EVE API.
+
+    Instances can be shared by threads. Each call returns its own
+    timestamps (see APIResult); last_timestamps holds those of the
+    last response received by the calling thread.
+    """
 
     def __init__(self,
                  base_url="api.eveonline.com", cache=None,
-                 api_key=None, user_agent=None, sso_token=None):
+                 api_key=None, user_agent=None, sso_token=None,
+                 single_flight=None, result_cache=None, cache_policy=None,
+                 xml_backend=None, observers=None, session=None,
+                 pool_size=None, transport=None, rate_limiter=None):
         self.base_url = base_url
         self.user_agent = _user_agent
 
@@ -227,6 +808,20 @@ class API(object):
         self.cache = cache
         self.CACHE_VERSION = '1'
 
+        # Optional second cache level holding the parsed results of the
+        # wrapped (auto_call) methods, so that hits skip XML parsing.
+        if result_cache is not None and not isinstance(result_cache, APICache):
+            raise ValueError("The provided result cache must subclass from APICache.")
+        self.result_cache = result_cache
+        # Difference between the EVE API's clock and ours, as of the
+        # last response we fetched.
+        self._clock_offset = 0
+
+        # Optional CachePolicy allowing stale responses to be served.
+        self.cache_policy = cache_policy
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+
         if api_key and len(api_key) != 2:
             raise ValueError("The provided API key must be a tuple of (keyID, vCode).")
         self.api_key = api_key
@@ -234,18 +829,78 @@ class API(object):
             # TODO: maybe allow omitting type somehow? For now this is easier.
             raise ValueError("The provided SSO token must be a tuple of (token, type).")
         self.sso_token = sso_token
-        self._set_last_timestamps()
+
+        # Share one SingleFlight between API instances (with the same
+        # base_url) to coalesce identical calls made through any of them.
+        self.single_flight = single_flight or SingleFlight()
+
+        # How responses are parsed, see evelink.parsing.backends.
+        self.xml_backend = backends.get(xml_backend or default_xml_backend)
+
+        # APIObservers notified of every call.
+        observers = list(observers or ())
+        for observer in observers:
+            if not isinstance(observer, APIObserver):
+                raise ValueError("The provided observers must subclass from APIObserver.")
+        self.observers = observers
+
+        # The Transport sending the requests: a new default_transport
+        # keeping pool_size connections open per host, unless one is
+        # given (or a `requests` session, e.g. to share its connection
+        # pool between instances).
+        self.pool_size = pool_size
+        if transport is None:
+            if session is not None:
+                transport = RequestsTransport(pool_size, session=session)
+            else:
+                transport = default_transport(pool_size)
+        elif not isinstance(transport, Transport):
+            raise ValueError("The provided transport must subclass from Transport.")
+        elif session is not None:
+            raise ValueError("A session can't be given along with a transport.")
+        self.transport = transport
+
+        # Optional RateLimiter pacing the requests sent.
+        if rate_limiter is not None and not isinstance(rate_limiter, RateLimiter):
+            raise ValueError("The provided rate limiter must subclass from RateLimiter.")
+        self.rate_limiter = rate_limiter
+
+        self._local = threading.local()
 
     def _set_last_timestamps(self, current_time=0, cached_until=0):
-        self.last_timestamps = {
+        self._local.last_timestamps = {
             'current_time': current_time,
             'cached_until': cached_until,
         }
 
+    @property
+    def last_timestamps(self):
+        """The timestamps of the last response received by this thread."""
+        timestamps = getattr(self._local, 'last_timestamps', None)
+        if timestamps is None:
+            self._set_last_timestamps()
+            timestamps = self._local.last_timestamps
+        return timestamps
+
     def _cache_key(self, path, params):
-        sorted_params = sorted(params.items())
+        sorted_params = tuple(sorted(params.items()))
+        # Only memoize string params (which is what _request_params
+        # yields): equal non-string values (1, 1.0, True) may differ in
+        # their str() representation.
+        memoize = all(type(v) is str for _, v in sorted_params)
+        if memoize:
+            memo_key = (self.CACHE_VERSION, path, sorted_params)
+            key = _cache_keys.get(memo_key)
+            if key is not None:
+                return key
+
         # Paradoxically, Shelve doesn't like integer keys.
-        return '%s-%s' % (self.CACHE_VERSION, hashlib.sha1(str([path,sorted_params]).encode("utf-8")).hexdigest())
+        key = '%s-%s' % (self.CACHE_VERSION, hashlib.sha1(str([path,list(sorted_params)]).encode("utf-8")).hexdigest())
+        if memoize:
+            if len(_cache_keys) >= cache_key_memo_size:
+                _cache_keys.clear()
+            _cache_keys[memo_key] = key
+        return key
 
     def get(self, path, params=None):
         """Request a specific path from the EVE API.
@@ -254,38 +909,364 @@ class API(object):
         frament, e.g. "corp/AssetList". (Basically, the portion
         of the API url in between the root / and the .xml bit.)
         """
+        if self.observers:
+            return self._observe(path, None,
+                functools.partial(self._get, path, params))
+        return self._get(path, params)
 
-        params = params or {}
-        params = dict((k, _clean(v)) for k,v in params.items())
-
-        _log.debug("Calling %s with params=%r", path, params)
-        if self.sso_token:
-            _log.debug("SSO token added")
-            params['accessToken'] = self.sso_token[0]
-            params['accessType'] = self.sso_token[1]
-        elif self.api_key:
-            _log.debug("keyID and vCode added")
-            params['keyID'] = self.api_key[0]
-            params['vCode'] = self.api_key[1]
+    def _get(self, path, params, event=None):
+        params = self._request_params(path, params)
 
         key = self._cache_key(path, params)
+        response, stale_for = self._cached_response(key)
+
+        if response is not None and not stale_for:
+            return self._cache_hit(key, response, event)
+
+        # no (fresh) cached response body found, call the API for one
+        # (unless another thread is already doing so).
+        fetch = functools.partial(self._fetch_once, key, path, params)
+        if response is None:
+            return fetch(event)
+        return self._get_stale(key, response, stale_for, fetch, event)
+
+    def _observe(self, path, method, call):
+        """Return call(event=event), notifying the observers of the event."""
+        event = CallEvent(path, method)
+        start = _clock()
+        try:
+            return call(event=event)
+        except Exception as e:
+            event.set_error(e)
+            raise
+        finally:
+            event.total_time = _clock() - start
+            self._notify(event)
+
+    def _notify(self, event):
+        for observer in self.observers:
+            try:
+                observer.observe(event)
+            except Exception:
+                _log.exception("Observer %r failed", observer)
+
+    def _cache_hit(self, key, response, event=None):
+        _log.debug("Cache hit, returning cached payload")
+        if event is not None:
+            event.cache = 'hit'
+        return self._process_response(key, response, None, True, event=event)
+
+    def _cached_response(self, key):
+        """Look up the cached response for 'key'.
+
+        Returns a (response, stale_for) tuple, where stale_for is the
+        number of seconds since the response expired (0 if it hasn't).
+        Expired responses are only returned if there is a cache policy.
+        """
         response = self.cache.get(key)
-        cached = response is not None
+        if not isinstance(response, tuple):
+            return response, 0
+        # Stored with a cache policy, see _cache_response.
+        expires_at, response = response
+        stale_for = time.time() - expires_at
+        if stale_for <= 0:
+            return response, 0
+        if self.cache_policy is None:
+            return None, 0
+        return response, stale_for
+
+    def _get_stale(self, key, response, stale_for, fetch, event=None):
+        """Handle an expired cached response according to the cache policy."""
+        policy = self.cache_policy
+        if stale_for <= policy.stale_while_revalidate:
+            _log.debug("Returning stale payload and refreshing it")
+            self._revalidate(key, fetch)
+            return self._stale_hit(key, response, event)
 
-        if not cached:
-            # no cached response body found, call the API for one.
-            full_path = "https://%s/%s.xml.aspx" % (self.base_url, path)
-            response, robj = self.send_request(full_path, params)
+        try:
+            return fetch(event)
+        except Exception as e:
+            if not self._stale_if_error(e, stale_for):
+                raise
+            _log.warning("Returning stale payload after error: %r", e)
+            return self._stale_hit(key, response, event)
+
+    def _stale_if_error(self, e, stale_for):
+        """Whether a stale response may be returned after a fetch raised 'e'."""
+        return (stale_for <= self.cache_policy.stale_if_error and
+                _is_upstream_error(e))
+
+    def _stale_hit(self, key, response, event=None):
+        if event is not None:
+            event.cache = 'stale'
+        return self._process_response(
+            key, response, None, True, stale=True, event=event)
+
+    def _revalidate(self, key, fetch):
+        """Call fetch() in a background thread, unless already doing so for key."""
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def revalidate():
+            try:
+                fetch()
+            except Exception as e:
+                _log.warning("Refreshing stale payload failed: %r", e)
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        thread = threading.Thread(target=revalidate)
+        thread.daemon = True
+        thread.start()
+
+    def get_many(self, calls, max_workers=None):
+        """Request several paths from the EVE API at once.
+
+        calls:
+            an iterable of (path, params) pairs, as would be passed
+            to get().
+        max_workers:
+            the maximum number of requests to send concurrently
+            (defaults to evelink.api.get_many_max_workers).
+
+        The cache is checked for every call first; only the misses
+        are sent, from a bounded pool of worker threads sharing this
+        instance's transport. Identical calls are only sent once.
+        Expired cached responses are handled according to the cache
+        policy, as get() does.
+
+        Returns a list holding, in the same order as 'calls', either
+        the APIResult for each call or the exception (typically an
+        APIError) it raised. An APIResult can be passed on to the
+        matching wrapped method through its api_result argument, e.g.
+        Char(...).assets(api_result=result).
+        """
+        calls = [(path, self._request_params(path, params))
+                 for path, params in calls]
+        results = [None] * len(calls)
+
+        # key: (path, params, stale response, stale_for, indices), in
+        # the order of 'calls'.
+        misses = {}
+        miss_keys = []
+        for i, (path, params) in enumerate(calls):
+            key = self._cache_key(path, params)
+            if key in misses:
+                misses[key][4].append(i)
+                continue
+            response, stale_for = self._cached_response(key)
+            if response is None or stale_for:
+                misses[key] = (path, params, response, stale_for, [i])
+                miss_keys.append(key)
+                continue
+            hit = functools.partial(self._cache_hit, key, response)
+            try:
+                if self.observers:
+                    results[i] = self._observe(path, None, hit)
+                else:
+                    results[i] = hit()
+            except Exception as e:
+                results[i] = e
+
+        if not misses:
+            return results
+        _log.debug("%d of %d calls missed the cache", len(misses), len(calls))
+
+        todo = queue.Queue()
+        for key in miss_keys:
+            todo.put((key,) + misses[key])
+
+        def worker():
+            while True:
+                try:
+                    key, path, params, response, stale_for, indices = todo.get_nowait()
+                except queue.Empty:
+                    return
+                fetch = functools.partial(self._fetch_once, key, path, params)
+                if response is not None:
+                    fetch = functools.partial(
+                        self._get_stale, key, response, stale_for, fetch)
+                try:
+                    if self.observers:
+                        result = self._observe(path, None, fetch)
+                    else:
+                        result = fetch()
+                except Exception as e:
+                    result = e
+                for i in indices:
+                    results[i] = result
+
+        workers = [threading.Thread(target=worker) for _ in
+                   range(min(max_workers or get_many_max_workers, len(misses)))]
+        for thread in workers:
+            thread.daemon = True
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        return results
+
+    def get_parsed(self, path, params, name, parse):
+        """Request a path and return parse(api_result), using the result cache.
+
+        name:
+            a string identifying the parser, e.g. the wrapped method's
+            qualified name.
+        parse:
+            a function taking the APIResult returned by get() and
+            returning an APIResult holding the parsed result.
+
+        The parsed result is stored in self.result_cache until the
+        underlying response expires, so subsequent calls with the same
+        path and params skip both the XML parsing and 'parse'. Entries
+        are serialized with marshal, so each hit returns a fresh copy.
+        Results marshal can't handle are never cached.
+        """
+        if self.observers:
+            return self._observe(path, name,
+                functools.partial(self._get_parsed, path, params, name, parse))
+        return self._get_parsed(path, params, name, parse)
+
+    def _get_parsed(self, path, params, name, parse, event=None):
+        if self.result_cache is None:
+            return self._parse_result(parse, path, params, event)
+
+        key = self._result_key(path, params, name)
+        api_result = self._cached_result(key, event)
+        if api_result is None:
+            api_result = self._parse_result(parse, path, params, event)
+            self._cache_result(key, name, api_result)
+        return api_result
+
+    def _result_key(self, path, params, name):
+        return '%s-m%d-%s' % (name, marshal.version,
+            self._cache_key(path, self._request_params(path, params)))
+
+    def _cached_result(self, key, event=None):
+        """Return the APIResult in the result cache under 'key', or None."""
+        value = self.result_cache.get(key)
+        if value is None:
+            return None
+        _log.debug("Result cache hit, returning cached result")
+        if event is not None:
+            event.cache = 'result'
+        api_result = APIResult(*marshal.loads(value))
+        # Like any other cache hit.
+        self._set_last_timestamps(api_result.timestamp, api_result.expires)
+        return api_result
+
+    def _cache_result(self, key, name, api_result):
+        """Store a parsed APIResult in the result cache until it expires."""
+        try:
+            value = marshal.dumps(tuple(api_result))
+        except ValueError:
+            _log.debug("Not caching unmarshallable result of %s", name)
+            return
+
+        duration = api_result.expires - (time.time() + self._clock_offset)
+        if duration > 0:
+            self.result_cache.put(key, value, duration)
+
+    def _parse_result(self, parse, path, params, event=None):
+        """Return parse(api_result) for the APIResult of a path."""
+        if event is None:
+            return parse(self.get(path, params))
+        api_result = self._get(path, params, event)
+        start = _clock()
+        try:
+            return parse(api_result)
+        finally:
+            event.result_time = _clock() - start
+
+    def _fetch_once(self, key, path, params, event=None):
+        """Call _fetch, unless an identical call is already doing so."""
+        if event is not None:
+            # Until our own _fetch runs, if it does.
+            event.cache = 'coalesced'
+        try:
+            result = self.single_flight.do(
+                key, functools.partial(self._fetch, key, path, params, event))
+        except APIError as e:
+            self._set_last_timestamps(e.timestamp, e.expires)
+            raise
+        # The call may have been made by another thread.
+        self._set_last_timestamps(result.timestamp, result.expires)
+        return result
+
+    def _fetch(self, key, path, params, event=None):
+        """Send a request for a cache miss and process the response."""
+        # The response may have been cached while we were waiting to
+        # make this call, e.g. by another process.
+        response, stale_for = self._cached_response(key)
+        if response is not None and not stale_for:
+            _log.debug("Cache filled while waiting, returning cached payload")
+            if event is not None:
+                event.cache = 'hit'
+            return self._process_response(key, response, None, True, event=event)
+
+        if event is None:
+            response, robj = self.send_request(self._full_path(path), params)
         else:
-            _log.debug("Cache hit, returning cached payload")
+            event.cache = 'miss'
+            start = _clock()
+            response, robj = self.send_request(self._full_path(path), params)
+            event.network_time = _clock() - start
+            event.status = _http_status(robj)
+        return self._process_response(key, response, robj, False, event=event)
+
+    def _request_params(self, path, params):
+        """Clean the supplied params and add any credentials to them."""
+        params = params or {}
+        params = dict(
+            (k, v if type(v) is str else _clean(v)) for k, v in params.items())
 
+        _log.debug("Calling %s with params=%r", path, params)
+        if path in public_paths:
+            _log.debug("Public path, no credentials added")
+        elif self.sso_token:
+            _log.debug("SSO token added")
+            params['accessToken'] = _clean(self.sso_token[0])
+            params['accessType'] = _clean(self.sso_token[1])
+        elif self.api_key:
+            _log.debug("keyID and vCode added")
+            # Cleaned like other params, so the cache key is memoized.
+            params['keyID'] = _clean(self.api_key[0])
+            params['vCode'] = _clean(self.api_key[1])
+        return params
+
+    def _full_path(self, path):
+        # base_url is a host name, or a URL with a scheme (e.g. that of
+        # a local test server).
+        if '://' in self.base_url:
+            return "%s/%s.xml.aspx" % (self.base_url.rstrip('/'), path)
+        return "https://%s/%s.xml.aspx" % (self.base_url, path)
+
+    def _process_response(self, key, response, robj, cached, stale=False,
+                          event=None):
+        """Turn a raw response body into an APIResult.
+
+        Also stores the response in the cache if it was freshly
+        fetched, and raises APIError if the response holds one. If
+        'stale' is set, a StaleAPIResult is returned. The size of the
+        response and the time spent parsing it are recorded in
+        'event', if given.
+        """
+        if event is not None:
+            event.bytes = len(response)
+            start = _clock()
         try:
-            tree = ElementTree.fromstring(response)
+            tree = self.xml_backend.fromstring(response)
         except _xml_error as e:
             # If this is due to an HTTP error, raise the HTTP error
-            self.maybe_raise_http_error(robj)
+            if robj is not None:
+                self.maybe_raise_http_error(robj)
             # otherwise, raise the parse error
             raise e
+        if event is not None:
+            event.parse_time = _clock() - start
 
         current_time = get_ts_value(tree, 'currentTime')
         expires_time = get_ts_value(tree, 'cachedUntil')
@@ -294,19 +1275,157 @@ class API(object):
         if not cached:
             # Have to split this up from above as timestamps have to be
             # extracted.
-            self.cache.put(key, response, expires_time - current_time)
+            self._cache_response(key, response, current_time, expires_time)
 
         error = tree.find('error')
         if error is not None:
             code = error.attrib['code']
             message = error.text.strip()
             exc = APIError(code, message, current_time, expires_time)
-            _log.debug("Raising API error: %r" % exc)
+            _log.debug("Raising API error: %r", exc)
             raise exc
 
         result = tree.find('result')
+        if stale:
+            return StaleAPIResult(result, current_time, expires_time)
         return APIResult(result, current_time, expires_time)
 
+    def _cache_response(self, key, response, current_time, expires_time):
+        """Store a freshly fetched response until it expires.
+
+        With a cache policy, it's stored beyond that instead, together
+        with the time at which it expires.
+        """
+        now = time.time()
+        duration = expires_time - current_time
+        if self.cache_policy is None:
+            self.cache.put(key, response, duration)
+        else:
+            if isinstance(response, mmap.mmap):
+                response = response[:]
+            self.cache.put(key, (now + duration, response),
+                           duration + self.cache_policy.grace)
+        self._clock_offset = current_time - now
+
+    def stream(self, path, params, parse_row, name=None):
+        """Request a path and iterate over parse_row(row) for its rows.
+
+        Rather than building the whole document tree like get() does,
+        the response is parsed incrementally as it is received: each
+        top level row of the result's (first) rowset is passed to
+        parse_row once it is complete and discarded afterwards, so
+        memory use doesn't grow with the number of rows.
+
+        The request is sent (unless the response is cached) right away,
+        the body is read as the returned iterator is consumed. Once it
+        is exhausted, the response's timestamps are set in
+        last_timestamps and the response is cached; streams that are
+        abandoned early aren't cached. APIErrors are raised from the
+        iterator. Cached responses are only used until they expire
+        (cache policies don't apply), and concurrent streams of the
+        same call are not coalesced.
+
+        Observers are notified once the iterator is exhausted or
+        closed; 'name' is the method of the CallEvent.
+        """
+        event = CallEvent(path, name) if self.observers else None
+        start = _clock()
+        params = self._request_params(path, params)
+        key = self._cache_key(path, params)
+        response, stale_for = self._cached_response(key)
+
+        if response is not None and not stale_for:
+            _log.debug("Cache hit, streaming cached payload")
+            if isinstance(response, six.text_type):
+                response = response.encode('utf-8')
+            reader = _ResponseReader(_slices(response, stream_chunk_size))
+            rows = self._stream_rows(reader, None, parse_row)
+            if event is None:
+                return rows
+            event.cache = 'hit'
+            event.network_time = 0
+            return self._observe_stream(rows, reader, event, start)
+
+        if event is None:
+            chunks, robj = self.send_request_stream(self._full_path(path), params)
+            reader = _ResponseReader(chunks, spill_size=stream_spill_size)
+            return self._stream_rows(reader, robj, parse_row, key)
+
+        event.cache = 'miss'
+        try:
+            chunks, robj = self.send_request_stream(self._full_path(path), params)
+        except Exception as e:
+            event.set_error(e)
+            event.total_time = _clock() - start
+            self._notify(event)
+            raise
+        event.network_time = _clock() - start
+        event.status = _http_status(robj)
+        reader = _ResponseReader(chunks, spill_size=stream_spill_size)
+        rows = self._stream_rows(reader, robj, parse_row, key)
+        return self._observe_stream(rows, reader, event, start)
+
+    def _observe_stream(self, rows, reader, event, start):
+        """Yield from 'rows', then notify the observers of the event."""
+        try:
+            for row in rows:
+                yield row
+        except Exception as e:
+            event.set_error(e)
+            raise
+        finally:
+            rows.close()
+            event.bytes = reader.size
+            event.network_time += reader.wait_time
+            event.total_time = _clock() - start
+            self._notify(event)
+
+    def _stream_rows(self, reader, robj, parse_row, key=None):
+        current_time = expires_time = error = rowset = None
+        streaming = False
+        depth = 0
+        try:
+            for event, elem in self.xml_backend.iterparse(
+                    reader, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    # eveapi > result > rowset
+                    if depth == 3 and rowset is None and elem.tag == 'rowset':
+                        rowset = elem
+                        streaming = True
+                    continue
+
+                depth -= 1
+                if streaming and depth == 3 and elem.tag == 'row':
+                    yield parse_row(elem)
+                    rowset.remove(elem)
+                elif elem is rowset:
+                    streaming = False
+                elif depth == 1:
+                    if elem.tag == 'currentTime':
+                        current_time = parse_ts(elem.text)
+                    elif elem.tag == 'cachedUntil':
+                        expires_time = parse_ts(elem.text)
+                    elif elem.tag == 'error':
+                        error = elem
+        except _xml_error:
+            # If this is due to an HTTP error, raise the HTTP error
+            if robj is not None:
+                self.maybe_raise_http_error(robj)
+            raise
+        finally:
+            reader.close()
+
+        self._set_last_timestamps(current_time, expires_time)
+        if key is not None and None not in (current_time, expires_time):
+            self._cache_response(key, reader.getvalue(), current_time, expires_time)
+
+        if error is not None:
+            exc = APIError(error.attrib['code'], error.text.strip(),
+                current_time, expires_time)
+            _log.debug("Raising API error: %r", exc)
+            raise exc
+
     def maybe_raise_http_error(self, response):
         """Called if a XML parse error is raised for the response.
 
@@ -314,91 +1433,238 @@ class API(object):
         to parse it as XML first to see if it's an API error, but if
         it's not, this method gets called.
         """
-        if _has_requests:
-            # Requests has a built-in method for this functionality
-            response.raise_for_status()
-        else:
+        if isinstance(response, Exception):
             # urllib2 uses exceptions by default for this, which we've
             # potentially previously caught and stored as the response
-            if isinstance(response, Exception):
-                raise response
+            raise response
+        raise_for_status = getattr(response, 'raise_for_status', None)
+        if raise_for_status is not None:
+            # Requests (and evelink.pool) have a built-in method for this
+            raise_for_status()
 
     def send_request(self, full_path, params):
-        if _has_requests:
-            return self.requests_request(full_path, params)
-        else:
-            return self.urllib2_request(full_path, params)
+        if self.rate_limiter is not None:
+            return self._send_limited(self._send_request, full_path, params)
+        return self._send_request(full_path, params)
 
-    def urllib2_request(self, full_path, params):
-        r = None
-        try:
-            if params:
-                # POST request
-                _log.debug("POSTing request")
-                params = urllib.parse.urlencode(params)
-                req = urllib.request.Request(full_path, data=params.encode())
-            else:
-                # GET request
-                req = urllib.request.Request(full_path)
-                _log.debug("GETting request")
+    def _send_request(self, full_path, params):
+        return self.transport.request(
+            full_path, params, {'User-Agent': self.user_agent})
 
-            req.add_header('Accept-Encoding', 'gzip')
-            req.add_header('User-agent', self.user_agent)
-            r = urllib.request.urlopen(req, timeout=http_request_timeout)
-        except urllib.error.HTTPError as e:
-            # urllib2 handles non-2xx responses by raising an exception that
-            # can also behave as a file-like object. The EVE API will return
-            # non-2xx HTTP codes on API errors (since Odyssey, apparently)
-            r = e
-        except urllib.error.URLError as e:
-            # TODO: Handle this better?
-            raise e
+    def send_request_stream(self, full_path, params):
+        """Like send_request(), but without reading the response body.
 
+        Returns an iterator over the (decompressed) chunks of the body,
+        and the response object. Closing the iterator closes the
+        response.
+        """
+        if self.rate_limiter is not None:
+            return self._send_limited(self._send_request_stream, full_path, params)
+        return self._send_request_stream(full_path, params)
+
+    def _send_request_stream(self, full_path, params):
+        return self.transport.request_stream(
+            full_path, params, {'User-Agent': self.user_agent})
+
+    def _rate_limit_args(self, full_path, params):
+        """The arguments of rate_limiter.acquire() for a request."""
+        url = urllib.parse.urlsplit(full_path)
+        key = params.get('keyID') if params else None
+        if key is None and params and 'accessToken' in params:
+            # Keep the token itself out of the limiter's (shared) state.
+            token = params['accessToken'].encode('utf-8')
+            key = 'sso-%s' % hashlib.sha1(token).hexdigest()[:16]
+        return url.netloc, url.path, key
+
+    def _send_limited(self, send, full_path, params):
+        """Call send(full_path, params) once the rate limiter allows it."""
+        token = self.rate_limiter.acquire(*self._rate_limit_args(full_path, params))
+        start = _clock()
+        status = None
         try:
-            if r.info().get('Content-Encoding') == 'gzip':
-                return decompress(r.read()), r
-            else:
-                return r.read(), r
+            response, robj = send(full_path, params)
+            status = _http_status(robj)
+            return response, robj
         finally:
-            r.close()
+            self.rate_limiter.release(token, _clock() - start, status)
 
-    def requests_request(self, full_path, params):
-        session = getattr(self, 'session', None)
-        if not session:
-            session = requests.Session()
-            session.headers.update({'User-Agent': self.user_agent})
-            self.session = session
 
+def _read_chunks(r, gzipped):
+    """Yield the body of an urllib response, decompressing it on the fly."""
+    decompressor = zlib.decompressobj(ZLIB_DECODE_AUTO) if gzipped else None
+    try:
+        while True:
+            chunk = r.read(stream_chunk_size)
+            if not chunk:
+                break
+            yield decompressor.decompress(chunk) if decompressor else chunk
+        if decompressor:
+            yield decompressor.flush()
+    finally:
+        r.close()
+
+
+def _iter_content(r):
+    """Yield the body of a streamed requests response (decoded by requests)."""
+    try:
+        for chunk in r.iter_content(stream_chunk_size):
+            yield chunk
+    finally:
+        r.close()
+
+
+def _slices(data, size):
+    """Yield 'data' in slices of 'size' bytes."""
+    for i in range(0, len(data), size):
+        yield data[i:i+size]
+
+
+class _ResponseReader(object):
+    """File-like object reading a response from an iterator of chunks.
+
+    If spill_size is set, a copy of the response is kept for
+    getvalue(): in memory, or in a temporary file once it's bigger
+    than spill_size bytes.
+    """
+
+    def __init__(self, chunks, spill_size=None):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+        self._spill_size = spill_size
+        self._parts = []
+        self._file = None
+        # Bytes read so far, and seconds spent waiting for them.
+        self.size = 0
+        self.wait_time = 0
+
+    def read(self, size=-1):
+        while not self._buffer:
+            start = _clock()
+            chunk = next(self._chunks, None)
+            self.wait_time += _clock() - start
+            if chunk is None:
+                return b''
+            self.size += len(chunk)
+            self._keep(chunk)
+            self._buffer = chunk
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def _keep(self, chunk):
+        if self._spill_size is None:
+            return
+        if self._file is not None:
+            self._file.write(chunk)
+        elif self.size > self._spill_size:
+            _log.debug("Spilling response to a temporary file")
+            self._file = tempfile.TemporaryFile()
+            for part in self._parts:
+                self._file.write(part)
+            self._file.write(chunk)
+            self._parts = []
+        else:
+            self._parts.append(chunk)
+
+    def getvalue(self):
+        """Return the whole response, once it has been read.
+
+        Spilled responses are returned as a read-only mmap of the
+        temporary file rather than read back into memory.
+        """
+        if self._file is None:
+            return b''.join(self._parts)
+        self._file.flush()
         try:
-            if params:
-                # POST request
-                _log.debug("POSTing request")
-                r = session.post(full_path, data=params, timeout=http_request_timeout)
-            else:
-                # GET request
-                _log.debug("GETting request")
-                r = session.get(full_path, timeout=http_request_timeout)
-            _log.debug("Response status code: %s" % r.status_code)
-            return r.content, r
-        except requests.exceptions.RequestException as e:
-            # TODO: Handle this better?
-            raise e
+            return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            # The mapping stays valid; the file is removed once it's gone.
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        close = getattr(self._chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+_default_api = None
+_default_api_pid = None
+_default_api_lock = threading.Lock()
+
+
+def default_api():
+    """Return the API instance shared by this process.
+
+    It is created on first use, with the default arguments (so it uses
+    default_xml_backend, if it's set by then) and a connection pool of
+    default_api_pool_size connections. It caches responses in
+    default_cache if that's set by then, and otherwise in an LRUCache
+    with its default bounds (10000 entries, 256 MiB): it lives as long
+    as the process. After a fork, the child process creates its own
+    rather than sharing the parent's connections.
+    """
+    global _default_api, _default_api_pid
+    pid = os.getpid()
+    api = _default_api
+    if api is None or _default_api_pid != pid:
+        with _default_api_lock:
+            if _default_api is None or _default_api_pid != pid:
+                # Imported here, as evelink.cache.lru imports this module.
+                from evelink.cache import lru
+                _default_api = API(cache=default_cache or lru.LRUCache(),
+                                   pool_size=default_api_pool_size)
+                _default_api_pid = pid
+            api = _default_api
+    return api
+
+
+def _reset_default_api():
+    """Forget the shared API instance (and any lock held at a fork)."""
+    global _default_api, _default_api_pid, _default_api_lock
+    _default_api = _default_api_pid = None
+    _default_api_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_default_api)
+
+
+def _auto_api_factory():
+    if share_default_api:
+        return default_api()
+    return API()
 
 
 def auto_api(func):
     """A decorator to automatically provide an API instance.
 
     Functions decorated with this will have the api= kwarg
-    automatically supplied with a default-initialized API()
-    object if no other API object is supplied.
+    automatically supplied with default_api() (or a new API(), if
+    share_default_api is False) if no other API object is supplied.
     """
+    return _auto_api(func, _auto_api_factory)
+
+
+def _auto_api(func, api_factory):
+    """Wrap 'func' to supply api=api_factory() when no api is given.
+
+    The position of the 'api' argument is looked up once, when
+    decorating, rather than on each call.
+    """
+    args_names, _ = get_args_and_defaults(func)
+    if 'api' in args_names:
+        api_index = args_names.index('api')
+    else:
+        api_index = sys.maxsize
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        defaultargs, defaultkwargs = get_args_and_defaults(func)
-        mapped_args = map_func_args(args, kwargs, defaultargs, defaultkwargs)
-        if mapped_args.get('api') is None:
-            kwargs['api'] = API()
+        if len(args) > api_index:
+            if args[api_index] is None:
+                args = args[:api_index] + (api_factory(),) + args[api_index+1:]
+        elif kwargs.get('api') is None:
+            kwargs['api'] = api_factory()
         return func(*args, **kwargs)
     return wrapper
 
@@ -408,13 +1674,19 @@ def translate_args(args, mapping=None):
     mapping = mapping if mapping else {}
     return dict((mapping[k], v,) for k, v in args.items())
 
+if hasattr(inspect, 'getfullargspec'):
+    _getargspec = inspect.getfullargspec
+else:
+    _getargspec = inspect.getargspec
+
 # TODO: needs better name
 def get_args_and_defaults(func):
     """Return the list of argument names and a dict of default values"""
-    specs = inspect.getargspec(func)
+    specs = _getargspec(func)
+    defaults = specs.defaults or ()
     return (
         specs.args,
-        dict(zip(specs.args[-len(specs.defaults):], specs.defaults)),
+        dict(zip(specs.args[len(specs.args)-len(defaults):], defaults)),
     )
 
 
@@ -450,6 +1722,86 @@ def map_func_args(args, kw, args_names, defaults):
     return map_
 
 
+class CallPlan(object):
+    """Precompiled translation of a method's arguments into API params.
+
+    Built once per auto_call decorated method; calling it with the
+    client and the call's positional and keyword arguments gives the
+    same params map_func_args() and translate_args() would, without
+    re-deriving the argument layout on every call. Arguments and
+    properties with a None value are left out. So are False ones, and
+    True ones are sent as 1: flags such as 'extended' are sent only
+    when set, as the methods building their params by hand do.
+    """
+
+    __slots__ = ('args', 'nargs', 'props', 'unmapped', '_index', '_tail')
+
+    def __init__(self, args, defaults, prop_to_param=(), map_params=None):
+        map_params = map_params or {}
+        self.args = tuple(args)
+        self.nargs = len(self.args)
+        self.props = tuple((p, map_params.get(p)) for p in prop_to_param)
+
+        # Arguments without an API parameter name make every call fail
+        # with a KeyError, like translate_args would.
+        self.unmapped = None
+        for name in self.args + tuple(prop_to_param):
+            if name not in map_params:
+                self.unmapped = name
+                break
+
+        self._index = dict((name, i) for i, name in enumerate(self.args))
+        self._tail = tuple(
+            (name, map_params.get(name), name not in defaults,
+             defaults.get(name))
+            for name in self.args
+        )
+
+    def __call__(self, client, args, kw):
+        if self.unmapped is not None:
+            raise KeyError(self.unmapped)
+
+        nargs = len(args)
+        if nargs + len(kw) > self.nargs:
+            raise TypeError('Too many arguments.')
+
+        params = {}
+        tail = self._tail
+        for i in range(nargs):
+            value = args[i]
+            if value is not None and value is not False:
+                params[tail[i][1]] = 1 if value is True else value
+
+        used = 0
+        for name, param, required, value in tail[nargs:]:
+            if name in kw:
+                value = kw[name]
+                used += 1
+            elif required:
+                raise TypeError("Too few arguments")
+            if value is not None and value is not False:
+                params[param] = 1 if value is True else value
+
+        if used != len(kw):
+            self._raise_bad_keyword(nargs, kw)
+
+        for attr_name, param in self.props:
+            value = getattr(client, attr_name, None)
+            if value is not None and value is not False:
+                params[param] = 1 if value is True else value
+        return params
+
+    def _raise_bad_keyword(self, nargs, kw):
+        for k in kw:
+            index = self._index.get(k)
+            if index is None:
+                raise TypeError("got an unexpected keyword argument '%s'" % k)
+            if index < nargs:
+                raise TypeError(
+                    "got multiple values for keyword argument '%s'" % k
+                )
+
+
 class auto_call(object):
     """A decorator to automatically provide an api response to a method.
 
@@ -472,30 +1824,51 @@ class auto_call(object):
     paramater name. They will be added to 'evelink.api._args_map' to
     translate argument names to parameter names.
 
+    and a '_call_plan' attribute, the CallPlan compiled from those
+    specs.
+
+    If 'parse_row' is given, the response is streamed instead (see
+    API.stream): the method should have a 'rows' keyword argument
+    rather than 'api_result', which receives an iterator over
+    parse_row(row) for each of the response's rows. Such methods have
+    no '_request_specs'.
+
     """
 
-    def __init__(self, path, prop_to_param=tuple(), map_params=None):
+    def __init__(self, path, prop_to_param=tuple(), map_params=None,
+                 parse_row=None):
         self.method = None
+        self.name = None
 
         self.path = path
         self.args = None
         self.defaults = None
         self.prop_to_param = prop_to_param
         self.map_params = map_params if map_params else {}
+        self.parse_row = parse_row
+        self.plan = None
 
     def __call__(self, method):
         if self.method is not None:
             raise TypeError("This decorator method cannot be shared.")
         self.method = method
-
-        wrapper = self._wrapped_method()
+        self.name = '%s.%s' % (method.__module__, method.__name__)
 
         args, self.defaults = get_args_and_defaults(self.method)
 
+        result_arg = 'api_result' if self.parse_row is None else 'rows'
         self.args = args[1:]
-        self.args.remove('api_result')
-        self.defaults.pop('api_result')  # TODO: better exception
+        self.args.remove(result_arg)
+        self.defaults.pop(result_arg)  # TODO: better exception
+        self.plan = CallPlan(
+            self.args, self.defaults, self.prop_to_param, self.map_params)
+
+        if self.parse_row is not None:
+            wrapper = self._streaming_method()
+            wrapper._call_plan = self.plan
+            return wrapper
 
+        wrapper = self._wrapped_method()
         wrapper._request_specs = {
             'path': self.path,
             'args': self.args,
@@ -503,25 +1876,57 @@ class auto_call(object):
             'prop_to_param': self.prop_to_param,
             'map_params': self.map_params
         }
+        wrapper._call_plan = self.plan
 
         return wrapper
 
     def _wrapped_method(self):
+        method = self.method
+        path = self.path
+        name = self.name
+        plan = self.plan
 
-        @functools.wraps(self.method)
+        @functools.wraps(method)
         def wrapper(client, *args, **kw):
             if 'api_result' in kw:
-                return self.method(client, *args, **kw)
+                return method(client, *args, **kw)
+
+            params = plan(client, args, kw)
 
-            args_map = map_func_args(args, kw, self.args, self.defaults)
-            for attr_name in self.prop_to_param:
-                args_map[attr_name] = getattr(client, attr_name, None)
+            def parse(api_result):
+                kw['api_result'] = api_result
+                return _mark_stale(api_result, method(client, *args, **kw))
 
-            params = translate_args(args_map, self.map_params)
-            params =  dict((k, v,) for k, v in params.items() if v is not None)
+            api = client.api
+            # get_parsed also records the method and the time spent in
+            # it in the CallEvents of observed calls.
+            if (isinstance(getattr(api, 'result_cache', None), APICache) or
+                    (isinstance(api, API) and getattr(api, 'observers', None))):
+                return api.get_parsed(path, params, name, parse)
 
-            kw['api_result'] = client.api.get(self.path, params=params)
-            return self.method(client, *args, **kw)
+            return parse(api.get(path, params=params))
+
+        return wrapper
+
+    def _streaming_method(self):
+        method = self.method
+        path = self.path
+        name = self.name
+        parse_row = self.parse_row
+        plan = self.plan
+
+        @functools.wraps(method)
+        def wrapper(client, *args, **kw):
+            if 'rows' in kw:
+                return method(client, *args, **kw)
+
+            params = plan(client, args, kw)
+            api = client.api
+            if isinstance(api, API) and getattr(api, 'observers', None):
+                kw['rows'] = api.stream(path, params, parse_row, name=name)
+            else:
+                kw['rows'] = api.stream(path, params, parse_row)
+            return method(client, *args, **kw)
 
         return wrapper
 
@@ -1,4 +1,3 @@
-import functools
 import inspect
 import time
 from urllib import urlencode
@@ -32,7 +31,7 @@ class AppEngineAPI(api.API):
         params = params or {}
         params = dict((k, api._clean(v)) for k,v in params.items())
 
-        if self.api_key:
+        if self.api_key and path not in api.public_paths:
             params['keyID'] = self.api_key[0]
             params['vCode'] = self.api_key[1]
 
@@ -87,6 +86,12 @@ class AppEngineAPI(api.API):
         params = urlencode(params)
         return self.send_request_async(url, params).get_result()
 
+    def send_request_stream(self, url, params):
+        """urlfetch responses can't be streamed; returns the whole body
+        as a single chunk."""
+        content, result = self.send_request(url, params)
+        return [content], result
+
     @ndb.tasklet
     def send_request_async(self, url, params):
         ctx = ndb.get_context()
@@ -169,35 +174,15 @@ class AppEngineDatastoreCache(api.APICache):
 
 def auto_gae_api(func):
     """A decorator to automatically provide an AppEngineAPI instance."""
-
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        defaultargs, defaultkwargs = api.get_args_and_defaults(func)
-        mapped_args = api.map_func_args(args, kwargs, defaultargs, defaultkwargs)
-        if mapped_args.get('api') is None:
-            kwargs['api'] = AppEngineAPI()
-        return func(*args, **kwargs)
-    return wrapper
+    return api._auto_api(func, AppEngineAPI)
 
 
 def _make_async(method):
-    def _async(self, *args, **kw):
-        # method specs
-        path = method._request_specs['path']
-        args_names = method._request_specs['args']
-        defaults = method._request_specs['defaults']
-        prop_to_param = method._request_specs['prop_to_param']
-        map_params = method._request_specs['map_params']
-
-        # build parameter map
-        args_map = api.map_func_args(args, kw, args_names, defaults)
-        for attr_name in prop_to_param:
-            args_map[attr_name] = getattr(self, attr_name, None)
-
-        # fix params name and remove params with None values
-        params = api.translate_args(args_map, map_params)
-        params =  dict((k, v,) for k, v in params.items() if v is not None)
+    path = method._request_specs['path']
+    plan = method._call_plan
 
+    def _async(self, *args, **kw):
+        params = plan(self, args, kw)
         kw['api_result'] = yield self.api.get_async(path, params=params)
         raise ndb.Return(method(self, *args, **kw))
     return ndb.tasklet(_async)
@@ -0,0 +1,19 @@
+"""asyncio support for EVELink (Python 3.5+ only)."""
+
+from evelink.asyncio.api import AsyncAPI
+from evelink.asyncio import account
+from evelink.asyncio import char
+from evelink.asyncio import corp
+from evelink.asyncio import eve
+from evelink.asyncio import map
+from evelink.asyncio import server
+
+__all__ = [
+  "AsyncAPI",
+  "account",
+  "char",
+  "corp",
+  "eve",
+  "map",
+  "server",
+]
@@ -0,0 +1,305 @@
+import asyncio
+import functools
+import inspect
+import logging
+
+from evelink import api
+
+_log = logging.getLogger('evelink.asyncio.api')
+
+try:
+    import aiohttp
+    _has_aiohttp = True
+except ImportError:
+    _log.info('`aiohttp` not available, falling back to a thread pool')
+    _has_aiohttp = False
+
+# The maximum number of simultaneous connections an AsyncAPI instance
+# opens when `aiohttp` is available.
+connection_limit = 100
+
+
+# asyncio.get_event_loop() is deprecated in coroutines since Python 3.7.
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class AsyncAPI(api.API):
+    """Subclass of api.API that can be used from asyncio coroutines.
+
+    If `aiohttp` is available, requests are sent over a single
+    ClientSession per instance, so many requests can be in flight at
+    once without a thread per request. Otherwise the blocking
+    send_request() is run in the event loop's default executor, as it
+    is when the instance was given a transport.
+
+    A rate_limiter paces requests either way; its acquire() may block,
+    so it's also run in the default executor. Note that the cache is
+    still accessed synchronously. Options other than connection_limit
+    are those of api.API.
+    """
+
+    def __init__(self, base_url="api.eveonline.com", cache=None,
+                 api_key=None, user_agent=None, sso_token=None,
+                 connection_limit=None, **kwargs):
+        super(AsyncAPI, self).__init__(base_url=base_url, cache=cache,
+                api_key=api_key, user_agent=user_agent, sso_token=sso_token,
+                **kwargs)
+        self._use_aiohttp = _has_aiohttp and kwargs.get('transport') is None
+        self.connection_limit = connection_limit
+        self.aiohttp_session = None
+        self._revalidations = set()
+
+    async def get_async(self, path, params=None):
+        """Asynchronously request a specific path from the EVE API.
+
+        See api.API.get for the meaning of the arguments. The cache
+        policy and single flight apply as they do to get(), identical
+        calls being coalesced with those made from the same event loop.
+        """
+        if not self.observers:
+            return await self._get_async(path, params)
+        return await self._observe_async(
+            path, None, functools.partial(self._get_async, path, params))
+
+    async def get_parsed_async(self, path, params, name, parse):
+        """Asynchronous version of api.API.get_parsed."""
+        if not self.observers:
+            return await self._get_parsed_async(path, params, name, parse)
+        return await self._observe_async(path, name, functools.partial(
+            self._get_parsed_async, path, params, name, parse))
+
+    async def _observe_async(self, path, method, call):
+        """Return await call(event=event), notifying the observers."""
+        event = api.CallEvent(path, method)
+        start = api._clock()
+        try:
+            return await call(event=event)
+        except Exception as e:
+            event.set_error(e)
+            raise
+        finally:
+            event.total_time = api._clock() - start
+            self._notify(event)
+
+    async def _get_async(self, path, params, event=None):
+        params = self._request_params(path, params)
+
+        key = self._cache_key(path, params)
+        response, stale_for = self._cached_response(key)
+
+        if response is not None and not stale_for:
+            return self._cache_hit(key, response, event)
+
+        fetch = functools.partial(self._fetch_once_async, key, path, params)
+        if response is None:
+            return await fetch(event)
+        return await self._get_stale_async(key, response, stale_for, fetch, event)
+
+    async def _get_stale_async(self, key, response, stale_for, fetch, event=None):
+        """Handle an expired cached response according to the cache policy."""
+        if stale_for <= self.cache_policy.stale_while_revalidate:
+            _log.debug("Returning stale payload and refreshing it")
+            self._revalidate_async(key, fetch)
+            return self._stale_hit(key, response, event)
+
+        try:
+            return await fetch(event)
+        except Exception as e:
+            if not self._stale_if_error(e, stale_for):
+                raise
+            _log.warning("Returning stale payload after error: %r", e)
+            return self._stale_hit(key, response, event)
+
+    def _revalidate_async(self, key, fetch):
+        """Run fetch() in a task, unless already doing so for key."""
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        async def revalidate():
+            try:
+                await fetch()
+            except Exception as e:
+                _log.warning("Refreshing stale payload failed: %r", e)
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+                self._revalidations.discard(task)
+
+        # Keep a reference to the task until it's done.
+        task = asyncio.ensure_future(revalidate())
+        self._revalidations.add(task)
+
+    async def _fetch_once_async(self, key, path, params, event=None):
+        """Await _fetch_async, unless an identical call is already doing so."""
+        if event is not None:
+            # Until our own _fetch_async runs, if it does.
+            event.cache = 'coalesced'
+        flights = self.single_flight._async_flights
+        flight_key = (_get_running_loop(), key)
+        flight = flights.get(flight_key)
+        if flight is not None:
+            _log.debug("Waiting for in-flight call for %s", key)
+        else:
+            flight = flights[flight_key] = asyncio.ensure_future(
+                self._fetch_async(key, path, params, event))
+            flight.add_done_callback(
+                functools.partial(_end_flight, flights, flight_key))
+        try:
+            # Cancelling one caller mustn't cancel the others' call.
+            result = await asyncio.shield(flight)
+        except api.APIError as e:
+            self._set_last_timestamps(e.timestamp, e.expires)
+            raise
+        # The call may have been made by another coroutine.
+        self._set_last_timestamps(result.timestamp, result.expires)
+        return result
+
+    async def _fetch_async(self, key, path, params, event=None):
+        """Send a request for a cache miss and process the response."""
+        if event is None:
+            response, robj = await self.send_request_async(
+                self._full_path(path), params)
+        else:
+            event.cache = 'miss'
+            start = api._clock()
+            response, robj = await self.send_request_async(
+                self._full_path(path), params)
+            event.network_time = api._clock() - start
+            event.status = api._http_status(robj)
+        return self._process_response(key, response, robj, False, event=event)
+
+    async def _get_parsed_async(self, path, params, name, parse, event=None):
+        key = None
+        if self.result_cache is not None:
+            key = self._result_key(path, params, name)
+            api_result = self._cached_result(key, event)
+            if api_result is not None:
+                return api_result
+
+        api_result = await self._get_async(path, params, event)
+        start = api._clock()
+        try:
+            result = parse(api_result)
+        finally:
+            if event is not None:
+                event.result_time = api._clock() - start
+        if key is not None:
+            self._cache_result(key, name, result)
+        return result
+
+    def maybe_raise_http_error(self, response):
+        if _has_aiohttp and isinstance(response, aiohttp.ClientResponse):
+            response.raise_for_status()
+        else:
+            super(AsyncAPI, self).maybe_raise_http_error(response)
+
+    async def send_request_async(self, full_path, params):
+        loop = _get_running_loop()
+        if not self._use_aiohttp:
+            return await loop.run_in_executor(
+                None, self.send_request, full_path, params)
+        if self.rate_limiter is None:
+            return await self.aiohttp_request(full_path, params)
+
+        acquired = loop.run_in_executor(None, self.rate_limiter.acquire,
+                                        *self._rate_limit_args(full_path, params))
+        try:
+            token = await asyncio.shield(acquired)
+        except asyncio.CancelledError:
+            # The executor still acquires the token: give it back unused.
+            acquired.add_done_callback(self._cancel_acquired)
+            raise
+        start = api._clock()
+        status = None
+        try:
+            response, robj = await self.aiohttp_request(full_path, params)
+            status = api._http_status(robj)
+            return response, robj
+        finally:
+            self.rate_limiter.release(token, api._clock() - start, status)
+
+    def _cancel_acquired(self, acquired):
+        if not acquired.cancelled() and acquired.exception() is None:
+            self.rate_limiter.cancel(acquired.result())
+
+    async def aiohttp_request(self, full_path, params):
+        session = self.aiohttp_session
+        if session is None or session.closed:
+            limit = self.connection_limit or connection_limit
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=limit),
+                headers={'User-Agent': self.user_agent},
+                timeout=aiohttp.ClientTimeout(total=api.http_request_timeout),
+            )
+            self.aiohttp_session = session
+
+        if params:
+            # POST request
+            _log.debug("POSTing request")
+            request = session.post(full_path, data=params)
+        else:
+            # GET request
+            _log.debug("GETting request")
+            request = session.get(full_path)
+
+        # aiohttp transparently decodes gzip-encoded responses.
+        async with request as r:
+            _log.debug("Response status code: %s", r.status)
+            return await r.read(), r
+
+    async def close(self):
+        """Close the underlying aiohttp session, if one was opened."""
+        session, self.aiohttp_session = self.aiohttp_session, None
+        if session is not None:
+            await session.close()
+
+
+def _end_flight(flights, flight_key, flight):
+    del flights[flight_key]
+    # Retrieve the exception, in case every caller was cancelled.
+    if not flight.cancelled():
+        flight.exception()
+
+
+def auto_async_api(func):
+    """A decorator to automatically provide an AsyncAPI instance."""
+    return api._auto_api(func, AsyncAPI)
+
+
+def _make_async(method):
+    path = method._request_specs['path']
+    plan = method._call_plan
+    name = '%s.%s' % (method.__module__, method.__name__)
+
+    async def _async(self, *args, **kw):
+        params = plan(self, args, kw)
+
+        def parse(api_result):
+            kw['api_result'] = api_result
+            return api._mark_stale(api_result, method(self, *args, **kw))
+
+        client_api = self.api
+        # Like the wrapped method, see api.auto_call.
+        if isinstance(client_api, AsyncAPI) and (
+                client_api.result_cache is not None or client_api.observers):
+            return await client_api.get_parsed_async(path, params, name, parse)
+        return parse(await client_api.get_async(path, params=params))
+    return _async
+
+
+def auto_async(cls):
+    """Class decoration which add a coroutine version of any method with
+    a '_request_specs' attribute (metadata added by api.auto_call).
+    """
+    for method_name, method in inspect.getmembers(cls, inspect.isfunction):
+        if not hasattr(method, '_request_specs'):
+            continue
+
+        async_method = _make_async(method)
+        async_method.__doc__ = """Asynchronous version of %s.""" % method_name
+        async_method.__name__ = '%s_async' % method_name
+        setattr(cls, async_method.__name__, async_method)
+
+    return cls
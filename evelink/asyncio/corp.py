@@ -0,0 +1,18 @@
+from evelink import corp
+from evelink.asyncio.api import auto_async
+
+
+@auto_async
+class Corp(corp.Corp):
+    __doc__ = corp.Corp.__doc__
+
+    async def members_async(self, extended=True):
+        """Asynchronous version of members."""
+        args = {}
+        if extended:
+            args['extended'] = 1
+
+        api_result = await self.api.get_async(
+            'corp/MemberTracking', params=args
+        )
+        return self.members(extended=extended, api_result=api_result)
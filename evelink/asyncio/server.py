@@ -0,0 +1,10 @@
+from evelink import server
+from evelink.asyncio.api import auto_async, auto_async_api
+
+@auto_async
+class Server(server.Server):
+    __doc__ = server.Server.__doc__
+
+    @auto_async_api
+    def __init__(self, api=None):
+        self.api = api
@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import mmap
+import sys
+import threading
+import time
+
+from evelink import api
+from evelink.thirdparty import six
+
+class LRUCache(api.APICache):
+    """A bounded in-memory implementation of APICache.
+
+    Once either limit is exceeded, the least recently used entries are
+    evicted until the cache fits again. Expired entries are reclaimed
+    whenever new values are stored, not just when they are read. It is
+    safe to share an LRUCache between threads.
+
+    max_entries:
+        the maximum number of entries to hold.
+    max_bytes:
+        the maximum total size of the stored values. The size of a
+        string value is its length, that of a tuple the sum of its
+        items' sizes; other values are measured with sys.getsizeof().
+        Values larger than this are not stored.
+
+    The hits, misses, evictions and expirations attributes count what
+    their names say; stats() returns them along with the current size.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=256 * 1024 * 1024):
+        super(LRUCache, self).__init__()
+        # key: (value, expiration, size, tick of the last use)
+        self.cache = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # Heaps of (expiration, key) and (tick, key), with stale items
+        # skipped lazily. (No OrderedDict, to keep Python 2.6 support.)
+        self._expiry_heap = []
+        self._use_heap = []
+        self._ticks = itertools.count()
+        self._lock = threading.Lock()
+
+    def get_entry(self, key):
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expiration, size, _ = entry
+            if expiration < time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            # Mark as most recently used.
+            self._use(key, value, expiration, size)
+            self.hits += 1
+            return value, expiration
+
+    def put(self, key, value, duration):
+        now = time.time()
+        expiration = now + duration
+        size = _sizeof(value)
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
+            if size > self.max_bytes or expiration < now:
+                return
+            self._use(key, value, expiration, size)
+            self.bytes += size
+            heapq.heappush(self._expiry_heap, (expiration, key))
+            self._purge_expired(now)
+            while len(self.cache) > self.max_entries or self.bytes > self.max_bytes:
+                self._evict()
+
+    def entries(self):
+        now = time.time()
+        with self._lock:
+            items = list(self.cache.items())
+        for key, (value, expiration, _, _) in items:
+            if expiration >= now:
+                yield key, value, expiration
+
+    def purge_expired(self):
+        """Drop all expired entries now."""
+        with self._lock:
+            self._purge_expired(time.time())
+
+    def stats(self):
+        """Return a dict of the cache's counters and current size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self.cache),
+                'bytes': self.bytes,
+            }
+
+    def _use(self, key, value, expiration, size):
+        tick = next(self._ticks)
+        self.cache[key] = (value, expiration, size, tick)
+        heapq.heappush(self._use_heap, (tick, key))
+        # Each use leaves a stale item behind.
+        if len(self._use_heap) > 2 * len(self.cache) + 64:
+            self._use_heap = [(entry[3], k) for k, entry in self.cache.items()]
+            heapq.heapify(self._use_heap)
+
+    def _evict(self):
+        """Remove the least recently used entry."""
+        while True:
+            tick, key = heapq.heappop(self._use_heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry[3] == tick:
+                self._remove(key)
+                self.evictions += 1
+                return
+
+    def _remove(self, key):
+        size = self.cache.pop(key)[2]
+        self.bytes -= size
+
+    def _purge_expired(self, now):
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            expiration, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry[1] == expiration:
+                self._remove(key)
+                self.expirations += 1
+        # Evicted and replaced entries leave stale items behind.
+        if len(heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [(entry[1], key) for key, entry in self.cache.items()]
+            heapq.heapify(self._expiry_heap)
+
+
+def _sizeof(value):
+    if isinstance(value, (six.binary_type, six.text_type, mmap.mmap)):
+        return len(value)
+    if isinstance(value, tuple):
+        # e.g. the (expiry, response) entries stored with a CachePolicy
+        return sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
@@ -0,0 +1,83 @@
+"""Compact, pickle-free serialization of cached payloads.
+
+Cached API responses are raw XML bytes, so they are stored as-is (or
+compressed), behind a two-byte header: a format version byte and a
+codec byte. Anything other than a byte string is stored with marshal.
+Data without the header is assumed to be a pickle written by older
+versions of EVELink, and is unpickled so existing caches stay readable.
+"""
+
+import marshal
+import mmap
+import pickle
+import zlib
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+from evelink.thirdparty import six
+
+FORMAT_VERSION = b'\x01'
+
+# Codec byte: the low bits select the compression, the MARSHAL bit is
+# set for values that aren't byte strings.
+_RAW = 0x00
+_ZLIB = 0x01
+_LZMA = 0x02
+_COMPRESSION_MASK = 0x0f
+_MARSHAL = 0x10
+
+_compressions = {
+    None: _RAW,
+    'zlib': _ZLIB,
+    'lzma': _LZMA,
+}
+
+
+def check_compression(compression):
+    """Raise ValueError if 'compression' isn't a supported method."""
+    if compression not in _compressions:
+        raise ValueError("Unknown compression method %r." % (compression,))
+    if compression == 'lzma' and lzma is None:
+        raise ValueError("lzma compression requires the lzma module.")
+
+
+def encode(value, compression=None):
+    """Serialize a value, optionally compressing it with zlib or lzma."""
+    codec = _compressions[compression]
+    if isinstance(value, six.binary_type):
+        body = value
+    elif isinstance(value, mmap.mmap):
+        # A large response spilled to disk by API.stream()
+        body = value[:]
+    else:
+        codec |= _MARSHAL
+        body = marshal.dumps(value)
+
+    if codec & _COMPRESSION_MASK == _ZLIB:
+        body = zlib.compress(body)
+    elif codec & _COMPRESSION_MASK == _LZMA:
+        body = lzma.compress(body)
+    return FORMAT_VERSION + six.int2byte(codec) + body
+
+
+def decode(data):
+    """Deserialize data written by encode(), or a legacy pickle."""
+    if data[:1] != FORMAT_VERSION:
+        return pickle.loads(data)
+
+    codec = six.indexbytes(data, 1)
+    body = data[2:]
+    compression = codec & _COMPRESSION_MASK
+    if compression == _ZLIB:
+        body = zlib.decompress(body)
+    elif compression == _LZMA:
+        body = lzma.decompress(body)
+    elif compression != _RAW:
+        raise ValueError("Unknown payload codec %#x." % codec)
+
+    if codec & _MARSHAL:
+        return marshal.loads(body)
+    return body
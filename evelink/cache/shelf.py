@@ -1,10 +1,64 @@
-import shelve
+import pickle
+import struct
+import time
+
+try:
+    import dbm
+except ImportError:
+    # Python 2
+    import anydbm as dbm
 
 from evelink import api
+from evelink.cache import payload
+
+# Records start with this byte, followed by the expiration time as a
+# little-endian double and the encoded payload. Anything else is a
+# pickled (value, expiration) tuple written by shelve.
+_RECORD_VERSION = b'\x01'
+_expiration = struct.Struct('<d')
 
 class ShelveCache(api.APICache):
-    """An implementation of APICache using shelve."""
+    """An implementation of APICache using a shelve-compatible dbm file.
 
-    def __init__(self, path):
+    Responses are stored as raw bytes (see evelink.cache.payload),
+    compressed with 'zlib' or 'lzma' if 'compression' is given, rather
+    than pickled through shelve. Entries written through shelve by
+    older versions of EVELink can still be read.
+    """
+
+    def __init__(self, path, compression=None):
         super(ShelveCache, self).__init__()
-        self.cache = shelve.open(path)
+        payload.check_compression(compression)
+        self.compression = compression
+        self.cache = dbm.open(path, 'c')
+
+    def get_entry(self, key):
+        try:
+            data = self.cache[key]
+        except KeyError:
+            return None
+        entry = self._decode(data)
+        if entry[1] < time.time():
+            del self.cache[key]
+            return None
+        return entry
+
+    def entries(self):
+        now = time.time()
+        for key in self.cache.keys():
+            value, expiration = self._decode(self.cache[key])
+            if expiration >= now:
+                if isinstance(key, bytes):
+                    key = key.decode('utf-8')
+                yield key, value, expiration
+
+    def _decode(self, data):
+        if data[:1] == _RECORD_VERSION:
+            expiration, = _expiration.unpack_from(data, 1)
+            return payload.decode(data[1 + _expiration.size:]), expiration
+        return pickle.loads(data)
+
+    def put(self, key, value, duration):
+        expiration = time.time() + duration
+        self.cache[key] = (_RECORD_VERSION + _expiration.pack(expiration) +
+                           payload.encode(value, self.compression))
@@ -1,20 +1,42 @@
-import pickle
+import logging
+import threading
 import time
 import sqlite3
+import weakref
 
 from evelink import api
+from evelink.cache import payload
+
+_log = logging.getLogger('evelink.cache.sqlite')
 
 class SqliteCache(api.APICache):
-    """An implementation of APICache using sqlite."""
+    """An implementation of APICache using sqlite.
+
+    Responses are stored as raw bytes (see evelink.cache.payload),
+    compressed with 'zlib' or 'lzma' if 'compression' is given. Rows
+    pickled by older versions of EVELink can still be read.
+    """
 
-    def __init__(self, path):
+    def __init__(self, path, compression=None):
         super(SqliteCache, self).__init__()
-        self.connection = sqlite3.connect(path)
+        payload.check_compression(compression)
+        self.path = path
+        self.compression = compression
+        self.connection = self._connect()
         cursor = self.connection.cursor()
         cursor.execute('create table if not exists cache ("key" text primary key on conflict replace,'
                        'value blob, expiration integer)')
 
-    def get(self, key):
+    def _connect(self):
+        return sqlite3.connect(self.path)
+
+    def _dumps(self, value):
+        return sqlite3.Binary(payload.encode(value, self.compression))
+
+    def _loads(self, value):
+        return payload.decode(value)
+
+    def get_entry(self, key):
         cursor = self.connection.cursor()
         cursor.execute('select value, expiration from cache where "key"=?',(key,))
         result = cursor.fetchone()
@@ -26,12 +48,187 @@ class SqliteCache(api.APICache):
             self.connection.commit()
             return None
         cursor.close()
-        return pickle.loads(value)
+        return self._loads(value), expiration
+
+    def entries(self):
+        cursor = self.connection.cursor()
+        cursor.execute('select "key", value, expiration from cache where expiration >= ?'
+                       ' order by expiration', (time.time(),))
+        for key, value, expiration in cursor.fetchall():
+            yield key, self._loads(value), expiration
+        cursor.close()
 
     def put(self, key, value, duration):
         expiration = time.time() + duration
-        value_tuple = (key, sqlite3.Binary(pickle.dumps(value, 2)), expiration)
+        value_tuple = (key, self._dumps(value), expiration)
         cursor = self.connection.cursor()
         cursor.execute('insert into cache values (?, ?, ?)', value_tuple)
         self.connection.commit()
         cursor.close()
+
+
+class ConcurrentSqliteCache(SqliteCache):
+    """A SqliteCache that many threads and processes can share.
+
+    - The database runs in WAL mode, so readers and the writer don't
+      block each other.
+    - Each thread gets its own connection, closed when the thread exits.
+    - put() only queues entries; a background thread writes them in a
+      single transaction once 'flush_size' entries are pending or
+      'flush_interval' seconds have passed. Pending entries are visible
+      to get() from every thread of this process straight away.
+    - Expired rows are left for a purge that runs every
+      'purge_interval' seconds using an index on expiration, rather
+      than being deleted (and committed) one at a time on read.
+
+    Call close() to write out any pending entries before exiting.
+    """
+
+    def __init__(self, path, compression=None, flush_size=100,
+                 flush_interval=1.0, purge_interval=300, timeout=30):
+        self.timeout = timeout
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.purge_interval = purge_interval
+        self._local = threading.local()
+        # weakref to the _ThreadConnection of a thread: its connection
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        # Entries taken from _pending by the write in progress.
+        self._writing = {}
+        self._closed = False
+
+        super(ConcurrentSqliteCache, self).__init__(path, compression)
+        cursor = self.connection.cursor()
+        cursor.execute('create index if not exists cache_expiration on cache (expiration)')
+        self.connection.commit()
+        cursor.close()
+
+        self._last_purge = time.time()
+        self._writer = threading.Thread(target=self._write_behind)
+        self._writer.daemon = True
+        self._writer.start()
+
+    @property
+    def connection(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            self.connection = self._connect()
+            holder = self._local.holder
+        return holder.connection
+
+    @connection.setter
+    def connection(self, connection):
+        # The thread's locals, and so the holder, go away when it exits.
+        holder = self._local.holder = _ThreadConnection(connection)
+        with self._lock:
+            self._connections[weakref.ref(holder, self._thread_exited)] = connection
+
+    def _thread_exited(self, ref):
+        with self._lock:
+            connection = self._connections.pop(ref, None)
+        if connection is not None:
+            connection.close()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                     check_same_thread=False)
+        connection.execute('pragma journal_mode=wal')
+        # In WAL mode this only syncs at checkpoints, which is plenty
+        # for a cache.
+        connection.execute('pragma synchronous=normal')
+        return connection
+
+    def get_entry(self, key):
+        with self._lock:
+            pending = self._pending.get(key) or self._writing.get(key)
+        if pending is not None:
+            value, expiration = pending
+        else:
+            cursor = self.connection.cursor()
+            cursor.execute('select value, expiration from cache where "key"=?', (key,))
+            result = cursor.fetchone()
+            cursor.close()
+            if not result:
+                return None
+            value, expiration = result
+        if expiration < time.time():
+            return None
+        return self._loads(value), expiration
+
+    def entries(self):
+        self.flush()
+        return super(ConcurrentSqliteCache, self).entries()
+
+    def put(self, key, value, duration):
+        expiration = time.time() + duration
+        entry = (self._dumps(value), expiration)
+        with self._lock:
+            if self._closed:
+                raise ValueError("This cache has been closed.")
+            self._pending[key] = entry
+            if len(self._pending) >= self.flush_size:
+                self._flushed.notify_all()
+
+    def flush(self):
+        """Write out all pending entries now."""
+        with self._write_lock:
+            with self._lock:
+                self._writing, self._pending = self._pending, {}
+            try:
+                if self._writing:
+                    connection = self.connection
+                    with connection:
+                        connection.executemany('insert into cache values (?, ?, ?)',
+                            [(key, value, expiration)
+                             for key, (value, expiration) in self._writing.items()])
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def purge_expired(self):
+        """Delete all expired rows now."""
+        self._last_purge = time.time()
+        connection = self.connection
+        connection.execute('delete from cache where expiration < ?', (self._last_purge,))
+        connection.commit()
+
+    def close(self):
+        """Stop the writer thread, flush pending entries and disconnect."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flushed.notify_all()
+        self._writer.join()
+        self.flush()
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for connection in connections.values():
+            connection.close()
+
+    def _write_behind(self):
+        while True:
+            with self._lock:
+                if not self._closed and len(self._pending) < self.flush_size:
+                    self._flushed.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+                if time.time() - self._last_purge >= self.purge_interval:
+                    self.purge_expired()
+            except sqlite3.Error as e:
+                _log.warning("Failed to write to the sqlite cache: %s", e)
+
+
+class _ThreadConnection(object):
+    """Holds the connection of a thread, see ConcurrentSqliteCache."""
+
+    __slots__ = ('connection', '__weakref__')
+
+    def __init__(self, connection):
+        self.connection = connection
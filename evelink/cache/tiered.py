@@ -0,0 +1,58 @@
+import time
+
+from evelink import api
+from evelink.cache.lru import LRUCache
+
+class TieredCache(api.APICache):
+    """An APICache combining an in-memory first level with a persistent second.
+
+    Reads are served from the first level (L1) when possible. Second
+    level (L2) hits are promoted into L1 until they expire, and writes
+    go to both levels. This way most hits skip the disk read and the
+    payload decoding, while the cache still survives restarts.
+
+    l2:
+        the persistent cache, e.g. a SqliteCache or ShelveCache. It
+        must implement get_entry() (and entries(), to warm up L1).
+    l1:
+        Optional. The in-memory cache; a default LRUCache if omitted.
+    warm:
+        If True, load the unexpired L2 entries into L1 straight away,
+        so that a restarted process doesn't miss on everything.
+    """
+
+    def __init__(self, l2, l1=None, warm=False):
+        super(TieredCache, self).__init__()
+        self.l1 = l1 if l1 is not None else LRUCache()
+        self.l2 = l2
+        if warm:
+            self.warm()
+
+    def get_entry(self, key):
+        entry = self.l1.get_entry(key)
+        if entry is not None:
+            return entry
+        entry = self.l2.get_entry(key)
+        if entry is not None:
+            value, expiration = entry
+            self.l1.put(key, value, expiration - time.time())
+        return entry
+
+    def entries(self):
+        return self.l2.entries()
+
+    def put(self, key, value, duration):
+        self.l1.put(key, value, duration)
+        self.l2.put(key, value, duration)
+
+    def warm(self):
+        """Load the unexpired L2 entries into L1.
+
+        Returns the number of entries loaded.
+        """
+        count = 0
+        now = time.time()
+        for key, value, expiration in self.l2.entries():
+            self.l1.put(key, value, expiration - now)
+            count += 1
+        return count
@@ -1,6 +1,7 @@
 import collections
 
 from evelink import api, constants
+from evelink.parsing.assets import parse_asset_row
 from evelink.parsing.assets import parse_assets
 from evelink.parsing.bookmarks import parse_bookmarks
 from evelink.parsing.contact_list import parse_contact_list
@@ -12,9 +13,12 @@ from evelink.parsing.planetary_interactions import parse_planetary_colonies
 from evelink.parsing.planetary_interactions import parse_planetary_links
 from evelink.parsing.planetary_interactions import parse_planetary_pins
 from evelink.parsing.planetary_interactions import parse_planetary_routes
+from evelink.parsing.kills import parse_kill_row
 from evelink.parsing.kills import parse_kills
 from evelink.parsing.orders import parse_market_orders
 from evelink.parsing.wallet_journal import parse_wallet_journal
+from evelink.parsing.wallet_journal import parse_wallet_journal_row
+from evelink.parsing.wallet_transactions import parse_wallet_transaction_row
 from evelink.parsing.wallet_transactions import parse_wallet_transactions
 
 
@@ -68,6 +72,15 @@ class Char(object):
 
         return api.APIResult(parse_assets(api_result.result), api_result.timestamp, api_result.expires)
 
+    @auto_call('char/AssetList', map_params={'flat': 'flat'}, parse_row=parse_asset_row)
+    def assets_iter(self, flat=None, rows=None):
+        """Iterate over this character's assets without building them all in memory.
+
+        Yields the top level items, in the format described in assets(),
+        as the response is parsed. Items are not grouped by location.
+        """
+        return rows
+
     @auto_call('char/Bookmarks')
     def bookmarks(self, api_result=None):
         """Retrieves this character's bookmarks."""
@@ -93,6 +106,14 @@ class Char(object):
         """Returns a complete record of all wallet activity for a specified character"""
         return api.APIResult(parse_wallet_journal(api_result.result), api_result.timestamp, api_result.expires)
 
+    @auto_call('char/WalletJournal', map_params={'before_id': 'fromID', 'limit': 'rowCount'}, parse_row=parse_wallet_journal_row)
+    def wallet_journal_iter(self, before_id=None, limit=None, rows=None):
+        """Iterate over wallet_journal() entries, as the response is parsed.
+
+        Entries are yielded in the response's order, not sorted by id.
+        """
+        return rows
+
     @auto_call('char/AccountBalance')
     def wallet_info(self, api_result=None):
         """Return a given character's wallet."""
@@ -115,6 +136,11 @@ class Char(object):
         """Returns wallet transactions for a character."""
         return api.APIResult(parse_wallet_transactions(api_result.result), api_result.timestamp, api_result.expires)
 
+    @auto_call('char/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount'}, parse_row=parse_wallet_transaction_row)
+    def wallet_transactions_iter(self, before_id=None, limit=None, rows=None):
+        """Iterate over wallet_transactions() entries, as the response is parsed."""
+        return rows
+
     @auto_call('char/IndustryJobs')
     def industry_jobs(self, api_result=None):
         """Get a list of jobs for a character (active only)."""
@@ -164,6 +190,11 @@ class Char(object):
 
         return api.APIResult(parse_kills(api_result.result), api_result.timestamp, api_result.expires)
 
+    @auto_call('char/KillMails', map_params={'before_kill': 'beforeKillID'}, parse_row=parse_kill_row)
+    def kills_iter(self, before_kill=None, rows=None):
+        """Iterate over the kills() of a character, as the response is parsed."""
+        return rows
+
     @auto_call('char/KillLog', map_params={'before_kill': 'beforeKillID'})
     def kill_log(self, before_kill=None, api_result=None):
         """Look up recent kills for a character.
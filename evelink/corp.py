@@ -1,4 +1,5 @@
 from evelink import api, constants
+from evelink.parsing.assets import parse_asset_row
 from evelink.parsing.assets import parse_assets
 from evelink.parsing.bookmarks import parse_bookmarks
 from evelink.parsing.contact_list import parse_contact_list
@@ -6,9 +7,14 @@ from evelink.parsing.contract_bids import parse_contract_bids
 from evelink.parsing.contract_items import parse_contract_items
 from evelink.parsing.contracts import parse_contracts
 from evelink.parsing.industry_jobs import parse_industry_jobs
+from evelink.parsing.kills import parse_kill_row
 from evelink.parsing.kills import parse_kills
+from evelink.parsing.members import parse_member_row
+from evelink.parsing.members import parse_members
 from evelink.parsing.orders import parse_market_orders
 from evelink.parsing.wallet_journal import parse_wallet_journal
+from evelink.parsing.wallet_journal import parse_wallet_journal_row
+from evelink.parsing.wallet_transactions import parse_wallet_transaction_row
 from evelink.parsing.wallet_transactions import parse_wallet_transactions
 
 
@@ -147,6 +153,11 @@ class Corp(object):
 
         return api.APIResult(parse_kills(api_result.result), api_result.timestamp, api_result.expires)
 
+    @api.auto_call('corp/KillMails', map_params={'before_kill': 'beforeKillID'}, parse_row=parse_kill_row)
+    def kills_iter(self, before_kill=None, rows=None):
+        """Iterate over the kills() of a corporation, as the response is parsed."""
+        return rows
+
     @api.auto_call('corp/KillLog', map_params={'before_kill': 'beforeKillID'})
     def kill_log(self, before_kill=None, api_result=None):
         """Look up recent kills for a corporation.
@@ -180,11 +191,24 @@ class Corp(object):
         """Returns wallet journal for a corporation."""
         return api.APIResult(parse_wallet_journal(api_result.result), api_result.timestamp, api_result.expires)
 
+    @api.auto_call('corp/WalletJournal', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'}, parse_row=parse_wallet_journal_row)
+    def wallet_journal_iter(self, before_id=None, limit=None, account=None, rows=None):
+        """Iterate over wallet_journal() entries, as the response is parsed.
+
+        Entries are yielded in the response's order, not sorted by id.
+        """
+        return rows
+
     @api.auto_call('corp/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'})
     def wallet_transactions(self, before_id=None, limit=None, account=None, api_result=None):
         """Returns wallet transactions for a corporation."""
         return api.APIResult(parse_wallet_transactions(api_result.result), api_result.timestamp, api_result.expires)
 
+    @api.auto_call('corp/WalletTransactions', map_params={'before_id': 'fromID', 'limit': 'rowCount', 'account': 'accountKey'}, parse_row=parse_wallet_transaction_row)
+    def wallet_transactions_iter(self, before_id=None, limit=None, account=None, rows=None):
+        """Iterate over wallet_transactions() entries, as the response is parsed."""
+        return rows
+
     @api.auto_call('corp/MarketOrders')
     def orders(self, api_result=None):
         """Return a corporation's buy and sell orders."""
@@ -216,6 +240,15 @@ class Corp(object):
 
         return api.APIResult(parse_assets(api_result.result), api_result.timestamp, api_result.expires)
 
+    @api.auto_call('corp/AssetList', map_params={'flat': 'flat'}, parse_row=parse_asset_row)
+    def assets_iter(self, flat=None, rows=None):
+        """Iterate over corp assets without building them all in memory.
+
+        Yields the top level items, in the format described in assets(),
+        as the response is parsed. Items are not grouped by location.
+        """
+        return rows
+
     @api.auto_call('corp/Bookmarks')
     def bookmarks(self, api_result=None):
         """Retrieves this corp's bookmarks."""
@@ -461,45 +494,14 @@ class Corp(object):
                 args['extended'] = 1
             api_result = self.api.get('corp/MemberTracking', params=args)
 
-        rowset = api_result.result.find('rowset')
-        results = {}
-        for row in rowset.findall('row'):
-            a = row.attrib
-            member = {
-                'id': int(a['characterID']),
-                'name': a['name'],
-                'join_ts': api.parse_ts(a['startDateTime']),
-                'base': {
-                    # TODO(aiiane): Maybe remove this?
-                    # It doesn't seem to ever have a useful value.
-                    'id': int(a['baseID']),
-                    'name': a['base'],
-                },
-                # Note that title does not include role titles,
-                # only ones like 'CEO'
-                'title': a['title'],
-            }
-            if extended:
-                member.update({
-                    'logon_ts': api.parse_ts(a['logonDateTime']),
-                    'logoff_ts': api.parse_ts(a['logoffDateTime']),
-                    'location': {
-                        'id': int(a['locationID']),
-                        'name': a['location'],
-                    },
-                    'ship_type': {
-                        # "Not available" = -1 ship id; we change to None
-                        'id': max(int(a['shipTypeID']), 0) or None,
-                        'name': a['shipType'] or None,
-                    },
-                    'roles': int(a['roles']),
-                    'can_grant': int(a['grantableRoles']),
-                })
-
-            results[member['id']] = member
-
+        results = parse_members(api_result.result, extended)
         return api.APIResult(results, api_result.timestamp, api_result.expires)
 
+    @api.auto_call('corp/MemberTracking', map_params={'extended': 'extended'}, parse_row=parse_member_row)
+    def members_iter(self, extended=True, rows=None):
+        """Iterate over members() entries, as the response is parsed."""
+        return rows
+
     @api.auto_call('corp/MemberSecurity')
     def permissions(self, api_result=None):
         """Returns information about corporation member permissions."""
@@ -0,0 +1,152 @@
+"""APIObservers, notified of every call an API makes.
+
+    stats = evelink.observers.EndpointStats()
+    eve_api = evelink.api.API(observers=[stats])
+    ...
+    print(stats.summary()['char/AssetList']['hit_ratio'])
+"""
+
+import bisect
+import collections
+import threading
+
+from evelink import api
+
+# Upper bounds, in seconds, of the buckets of latency histograms.
+DEFAULT_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                  0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram(object):
+    """Counts of values falling into fixed buckets.
+
+    Bucket i holds the values up to bounds[i] (and above bounds[i-1]);
+    a last bucket holds the values above all bounds.
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = None
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p):
+        """An upper bound of the p-th percentile: that of its bucket.
+
+        Values in the last bucket are bounded by the largest value.
+        """
+        if not self.count:
+            return None
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+
+class _Endpoint(object):
+    """The statistics EndpointStats keeps for one path."""
+
+    def __init__(self, bounds):
+        self.calls = 0
+        # Not collections.Counter, for Python 2.6.
+        self.cache = collections.defaultdict(int)
+        self.errors = collections.defaultdict(int)
+        self.bytes = 0
+        self.latency = Histogram(bounds)
+        self.network = Histogram(bounds)
+        self.parse = Histogram(bounds)
+        self.result = Histogram(bounds)
+
+    def add(self, event):
+        self.calls += 1
+        self.cache[event.cache] += 1
+        if event.error is not None:
+            self.errors[event.error_code or type(event.error).__name__] += 1
+        self.bytes += event.bytes or 0
+        for histogram, value in ((self.latency, event.total_time),
+                                 (self.network, event.network_time),
+                                 (self.parse, event.parse_time),
+                                 (self.result, event.result_time)):
+            if value is not None:
+                histogram.add(value)
+
+    def summary(self, percentiles):
+        served = sum(self.cache.get(k, 0) for k in ('hit', 'stale', 'result'))
+        lookups = served + self.cache.get('miss', 0)
+        return {
+            'calls': self.calls,
+            'cache': dict((k, v) for k, v in self.cache.items() if k is not None),
+            'hit_ratio': served / float(lookups) if lookups else None,
+            'errors': dict(self.errors),
+            'bytes': self.bytes,
+            'latency': dict(('p%g' % p, self.latency.percentile(p))
+                            for p in percentiles),
+            'max_latency': self.latency.max,
+            'mean_network_time': self.network.mean,
+            'mean_parse_time': self.parse.mean,
+            'mean_result_time': self.result.mean,
+        }
+
+
+class EndpointStats(api.APIObserver):
+    """Keeps latency histograms and cache hit ratios per API path.
+
+    Call times go into Histograms with the given bucket bounds; see
+    summary(). Instances can be shared by API instances and threads.
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = bounds
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def observe(self, event):
+        with self._lock:
+            endpoint = self._endpoints.get(event.path)
+            if endpoint is None:
+                endpoint = self._endpoints[event.path] = _Endpoint(self.bounds)
+            endpoint.add(event)
+
+    def histogram(self, path):
+        """The Histogram of the total times of calls to 'path'."""
+        with self._lock:
+            endpoint = self._endpoints.get(path)
+            return endpoint.latency if endpoint is not None else None
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """A dict of statistics for each path called, holding:
+
+        - 'calls', 'bytes': the number of calls and bytes received;
+        - 'cache': the number of calls per CallEvent.cache value;
+        - 'hit_ratio': the share of calls not coalesced with another
+          that were served from a cache (None if there are none);
+        - 'errors': the number of errors per APIError code (or
+          exception class name);
+        - 'latency': the (upper bounds of the) percentiles of the
+          calls' total times, keyed 'p50' etc., and 'max_latency';
+        - 'mean_network_time', 'mean_parse_time', 'mean_result_time':
+          the mean times of the calls' phases, over the calls that
+          went through them.
+        """
+        with self._lock:
+            return dict((path, endpoint.summary(percentiles))
+                        for path, endpoint in self._endpoints.items())
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
@@ -1,24 +1,50 @@
-def parse_assets(api_result):
-    def handle_rowset(rowset, parent_location):
-        results = []
-        for row in rowset.findall('row'):
-            item = {'id': int(row.attrib['itemID']),
-                    'item_type_id': int(row.attrib['typeID']),
-                    'location_id': int(row.attrib.get('locationID', parent_location)),
-                    'location_flag': int(row.attrib['flag']),
-                    'quantity': int(row.attrib['quantity']),
-                    'packaged': row.attrib['singleton'] == '0',
-            }
-            raw_quantity = row.attrib.get('rawQuantity')
-            if raw_quantity is not None:
-                item['raw_quantity'] = int(raw_quantity)
-            contents = row.find('rowset')
-            if contents is not None:
-                item['contents'] = handle_rowset(contents, item['location_id'])
-            results.append(item)
-        return results
+from evelink.parsing import lazy
+
+def _lazy_asset_row(row, parent_location):
+    # Contents inherit the location of their container.
+    location = int(row.attrib.get('locationID', parent_location))
+    return lazy.LazyRow(row, _fields, {'location_id': location})
+
+def _contents(row):
+    return [_lazy_asset_row(r, row['location_id'])
+            for r in row.elem.find('rowset').findall('row')]
+
+_fields = lazy.Fields(
+    ('id', lazy.attr('itemID', int)),
+    ('item_type_id', lazy.attr('typeID', int)),
+    ('location_id', lazy.attr('locationID', int)),
+    ('location_flag', lazy.attr('flag', int)),
+    ('quantity', lazy.attr('quantity', int)),
+    ('packaged', lambda row: row.elem.attrib['singleton'] == '0'),
+    ('raw_quantity', lazy.attr('rawQuantity', int), lazy.has_attr('rawQuantity')),
+    ('contents', _contents, lambda elem: elem.find('rowset') is not None),
+)
 
-    result_list = handle_rowset(api_result.find('rowset'), None)
+def parse_asset_row(row, parent_location=None):
+    """Parse a single asset row, and the contents of containers."""
+    if lazy.enabled:
+        return _lazy_asset_row(row, parent_location)
+
+    item = {'id': int(row.attrib['itemID']),
+            'item_type_id': int(row.attrib['typeID']),
+            'location_id': int(row.attrib.get('locationID', parent_location)),
+            'location_flag': int(row.attrib['flag']),
+            'quantity': int(row.attrib['quantity']),
+            'packaged': row.attrib['singleton'] == '0',
+    }
+    raw_quantity = row.attrib.get('rawQuantity')
+    if raw_quantity is not None:
+        item['raw_quantity'] = int(raw_quantity)
+    contents = row.find('rowset')
+    if contents is not None:
+        item['contents'] = [parse_asset_row(r, item['location_id'])
+                            for r in contents.findall('row')]
+    return item
+
+
+def parse_assets(api_result):
+    result_list = [parse_asset_row(row)
+                   for row in api_result.find('rowset').findall('row')]
     # For convenience, key the result by top-level location ID.
     result_dict = {}
     for item in result_list:
@@ -0,0 +1,105 @@
+"""XML backends the API parses responses with.
+
+A backend provides fromstring(data), returning the root element of a
+document, and iterparse(source, events), iterating over (event, element)
+pairs like ElementTree.iterparse. Elements support the parts of the
+ElementTree Element interface the parsers use: tag, attrib, text, get,
+find, findall, findtext, iter, iteration, len and remove.
+
+Backends (see get):
+
+    'etree': xml.etree.ElementTree (its C implementation where
+        available).
+    'lxml': lxml.etree, if it is installed.
+
+All backends raise ParseError (ElementTree's) for malformed documents.
+"""
+
+from xml.etree import ElementTree
+import xml.parsers.expat
+
+from evelink.thirdparty import six
+
+try:
+    import lxml.etree
+except ImportError:
+    lxml = None
+
+# Python 2.6's ElementTree raises xml.parsers.expat.ExpatError instead
+# of ElementTree.ParseError
+ParseError = getattr(ElementTree, 'ParseError', xml.parsers.expat.ExpatError)
+
+def _parse_error(e):
+    """Turn another library's parse error into a ParseError."""
+    error = ParseError(str(e))
+    error.code = getattr(e, 'code', None)
+    error.position = getattr(e, 'position', None)
+    return error
+
+
+class ElementTreeBackend(object):
+    """Parses with xml.etree.ElementTree."""
+
+    name = 'etree'
+
+    def fromstring(self, data):
+        return ElementTree.fromstring(data)
+
+    def iterparse(self, source, events=('end',)):
+        return ElementTree.iterparse(source, events=events)
+
+
+class LxmlBackend(object):
+    """Parses with lxml.etree."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        if lxml is None:
+            raise ValueError("The lxml backend requires lxml to be installed.")
+        self._parser = lxml.etree.XMLParser(
+            resolve_entities=False, no_network=True)
+
+    def fromstring(self, data):
+        # lxml refuses text with an encoding declaration.
+        if isinstance(data, six.text_type):
+            data = data.encode('utf-8')
+        elif not isinstance(data, bytes):
+            data = data[:]
+        try:
+            return lxml.etree.fromstring(data, self._parser)
+        except lxml.etree.XMLSyntaxError as e:
+            raise _parse_error(e)
+
+    def iterparse(self, source, events=('end',)):
+        try:
+            for item in lxml.etree.iterparse(source, events=events,
+                                             resolve_entities=False,
+                                             no_network=True):
+                yield item
+        except lxml.etree.XMLSyntaxError as e:
+            raise _parse_error(e)
+
+
+_backends = {
+    'etree': ElementTreeBackend,
+    'lxml': LxmlBackend,
+}
+
+
+def get(backend=None):
+    """Return a backend instance.
+
+    backend:
+        a backend instance (returned as is), the name of one, or None
+        for lxml if it is installed and ElementTree otherwise.
+    """
+    if backend is None:
+        backend = 'etree' if lxml is None else 'lxml'
+    if not isinstance(backend, six.string_types):
+        return backend
+    try:
+        factory = _backends[backend]
+    except KeyError:
+        raise ValueError("Unknown XML backend: %r" % backend)
+    return factory()
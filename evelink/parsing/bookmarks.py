@@ -1,34 +1,37 @@
 from evelink import api
+from evelink.parsing.schema import Field, Schema
+
+_folder_schema = Schema(
+    Field('id', 'folderID', int),
+    Field('name', 'folderName'), # "" = toplevel
+)
+
+_bookmark_schema = Schema(
+    Field('id', 'bookmarkID', int),
+    Field('name', 'memo'),
+    Field('creator_id', 'creatorID', int),
+    Field('created_ts', 'created', api.parse_ts),
+    Field('item_id', 'itemID', int),
+    Field('type_id', 'typeID', int),
+    Field('location_id', 'locationID', int),
+    Field('x', 'x', float),
+    Field('y', 'y', float),
+    Field('z', 'z', float),
+    Field('note', 'note'),
+)
 
 def parse_bookmarks(api_results):
+    decode = _bookmark_schema.decoder()
     result = {}
     folders = api_results.find('rowset')
     for row in folders.findall('row'):
-        a = row.attrib
-        folder_id = int(a['folderID'])
-        folder = {
-            'id': folder_id,
-            'name': a['folderName'], # "" = toplevel
-            'bookmarks': {},
-        }
+        folder = _folder_schema.decode(row)
+        folder['bookmarks'] = {}
         bookmarks = row.find('rowset')
         for row in bookmarks.findall('row'):
-            a = row.attrib
-            bookmark_id = int(a['bookmarkID'])
-            folder['bookmarks'][bookmark_id] = {
-                'id': bookmark_id,
-                'name': a['memo'],
-                'creator_id': int(a['creatorID']),
-                'created_ts': api.parse_ts(a['created']),
-                'item_id': int(a['itemID']),
-                'type_id': int(a['typeID']),
-                'location_id': int(a['locationID']),
-                'x': float(a['x']),
-                'y': float(a['y']),
-                'z': float(a['z']),
-                'note': a['note'],
-            }
-        result[folder_id] = folder
+            bookmark = decode(row)
+            folder['bookmarks'][bookmark['id']] = bookmark
+        result[folder['id']] = folder
     return result
 
 # vim: set ts=4 sts=4 sw=4 et:
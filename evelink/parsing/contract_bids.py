@@ -1,21 +1,15 @@
 from evelink import api
+from evelink.parsing.schema import Field, Schema
 
-def parse_contract_bids(api_result):
-    rowset = api_result.find('rowset')
-    results = []
-    for row in rowset.findall('row'):
-        a = row.attrib
-
-        bid = {
-            'id': int(a['bidID']),
-            'contract_id': int(a['contractID']),
-            'bidder_id': int(a['bidderID']),
-            'timestamp': api.parse_ts(a['dateBid']),
-            'amount': float(a['amount']),
-        }
-
-        results.append(bid)
-
-    return results
-
+_schema = Schema(
+    Field('id', 'bidID', int),
+    Field('contract_id', 'contractID', int),
+    Field('bidder_id', 'bidderID', int),
+    Field('timestamp', 'dateBid', api.parse_ts),
+    Field('amount', 'amount', float),
+)
 
+def parse_contract_bids(api_result, fields=None):
+    rowset = api_result.find('rowset')
+    decode = _schema.decoder(fields)
+    return [decode(row) for row in rowset.findall('row')]
@@ -1,19 +1,15 @@
-def parse_contract_items(api_result):
-    rowset = api_result.find('rowset')
-    results = []
-    for row in rowset.findall('row'):
-        a = row.attrib
-        item = {
-            'id': int(a['recordID']),
-            'type_id': int(a['typeID']),
-            'quantity': int(a['quantity']),
-            'singleton': a['singleton'] == '1',
-            'action': 'offered' if a['included'] == '1' else 'requested',
-        }
-        if 'rawQuantity' in a:
-          item['raw_quantity'] = int(a['rawQuantity'])
-
-        results.append(item)
+from evelink.parsing.schema import Computed, Field, Schema
 
-    return results
+_schema = Schema(
+    Field('id', 'recordID', int),
+    Field('type_id', 'typeID', int),
+    Field('quantity', 'quantity', int),
+    Computed('singleton', lambda a: a['singleton'] == '1'),
+    Computed('action', lambda a: 'offered' if a['included'] == '1' else 'requested'),
+    Field('raw_quantity', 'rawQuantity', int, optional=True),
+)
 
+def parse_contract_items(api_result, fields=None):
+    rowset = api_result.find('rowset')
+    decode = _schema.decoder(fields)
+    return [decode(row) for row in rowset.findall('row')]
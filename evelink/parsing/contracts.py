@@ -1,38 +1,39 @@
 from evelink import api
 from evelink import constants
+from evelink.parsing.schema import Computed, Field, Schema
 import time
 
-def parse_contracts(api_result):
+_schema = Schema(
+    Field('id', 'contractID', int),
+    Field('issuer', 'issuerID', int),
+    Field('issuer_corp', 'issuerCorpID', int),
+    Field('assignee', 'assigneeID', int),
+    Field('acceptor', 'acceptorID', int),
+    Field('start', 'startStationID', int),
+    Field('end', 'endStationID', int),
+    Field('type', 'type'),
+    Field('status', 'status'),
+    Computed('corp', lambda a: a['forCorp'] == '1'),
+    Field('availability', 'availability'),
+    Field('issued', 'dateIssued', api.parse_ts),
+    Field('days', 'numDays', int),
+    Field('price', 'price', float),
+    Field('reward', 'reward', float),
+    Field('collateral', 'collateral', float),
+    Field('buyout', 'buyout', float),
+    Field('volume', 'volume', float),
+    Field('title', 'title'),
+    Field('expired', 'dateExpired', api.parse_ts),
+    Field('accepted', 'dateAccepted', api.parse_ts),
+    Field('completed', 'dateCompleted', api.parse_ts),
+)
+
+def parse_contracts(api_result, fields=None):
     rowset = api_result.find('rowset')
     if rowset is None:
         return
-
+    decode = _schema.decoder(fields)
     results = {}
     for row in rowset.findall('row'):
-        a = row.attrib
-        contract = {
-            'id': int(a['contractID']),
-            'issuer': int(a['issuerID']),
-            'issuer_corp': int(a['issuerCorpID']),
-            'assignee': int(a['assigneeID']),
-            'acceptor': int(a['acceptorID']),
-            'start': int(a['startStationID']),
-            'end': int(a['endStationID']),
-            'type': a['type'],
-            'status': a['status'],
-            'corp': a['forCorp'] == '1',
-            'availability': a['availability'],
-            'issued': api.parse_ts(a['dateIssued']),
-            'days': int(a['numDays']),
-            'price': float(a['price']),
-            'reward': float(a['reward']),
-            'collateral': float(a['collateral']),
-            'buyout': float(a['buyout']),
-            'volume': float(a['volume']),
-            'title': a['title']
-        }
-        contract['expired'] = api.parse_ts(a['dateExpired'])
-        contract['accepted'] = api.parse_ts(a['dateAccepted'])
-        contract['completed'] = api.parse_ts(a['dateCompleted'])
-        results[contract['id']] = contract
+        results[int(row.attrib['contractID'])] = decode(row)
     return results
@@ -1,56 +1,56 @@
 from evelink import api
 from evelink import constants
+from evelink.parsing.schema import Computed, Field, Group, Schema
 
-def parse_industry_jobs(api_result):
+_schema = Schema(
+    Field('activity_id', 'activityID', int),
+    Group('blueprint',
+        Field('id', 'blueprintID', int),
+        Field('location_id', 'blueprintLocationID', int),
+        Group('type',
+            Field('id', 'blueprintTypeID', int),
+            Field('name', 'blueprintTypeName'),
+        ),
+    ),
+    Computed('completed', lambda a: a['completedCharacterID'] != '0'),
+    Field('complete_ts', 'completedDate', api.parse_ts),
+    Field('completor_id', 'completedCharacterID', int),
+    Field('cost', 'cost', float),
+    Field('end_ts', 'endDate', api.parse_ts),
+    Field('facility_id', 'facilityID', int),
+    Group('installer',
+        Field('id', 'installerID', int),
+        Field('name', 'installerName'),
+    ),
+    Group('product',
+        Field('type_id', 'productTypeID', int),
+        Field('location_id', 'outputLocationID', int),
+        Field('name', 'productTypeName'),
+        Field('probability', 'probability', float),
+    ),
+    Field('runs', 'runs', int),
+    Field('licensed_runs', 'licensedRuns', int),
+    Field('pause_ts', 'pauseDate', api.parse_ts),
+    Group('system',
+        Field('id', 'solarSystemID', int),
+        Field('name', 'solarSystemName'),
+    ),
+    Field('station_id', 'stationID', int),
+    Field('begin_ts', 'startDate', api.parse_ts),
+    Field('status', 'status', int),
+    Field('team_id', 'teamID', int),
+    Field('duration', 'timeInSeconds', int),
+)
+
+def parse_industry_jobs(api_result, fields=None):
         rowset = api_result.find('rowset')
         result = {}
 
         if rowset is None:
             return
 
+        decode = _schema.decoder(fields)
         for row in rowset.findall('row'):
-            # shortcut to make the following block less painful
-            a = row.attrib
-            jobID = int(a['jobID'])
-            completed = a['completedCharacterID'] != '0'
-            result[jobID] = {
-                'activity_id': int(a['activityID']),
-                'blueprint': {
-                    'id': int(a['blueprintID']),
-                    'location_id': int(a['blueprintLocationID']),
-                    'type': {
-                        'id': int(a['blueprintTypeID']),
-                        'name': a['blueprintTypeName'],
-                    },
-                },
-                'completed': completed,
-                'complete_ts': api.parse_ts(a['completedDate']),
-                'completor_id': int(a['completedCharacterID']),
-                'cost': float(a['cost']),
-                'end_ts': api.parse_ts(a['endDate']),
-                'facility_id': int(a['facilityID']),
-                'installer': {
-                    'id': int(a['installerID']),
-                    'name': a['installerName'],
-                },
-                'product': {
-                    'type_id': int(a['productTypeID']),
-                    'location_id': int(a['outputLocationID']),
-                    'name': a['productTypeName'],
-                    'probability': float(a['probability']),
-                },
-                'runs': int(a['runs']),
-                'licensed_runs': int(a['licensedRuns']),
-                'pause_ts': api.parse_ts(a['pauseDate']),
-                'system': {
-                    'id': int(a['solarSystemID']),
-                    'name': a['solarSystemName'],
-                },
-                'station_id': int(a['stationID']),
-                'begin_ts': api.parse_ts(a['startDate']),
-                'status': int(a['status']),
-                'team_id': int(a['teamID']),
-                'duration': int(a['timeInSeconds']),
-            }
+            result[int(row.attrib['jobID'])] = decode(row)
 
         return result
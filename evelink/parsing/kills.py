@@ -1,92 +1,88 @@
 from evelink import api
+from evelink.parsing.schema import Computed, Field, Group, Schema
 
-def parse_kills(api_result):
-    rowset = api_result.find('rowset')
-    result = {}
-    for row in rowset.findall('row'):
-        a = row.attrib
-        kill_id = int(a['killID'])
-        result[kill_id] = {
-            'id': kill_id,
-            'system_id': int(a['solarSystemID']),
-            'time': api.parse_ts(a['killTime']),
-            'moon_id': int(a['moonID']),
-        }
+_kill_schema = Schema(
+    Field('id', 'killID', int),
+    Field('system_id', 'solarSystemID', int),
+    Field('time', 'killTime', api.parse_ts),
+    Field('moon_id', 'moonID', int),
+)
+
+_character_fields = (
+    Field('id', 'characterID', int),
+    Field('name', 'characterName'),
+    Group('corp',
+        Field('id', 'corporationID', int),
+        Field('name', 'corporationName'),
+    ),
+    Group('alliance',
+        Field('id', 'allianceID', int),
+        Field('name', 'allianceName'),
+    ),
+    Group('faction',
+        Field('id', 'factionID', int),
+        Field('name', 'factionName'),
+    ),
+)
+
+_victim_schema = Schema(*_character_fields + (
+    Field('damage', 'damageTaken', int),
+    Field('ship_type_id', 'shipTypeID', int),
+    Field('x', 'x', float),
+    Field('y', 'y', float),
+    Field('z', 'z', float),
+))
 
-        victim = row.find('victim')
-        a = victim.attrib
-        result[kill_id]['victim'] = {
-            'id': int(a['characterID']),
-            'name': a['characterName'],
-            'corp': {
-                'id': int(a['corporationID']),
-                'name': a['corporationName'],
-            },
-            'alliance': {
-                'id': int(a['allianceID']),
-                'name': a['allianceName'],
-            },
-            'faction': {
-                'id': int(a['factionID']),
-                'name': a['factionName'],
-            },
-            'damage': int(a['damageTaken']),
-            'ship_type_id': int(a['shipTypeID']),
-            'x': float(a['x']),
-            'y': float(a['y']),
-            'z': float(a['z']),
-        }
+_attacker_schema = Schema(*_character_fields + (
+    Field('sec_status', 'securityStatus', float),
+    Field('damage', 'damageDone', int),
+    Computed('final_blow', lambda a: a['finalBlow'] == '1'),
+    Field('weapon_type_id', 'weaponTypeID', int),
+    Field('ship_type_id', 'shipTypeID', int),
+))
 
-        result[kill_id]['attackers'] = {}
+_item_schema = Schema(
+    Field('id', 'typeID', int),
+    Field('flag', 'flag', int),
+    Field('dropped', 'qtyDropped', int),
+    Field('destroyed', 'qtyDestroyed', int),
+)
 
-        rowsets = {}
-        for rowset in row.findall('rowset'):
-            key = rowset.attrib['name']
-            rowsets[key] = rowset
+def _get_items(rowset, decode):
+    items = []
+    for item in rowset.findall('row'):
+        items.append(decode(item))
+        # Container contents follow the container.
+        for container in item.findall('rowset'):
+            items.extend(_get_items(container, decode))
+    return items
 
-        for attacker in rowsets['attackers'].findall('row'):
-            a = attacker.attrib
-            attacker_id = int(a['characterID'])
-            result[kill_id]['attackers'][attacker_id] = {
-                'id': attacker_id,
-                'name': a['characterName'],
-                'corp': {
-                    'id': int(a['corporationID']),
-                    'name': a['corporationName'],
-                },
-                'alliance': {
-                    'id': int(a['allianceID']),
-                    'name': a['allianceName'],
-                },
-                'faction': {
-                    'id': int(a['factionID']),
-                    'name': a['factionName'],
-                },
-                'sec_status': float(a['securityStatus']),
-                'damage': int(a['damageDone']),
-                'final_blow': a['finalBlow'] == '1',
-                'weapon_type_id': int(a['weaponTypeID']),
-                'ship_type_id': int(a['shipTypeID']),
-            }
 
-        def _get_items(rowset):
-            items = []
-            for item in rowset.findall('row'):
-                a = item.attrib
-                type_id = int(a['typeID'])
-                items.append({
-                    'id': type_id,
-                    'flag': int(a['flag']),
-                    'dropped': int(a['qtyDropped']),
-                    'destroyed': int(a['qtyDestroyed']),
-                })
+def parse_kill_row(row):
+    """Parse a single kill row, with its victim, attackers and items."""
+    kill = _kill_schema.decode(row)
+    kill['victim'] = _victim_schema.decode(row.find('victim'))
 
-                containers = item.findall('rowset')
-                for container in containers:
-                    items.extend(_get_items(container))
+    rowsets = {}
+    for rowset in row.findall('rowset'):
+        key = rowset.attrib['name']
+        rowsets[key] = rowset
 
-            return items
+    decode = _attacker_schema.decoder()
+    kill['attackers'] = {}
+    for attacker in rowsets['attackers'].findall('row'):
+        attacker = decode(attacker)
+        kill['attackers'][attacker['id']] = attacker
 
-        result[kill_id]['items'] = _get_items(rowsets['items'])
+    kill['items'] = _get_items(rowsets['items'], _item_schema.decoder())
 
+    return kill
+
+
+def parse_kills(api_result):
+    rowset = api_result.find('rowset')
+    result = {}
+    for row in rowset.findall('row'):
+        kill = parse_kill_row(row)
+        result[kill['id']] = kill
     return result
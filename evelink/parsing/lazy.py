@@ -0,0 +1,135 @@
+"""Lazily decoded rows.
+
+With lazy rows enabled, the parsers that support them return, for each
+row, a LazyRow instead of a dict: a mapping with the same keys, which
+only converts a field from the row's XML attributes when it is first
+accessed, and remembers the converted value.
+
+Enable them with:
+
+    import evelink.parsing.lazy
+    evelink.parsing.lazy.enabled = True
+
+LazyRows compare equal to the matching dicts, and can be modified like
+them. They are not dicts though: use dict(row) where one is required
+(e.g. for json.dumps). Results holding LazyRows are never stored in an
+API's result cache, as marshal can't serialize them.
+"""
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
+
+# Whether parsers supporting lazy rows should return them.
+enabled = False
+
+
+def attr(name, convert=None):
+    """Decoder reading the 'name' attribute, converted with 'convert'."""
+    if convert is None:
+        return lambda row: row.elem.attrib[name]
+    return lambda row: convert(row.elem.attrib[name])
+
+
+def has_attr(name):
+    """Predicate for fields only present when the 'name' attribute is."""
+    return lambda elem: name in elem.attrib
+
+
+def group(fields):
+    """Decoder for a nested group of fields of the same row."""
+    return lambda row: LazyRow(row.elem, fields)
+
+
+class Fields(object):
+    """The fields of a kind of row.
+
+    Each field is a (key, decode) or (key, decode, present) tuple, where
+    decode(row) returns the value of the field from the LazyRow row, and
+    present(elem), if given, tells whether the field exists for the
+    row element elem.
+    """
+
+    __slots__ = ('keys', 'decoders', 'optional')
+
+    def __init__(self, *fields):
+        self.keys = tuple(field[0] for field in fields)
+        self.decoders = dict((field[0], field[1]) for field in fields)
+        self.optional = dict(
+            (field[0], field[2]) for field in fields if len(field) > 2)
+
+
+class LazyRow(MutableMapping):
+    """A mapping over a row element, decoding its fields on access."""
+
+    __slots__ = ('elem', '_fields', '_values')
+
+    def __init__(self, elem, fields, values=None):
+        self.elem = elem
+        self._fields = fields
+        self._values = values or {}
+
+    def _present(self, key):
+        present = self._fields.optional.get(key)
+        return present is None or present(self.elem)
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            if self._fields is None or key not in self._fields.decoders:
+                raise
+        if not self._present(key):
+            raise KeyError(key)
+        value = self._values[key] = self._fields.decoders[key](self)
+        return value
+
+    def __contains__(self, key):
+        if key in self._values:
+            return True
+        if self._fields is None or key not in self._fields.decoders:
+            return False
+        return self._present(key)
+
+    def __iter__(self):
+        if self._fields is None:
+            return iter(self._values)
+        return (key for key in self._fields.keys if self._present(key))
+
+    def __len__(self):
+        if self._fields is None:
+            return len(self._values)
+        return sum(1 for _ in self)
+
+    def _materialize(self):
+        """Decode all fields, from then on behaving like a plain dict."""
+        if self._fields is not None:
+            self._values = dict((key, self[key]) for key in self)
+            self._fields = None
+
+    def __setitem__(self, key, value):
+        self._materialize()
+        self._values[key] = value
+
+    def __delitem__(self, key):
+        self._materialize()
+        del self._values[key]
+
+    def __eq__(self, other):
+        if isinstance(other, (dict, LazyRow)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'LazyRow(%r)' % dict(self.items())
+
+    def __reduce__(self):
+        # Rows are pickled as the plain dicts they stand for.
+        return (dict, (dict(self.items()),))
@@ -0,0 +1,59 @@
+from evelink import api
+from evelink.parsing.schema import Computed, Field, Group, Schema
+
+_basic_fields = (
+    Field('id', 'characterID', int),
+    Field('name', 'name'),
+    Field('join_ts', 'startDateTime', api.parse_ts),
+    # TODO(aiiane): Maybe remove this?
+    # It doesn't seem to ever have a useful value.
+    Group('base',
+        Field('id', 'baseID', int),
+        Field('name', 'base'),
+    ),
+    # Note that title does not include role titles,
+    # only ones like 'CEO'
+    Field('title', 'title'),
+)
+
+_schema = Schema(*_basic_fields, lazy=True)
+
+_extended_schema = Schema(*_basic_fields + (
+    Field('logon_ts', 'logonDateTime', api.parse_ts),
+    Field('logoff_ts', 'logoffDateTime', api.parse_ts),
+    Group('location',
+        Field('id', 'locationID', int),
+        Field('name', 'location'),
+    ),
+    Group('ship_type',
+        # "Not available" = -1 ship id; we change to None
+        Computed('id', lambda a: max(int(a['shipTypeID']), 0) or None),
+        Computed('name', lambda a: a['shipType'] or None),
+    ),
+    Field('roles', 'roles', int),
+    Field('can_grant', 'grantableRoles', int),
+), lazy=True)
+
+def parse_member_row(row, extended=None, fields=None):
+    """Parse a single corporation member tracking row.
+
+    extended:
+        whether the row has the extended fields; by default, this is
+        told from the row itself.
+    fields:
+        if given, only these keys are decoded (see Schema.decoder).
+    """
+    if extended is None:
+        extended = 'logonDateTime' in row.attrib
+    schema = _extended_schema if extended else _schema
+    return schema.decode(row, fields)
+
+
+def parse_members(api_result, extended=True, fields=None):
+    rowset = api_result.find('rowset')
+    schema = _extended_schema if extended else _schema
+    decode = schema.decoder(fields)
+    results = {}
+    for row in rowset.findall('row'):
+        results[int(row.attrib['characterID'])] = decode(row)
+    return results
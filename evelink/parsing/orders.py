@@ -1,28 +1,32 @@
 from evelink import api
 from evelink import constants
+from evelink.parsing.schema import Computed, Field, Schema
 
-def parse_market_orders(api_result):
+_order_status = constants.Market.order_status
+
+_schema = Schema(
+    Field('id', 'orderID', int),
+    Field('char_id', 'charID', int),
+    Field('station_id', 'stationID', int),
+    Field('amount', 'volEntered', int),
+    Field('amount_left', 'volRemaining', int),
+    Computed('status', lambda a: _order_status[int(a['orderState'])]),
+    Field('type_id', 'typeID', int),
+    Field('range', 'range', int),
+    Field('account_key', 'accountKey', int),
+    Field('duration', 'duration', int),
+    Field('escrow', 'escrow', float),
+    Field('price', 'price', float),
+    Computed('type', lambda a: 'buy' if a['bid'] == '1' else 'sell'),
+    Field('timestamp', 'issued', api.parse_ts),
+)
+
+def parse_market_orders(api_result, fields=None):
         rowset = api_result.find('rowset')
         rows = rowset.findall('row')
+        decode = _schema.decoder(fields)
         result = {}
         for row in rows:
-            a = row.attrib
-            id = int(a['orderID'])
-            result[id] = {
-                'id': id,
-                'char_id': int(a['charID']),
-                'station_id': int(a['stationID']),
-                'amount': int(a['volEntered']),
-                'amount_left': int(a['volRemaining']),
-                'status': constants.Market().order_status[int(a['orderState'])],
-                'type_id': int(a['typeID']),
-                'range': int(a['range']),
-                'account_key': int(a['accountKey']),
-                'duration': int(a['duration']),
-                'escrow': float(a['escrow']),
-                'price': float(a['price']),
-                'type': 'buy' if a['bid'] == '1' else 'sell',
-                'timestamp': api.parse_ts(a['issued']),
-            }
+            result[int(row.attrib['orderID'])] = decode(row)
 
         return result
@@ -1,111 +1,115 @@
 from evelink import api
+from evelink.parsing.schema import Computed, Field, Group, Schema
+
+_colony_schema = Schema(
+    Field('id', 'planetID', int),
+    Group('system',
+        Field('id', 'solarSystemID', int),
+        Field('name', 'solarSystemName'),
+    ),
+    Group('planet',
+        Field('name', 'planetName'),
+        Field('type', 'planetTypeID', int),
+        Field('type_name', 'planetTypeName'),
+    ),
+    Group('owner',
+        Field('id', 'ownerID', int),
+        Field('name', 'ownerName'),
+    ),
+    Field('last_update', 'lastUpdate', api.parse_ts),
+    Field('upgrade_level', 'upgradeLevel', int),
+    Field('number_of_pins', 'numberOfPins', int),
+)
+
+_link_schema = Schema(
+    Field('source_id', 'sourcePinID', int),
+    Field('destination_id', 'destinationPinID', int),
+    Field('link_level', 'linkLevel', int),
+)
+
+_content_fields = (
+    Field('type', 'contentTypeID', int),
+    Field('name', 'contentTypeName'),
+    Field('quantity', 'contentQuantity', int),
+)
+
+_content_schema = Schema(*_content_fields)
+
+_pin_schema = Schema(
+    Field('id', 'pinID', int),
+    Group('type',
+        Field('id', 'typeID', int),
+        Field('name', 'typeName'),
+    ),
+    Field('schematic', 'schematicID', int),
+    Field('last_launch_ts', 'lastLaunchTime', api.parse_ts),
+    Field('cycle_time', 'cycleTime', int),
+    Field('quantity_per_cycle', 'quantityPerCycle', int),
+    Field('install_ts', 'installTime', api.parse_ts),
+    Field('expiry_ts', 'expiryTime', api.parse_ts),
+    Group('content', *_content_fields),
+    Group('loc',
+        Field('long', 'longitude', float),
+        Field('lat', 'latitude', float),
+    ),
+)
+
+_route_schema = Schema(
+    Field('id', 'routeID', int),
+    Field('source_id', 'sourcePinID', int),
+    Field('destination_id', 'destinationPinID', int),
+    Group('content',
+        Field('type', 'contentTypeID', int),
+        Field('name', 'contentTypeName'),
+    ),
+    Field('quantity', 'quantity', int),
+    Computed('path', lambda a: tuple(int(a['waypoint%d' % n])
+                                     for n in range(1, 6))),
+)
 
 def parse_planetary_colonies(api_results):
+    decode = _colony_schema.decoder()
     result = {}
     rowset = api_results.find('rowset')
     for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        planetID = int(a['planetID'])
-        result[planetID] = {
-            'id': planetID,
-            'system': {
-                'id': int(a['solarSystemID']),
-                'name': a['solarSystemName'],
-            },
-            'planet': {
-                'name': a['planetName'],
-                'type': int(a['planetTypeID']),
-                'type_name': a['planetTypeName'],
-            },
-            'owner': {
-                'id': int(a['ownerID']),
-                'name': a['ownerName'],
-            },
-            'last_update': api.parse_ts(a['lastUpdate']),
-            'upgrade_level': int(a['upgradeLevel']),
-            'number_of_pins': int(a['numberOfPins']),
-        }
+        result[int(row.attrib['planetID'])] = decode(row)
 
     return result
 
 
 def parse_planetary_links(api_results):
+    decode = _link_schema.decoder()
     result = {}
     rowset = api_results.find('rowset')
     for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        sourceID = int(a['sourcePinID'])
-        result[sourceID] = {
-            'source_id': sourceID,
-            'destination_id': int(a['destinationPinID']),
-            'link_level': int(a['linkLevel']),
-        }
+        result[int(row.attrib['sourcePinID'])] = decode(row)
 
     return result
 
 def parse_planetary_pins(api_results):
+    decode = _pin_schema.decoder()
+    decode_content = _content_schema.decoder()
     result = {}
     rowset = api_results.find('rowset')
     for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        pinID = int(a['pinID'])
+        # A pin has one row per type of content it holds.
+        pinID = int(row.attrib['pinID'])
         if pinID not in result:
-            result[pinID] = {
-                'id': pinID,
-                'type': {
-                    'id': int(a['typeID']),
-                    'name': a['typeName'],
-                },
-                'schematic': int(a['schematicID']),
-                'last_launch_ts': api.parse_ts(a['lastLaunchTime']),
-                'cycle_time': int(a['cycleTime']),
-                'quantity_per_cycle': int(a['quantityPerCycle']),
-                'install_ts': api.parse_ts(a['installTime']),
-                'expiry_ts': api.parse_ts(a['expiryTime']),
-                'content': {
-                    'type': int(a['contentTypeID']),
-                    'name': a['contentTypeName'],
-                    'quantity': int(a['contentQuantity']),
-                    'deprecated': 'Use the "contents" field instead',
-                },
-                'contents': {},
-                'loc': {
-                    'long': float(a['longitude']),
-                    'lat': float(a['latitude']),
-                },
-            }
-
-        if a['contentTypeID'] != '0':
-            contentID = int(a['contentTypeID'])
-            result[pinID]['contents'][contentID] = {
-                'type': contentID,
-                'name': a['contentTypeName'],
-                'quantity': int(a['contentQuantity']),
-            }
+            pin = result[pinID] = decode(row)
+            pin['content']['deprecated'] = 'Use the "contents" field instead'
+            pin['contents'] = {}
 
+        if row.attrib['contentTypeID'] != '0':
+            content = decode_content(row)
+            result[pinID]['contents'][content['type']] = content
 
     return result
 
 def parse_planetary_routes(api_results):
+    decode = _route_schema.decoder()
     result = {}
     rowset = api_results.find('rowset')
     for row in rowset.findall('row'):
-        # shortcut to make the following block less painful
-        a = row.attrib
-        routeID = int(a['routeID'])
-        result[routeID] = {
-            'id': routeID,
-            'source_id': int(a['sourcePinID']),
-            'destination_id': int(a['destinationPinID']),
-            'content': {
-                'type': int(a['contentTypeID']),
-                'name': a['contentTypeName'],
-            },
-            'quantity': int(a['quantity']),
-            'path': tuple(int(a['waypoint%d' % n]) for n in range(1,6)),
-        }
+        result[int(row.attrib['routeID'])] = decode(row)
 
     return result
@@ -1,44 +1,48 @@
 from evelink import api
+from evelink.parsing.schema import Field, Group, Schema
 
-def parse_wallet_journal(api_result):
-    rowset = api_result.find('rowset')
-    result = []
-
-    for row in rowset.findall('row'):
-        a = row.attrib
-        entry = {
-            'timestamp': api.parse_ts(a['date']),
-            'id': int(a['refID']),
-            'type_id': int(a['refTypeID']),
-            'party_1': {
-                'name': a['ownerName1'],
-                'id': int(a['ownerID1']),
-                'type':int(a['owner1TypeID']),
-            },
-            'party_2': {
-                'name': a['ownerName2'],
-                'id': int(a['ownerID2']),
-                'type':int(a['owner2TypeID']),
-            },
-            'arg': {
-                'name': a['argName1'],
-                'id': int(a['argID1']),
-            },
-            'amount': float(a['amount']),
-            'balance': float(a['balance']),
-            'reason': a['reason'],
-            # The tax fields might be an empty string, or not present
-            # at all (e.g., for corp wallet records.)  Need to handle
-            # both edge cases.
-            'tax': {
-                'taxer_id': int(a.get('taxReceiverID') or 0),
-                'amount': float(a.get('taxAmount') or 0),
-            },
-        }
+_schema = Schema(
+    Field('timestamp', 'date', api.parse_ts),
+    Field('id', 'refID', int),
+    Field('type_id', 'refTypeID', int),
+    Group('party_1',
+        Field('name', 'ownerName1'),
+        Field('id', 'ownerID1', int),
+        Field('type', 'owner1TypeID', int),
+    ),
+    Group('party_2',
+        Field('name', 'ownerName2'),
+        Field('id', 'ownerID2', int),
+        Field('type', 'owner2TypeID', int),
+    ),
+    Group('arg',
+        Field('name', 'argName1'),
+        Field('id', 'argID1', int),
+    ),
+    Field('amount', 'amount', float),
+    Field('balance', 'balance', float),
+    Field('reason', 'reason'),
+    # The tax fields might be an empty string, or not present
+    # at all (e.g., for corp wallet records.)  Need to handle
+    # both edge cases.
+    Group('tax',
+        Field('taxer_id', 'taxReceiverID', int, default=0),
+        Field('amount', 'taxAmount', float, default=0),
+    ),
+    lazy=True,
+)
 
-        result.append(entry)
+def parse_wallet_journal_row(row, fields=None):
+    """Parse a single wallet journal row.
 
-    result.sort(key=lambda x: x['id'])
-    return result
+    fields:
+        if given, only these keys are decoded (see Schema.decoder).
+    """
+    return _schema.decode(row, fields)
 
 
+def parse_wallet_journal(api_result, fields=None):
+    rowset = api_result.find('rowset')
+    rows = sorted(rowset.findall('row'), key=lambda row: int(row.attrib['refID']))
+    decode = _schema.decoder(fields)
+    return [decode(row) for row in rows]
@@ -1,37 +1,45 @@
 from evelink import api
+from evelink.parsing.schema import Field, Group, Schema
 
-def parse_wallet_transactions(api_result):
+_schema = Schema(
+    Field('timestamp', 'transactionDateTime', api.parse_ts),
+    Field('id', 'transactionID', int),
+    Field('journal_id', 'journalTransactionID', int),
+    Field('quantity', 'quantity', int),
+    Group('type',
+        Field('id', 'typeID', int),
+        Field('name', 'typeName'),
+    ),
+    Field('price', 'price', float),
+    Group('client',
+        Field('id', 'clientID', int),
+        Field('name', 'clientName'),
+    ),
+    Group('station',
+        Field('id', 'stationID', int),
+        Field('name', 'stationName'),
+    ),
+    Field('action', 'transactionType'),
+    Field('for', 'transactionFor'),
+    Group('char',
+        Field('id', 'characterID', int),
+        Field('name', 'characterName'),
+        optional='characterID',
+    ),
+    lazy=True,
+)
+
+def parse_wallet_transaction_row(row, fields=None):
+    """Parse a single wallet transaction row.
+
+    fields:
+        if given, only these keys are decoded (see Schema.decoder).
+    """
+    return _schema.decode(row, fields)
+
+
+def parse_wallet_transactions(api_result, fields=None):
     rowset = api_result.find('rowset')
     rows = rowset.findall('row')
-    result = []
-    for row in rows:
-        a = row.attrib
-        entry = {
-            'timestamp': api.parse_ts(a['transactionDateTime']),
-            'id': int(a['transactionID']),
-            'journal_id': int(a['journalTransactionID']),
-            'quantity': int(a['quantity']),
-            'type': {
-                'id': int(a['typeID']),
-                'name': a['typeName'],
-            },
-            'price': float(a['price']),
-            'client': {
-                'id': int(a['clientID']),
-                'name': a['clientName'],
-            },
-            'station': {
-                'id': int(a['stationID']),
-                'name': a['stationName'],
-            },
-            'action': a['transactionType'],
-            'for': a['transactionFor'],
-        }
-        if 'characterID' in a:
-            entry['char'] = {
-                'id': int(a['characterID']),
-                'name': a['characterName'],
-            }
-        result.append(entry)
-
-    return result
+    decode = _schema.decoder(fields)
+    return [decode(row) for row in rows]
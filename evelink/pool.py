@@ -0,0 +1,169 @@
+"""Persistent HTTP(S) connections, for when `requests` isn't available.
+
+ConnectionPool keeps up to 'size' idle connections per host open
+(http.client / httplib ones), so consecutive requests skip the TCP and
+TLS handshakes, much like a `requests` session does.
+"""
+
+import socket
+import threading
+import zlib
+
+from evelink.thirdparty.six.moves import http_client
+from evelink.thirdparty.six.moves import urllib
+
+# Allows zlib to decompress gzip-compressed data, see evelink.api.
+_ZLIB_DECODE_AUTO = 32 + zlib.MAX_WBITS
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class HTTPError(urllib.error.HTTPError):
+    """Raised by Response.raise_for_status for 4xx and 5xx responses."""
+
+    def __init__(self, url, code, msg, hdrs):
+        urllib.error.HTTPError.__init__(self, url, code, msg, hdrs, None)
+
+    def __str__(self):
+        return 'HTTP Error %s: %s for url: %s' % (self.code, self.msg, self.url)
+
+
+class Response(object):
+    """A response to a ConnectionPool request.
+
+    Its body is read (and gunzipped, if needed) with read() or
+    iter_content(); once all of it has been read, the connection goes
+    back to the pool. Closing the response before that closes the
+    connection.
+    """
+
+    def __init__(self, pool, key, conn, response, url):
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = dict((k.lower(), v) for k, v in response.getheaders())
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+
+    def iter_content(self, chunk_size):
+        """Yield the body in (decompressed) chunks."""
+        gzipped = self.headers.get('content-encoding', '').lower() == 'gzip'
+        decompressor = zlib.decompressobj(_ZLIB_DECODE_AUTO) if gzipped else None
+        try:
+            while True:
+                chunk = self._response.read(chunk_size)
+                if not chunk:
+                    break
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                if chunk:
+                    yield chunk
+            if decompressor is not None:
+                tail = decompressor.flush()
+                if tail:
+                    yield tail
+            self._release()
+        finally:
+            self.close()
+
+    def read(self, chunk_size=64 * 1024):
+        """Return the whole body."""
+        return b''.join(self.iter_content(chunk_size))
+
+    def _release(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        if self._response.will_close:
+            conn.close()
+        else:
+            self._pool._put(self._key, conn)
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+    def raise_for_status(self):
+        """Raise an HTTPError for 4xx and 5xx responses, like `requests`."""
+        if 400 <= self.status < 600:
+            raise HTTPError(self.url, self.status, self.reason, self.headers)
+
+
+class ConnectionPool(object):
+    """Persistent HTTP(S) connections, up to 'size' idle ones per host.
+
+    Requests take an idle connection to their host if there is one,
+    and open a new one otherwise, so the number of requests in flight
+    isn't limited; only the connections kept open are. 'timeout' is
+    the socket timeout, in seconds. Instances can be shared by threads.
+    """
+
+    def __init__(self, size=10, timeout=None):
+        self.size = size
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        """Return an idle connection to 'key' and True, or a new one and False."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = http_client.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            conn = http_client.HTTPConnection(host, port, timeout=self.timeout)
+        return conn, False
+
+    def _put(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, url, body=None, headers=None):
+        """Send a request and return its Response, once its headers are in.
+
+        Idle connections the server has closed in the meantime are
+        discarded, and the request sent again on another one.
+        """
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or _DEFAULT_PORTS[parts.scheme])
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        while True:
+            conn, reused = self._get(key)
+            try:
+                conn.request(method, path, body, headers or {})
+                response = conn.getresponse()
+            except socket.timeout:
+                conn.close()
+                raise
+            except (http_client.HTTPException, socket.error):
+                conn.close()
+                if reused:
+                    continue
+                raise
+            return Response(self, key, conn, response, url)
+
+    def idle_connections(self):
+        """The number of idle connections kept open."""
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
@@ -0,0 +1,243 @@
+"""A RateLimiter pacing requests with token buckets and adaptive concurrency.
+
+    limiter = evelink.ratelimit.Limiter(host_rate=30, key_rate=5)
+    eve_api = evelink.api.API(api_key=(1, 'abc'), rate_limiter=limiter)
+
+Requests take a token from the bucket of their host, and from that of
+their API key if key_rate is set, once both have one. Passing the same
+state_file to the Limiters of several processes makes them share these
+buckets. The number of requests in flight to each host is also limited,
+by an AdaptiveConcurrency of each Limiter.
+"""
+
+import json
+import threading
+import time
+
+from evelink import api
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Requests per second to each host: CCP's documented limit for the XML API.
+DEFAULT_HOST_RATE = 30
+
+# HTTP statuses (besides 5xx) asking clients to slow down.
+_SLOW_DOWN_STATUSES = frozenset([420, 429])
+
+# Latencies below this many seconds never count as a rise, so that the
+# jitter of very fast responses (e.g. from a local server) doesn't.
+_MIN_BASELINE = 0.01
+# How quickly the baseline latency follows latencies above it.
+_BASELINE_DRIFT = 0.01
+
+# Shorter waits (down to the rounding errors of timestamps) are none.
+_MIN_WAIT = 1e-6
+
+
+def _reserve(state, reservations, now):
+    """Take a token from each bucket in 'state' if they all have one.
+
+    Returns 0 once the tokens are taken, or else the seconds until every
+    bucket will have one, taking none: a request held back by one
+    bucket mustn't use up the tokens of the others in the meantime.
+    Each bucket is kept as the time at which it will be full again (its
+    "theoretical arrival time"), or not at all if it's full.
+    """
+    wait = 0
+    for name, rate, burst in reservations:
+        interval = 1.0 / rate
+        full_at = max(state.get(name, now), now)
+        wait = max(wait, full_at - (burst - 1) * interval - now)
+    if wait > _MIN_WAIT:
+        return wait
+    for name, rate, burst in reservations:
+        state[name] = max(state.get(name, now), now) + 1.0 / rate
+    return 0
+
+
+class TokenBuckets(object):
+    """Token buckets, kept in memory or in a file shared by processes.
+
+    With a state_file, the buckets are read from and written back to it
+    under an exclusive file lock, which requires fcntl.
+    """
+
+    def __init__(self, state_file=None):
+        if state_file is not None and fcntl is None:
+            raise ValueError("Sharing buckets requires the fcntl module.")
+        self.state_file = state_file
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, reservations):
+        """Take a token from each bucket, or return the seconds to wait.
+
+        Returns 0 if the tokens were taken. Otherwise none is, and the
+        caller should try again after the wait returned.
+
+        reservations:
+            (name, rate, burst) tuples: the bucket 'name' holds up to
+            'burst' tokens and gains 'rate' tokens per second.
+        """
+        if self.state_file is None:
+            with self._lock:
+                return _reserve(self._state, reservations, time.time())
+
+        with open(self.state_file, 'a+') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                data = f.read()
+                state = json.loads(data) if data else {}
+                now = time.time()
+                wait = _reserve(state, reservations, now)
+                # Full buckets needn't be kept.
+                state = dict((k, v) for k, v in state.items() if v > now)
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+                return wait
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class AdaptiveConcurrency(object):
+    """A limit on the number of requests in flight, adjusted as they go.
+
+    The limit grows by one for every 'limit' successful requests sent
+    while it's reached, and is multiplied by 'backoff' when a request
+    gets a 5xx, 420 or 429 status or no response at all, or takes more
+    than 'latency_tolerance' times the baseline latency of its path
+    (the lowest seen, drifting up towards later ones): endpoints of the
+    same host may take very different times to respond. Requests sent
+    before the last decrease don't cause another one.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=64, backoff=0.5,
+                 latency_tolerance=2.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.baselines = {}
+        self._generation = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, path=None):
+        """Block until a request may be sent; return a token for release().
+
+        'path' is that of the request, whose latency is compared to the
+        baseline of the path.
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+            return self._generation, self.in_flight >= int(self.limit), path
+
+    def release(self, token, latency, status):
+        """Adjust the limit to how the request acquired with 'token' went."""
+        generation, limited, path = token
+        with self._cond:
+            self.in_flight -= 1
+            if self._overloaded(path, latency, status):
+                if generation == self._generation:
+                    self._generation += 1
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+            elif limited:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def cancel(self):
+        """Give back the slot of a request that wasn't sent after all."""
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def _overloaded(self, path, latency, status):
+        if status is None or status >= 500 or status in _SLOW_DOWN_STATUSES:
+            return True
+        baseline = self.baselines.get(path)
+        if baseline is None or latency < baseline:
+            self.baselines[path] = latency
+            return False
+        baseline += (latency - baseline) * _BASELINE_DRIFT
+        self.baselines[path] = baseline
+        return latency > max(baseline, _MIN_BASELINE) * self.latency_tolerance
+
+
+class Limiter(api.RateLimiter):
+    """Token buckets per host and per API key, and adaptive concurrency.
+
+    host_rate, key_rate:
+        requests per second to each host, and with each API key to
+        each host; None for no limit. Public calls only count towards
+        the former.
+    host_burst, key_burst:
+        the number of requests that may be sent at once after a quiet
+        spell; by default, one second's worth.
+    state_file:
+        Optional. A file to keep the buckets in, see TokenBuckets.
+    concurrency:
+        a function returning the AdaptiveConcurrency of each host, or
+        None not to limit the number of requests in flight.
+    """
+
+    def __init__(self, host_rate=DEFAULT_HOST_RATE, host_burst=None,
+                 key_rate=None, key_burst=None, state_file=None,
+                 concurrency=AdaptiveConcurrency):
+        self.host_rate = host_rate
+        self.host_burst = max(1, host_burst or host_rate or 1)
+        self.key_rate = key_rate
+        self.key_burst = max(1, key_burst or key_rate or 1)
+        self.buckets = TokenBuckets(state_file)
+        self._new_concurrency = concurrency
+        self._concurrency = {}
+        self._lock = threading.Lock()
+
+    def concurrency(self, host):
+        """The AdaptiveConcurrency of 'host', or None."""
+        if self._new_concurrency is None:
+            return None
+        with self._lock:
+            limit = self._concurrency.get(host)
+            if limit is None:
+                limit = self._concurrency[host] = self._new_concurrency()
+            return limit
+
+    def acquire(self, host, path, key):
+        limit = self.concurrency(host)
+        token = limit.acquire(path) if limit is not None else None
+
+        reservations = []
+        if self.host_rate:
+            reservations.append(('host:%s' % host, self.host_rate, self.host_burst))
+        if self.key_rate and key is not None:
+            reservations.append(('key:%s:%s' % (host, key), self.key_rate, self.key_burst))
+        try:
+            while True:
+                wait = self.buckets.reserve(reservations)
+                if not wait:
+                    break
+                time.sleep(wait)
+        except Exception:
+            if limit is not None:
+                limit.cancel()
+            raise
+        return limit, token
+
+    def release(self, token, latency, status):
+        limit, token = token
+        if limit is not None:
+            limit.release(token, latency, status)
+
+    def cancel(self, token):
+        limit, token = token
+        if limit is not None:
+            limit.cancel()
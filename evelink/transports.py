@@ -0,0 +1,238 @@
+"""Transports serving responses without the network, see api.Transport.
+
+MemoryTransport serves canned responses. RecordingTransport writes the
+responses another transport receives to a file, from which
+ReplayTransport serves them again, taking as long as they took:
+
+    recorder = evelink.transports.RecordingTransport('calls.jsonl')
+    eve_api = evelink.api.API(api_key=(1, 'abc'), transport=recorder)
+    ...
+    replay = evelink.transports.ReplayTransport('calls.jsonl')
+    eve_api = evelink.api.API(api_key=(1, 'abc'), transport=replay)
+
+Requests are told apart by their path and params, leaving out the
+credentials, which aren't recorded.
+"""
+
+import base64
+import collections
+import json
+import threading
+import time
+
+from evelink import api
+from evelink import pool
+from evelink.thirdparty.six.moves import http_client
+from evelink.thirdparty.six.moves import urllib
+
+# Params left out of recordings, and ignored when matching requests.
+CREDENTIALS = frozenset(['keyID', 'vCode', 'accessToken', 'accessType'])
+
+_SUFFIX = '.xml.aspx'
+
+
+def request_key(full_path, params):
+    """The (path, params) a request is matched by.
+
+    The path is that of the API call, e.g. 'char/AssetList', and the
+    params a sorted tuple of (name, value) pairs.
+    """
+    path = urllib.parse.urlsplit(full_path).path.lstrip('/')
+    if path.endswith(_SUFFIX):
+        path = path[:-len(_SUFFIX)]
+    return path, _params_key(params)
+
+
+def _params_key(params):
+    return tuple(sorted(
+        (k, v if type(v) is str else api._clean(v))
+        for k, v in (params or {}).items() if k not in CREDENTIALS))
+
+
+class Response(object):
+    """The response object of a MemoryTransport or ReplayTransport."""
+
+    def __init__(self, url, status=200):
+        self.url = url
+        self.status = status
+        self.reason = http_client.responses.get(status, '')
+
+    def raise_for_status(self):
+        """Raise a pool.HTTPError for 4xx and 5xx responses."""
+        if 400 <= self.status < 600:
+            raise pool.HTTPError(self.url, self.status, self.reason, {})
+
+
+class MemoryTransport(api.Transport):
+    """Serves responses held in memory.
+
+    'responses' maps paths (e.g. 'char/AssetList') to the bodies served
+    for them, see add(). Requests nothing was added for get an empty
+    404 response. The (path, params) of every request are appended to
+    'requests'.
+    """
+
+    def __init__(self, responses=None):
+        self._responses = {}
+        self._lock = threading.Lock()
+        self.requests = []
+        for path, body in (responses or {}).items():
+            self.add(path, body)
+
+    def add(self, path, body, params=None, status=200):
+        """Serve 'body' (bytes or text) with 'status' for 'path'.
+
+        If 'params' is given, only for requests with those params;
+        these take precedence over the responses added without.
+        """
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        key = (path, None if params is None else _params_key(params))
+        with self._lock:
+            self._responses[key] = (body, status)
+
+    def request(self, full_path, params, headers):
+        path, params_key = request_key(full_path, params)
+        with self._lock:
+            self.requests.append((path, params_key))
+            found = (self._responses.get((path, params_key)) or
+                     self._responses.get((path, None)))
+        if found is None:
+            return b'', Response(full_path, 404)
+        body, status = found
+        return body, Response(full_path, status)
+
+
+class RecordingTransport(api.Transport):
+    """Passes requests on to another transport, recording the responses.
+
+    Each response is appended to 'filename' as a line of JSON, with
+    its status and the times (since the request was sent) at which its
+    headers and each chunk of its body were received. Streamed
+    responses are recorded once they have been read entirely. The
+    transport defaults to a PooledTransport.
+    """
+
+    def __init__(self, filename, transport=None):
+        self.filename = filename
+        self.transport = transport or api.PooledTransport()
+        self._lock = threading.Lock()
+
+    def request(self, full_path, params, headers):
+        start = api._clock()
+        body, robj = self.transport.request(full_path, params, headers)
+        elapsed = api._clock() - start
+        self._record(full_path, params, robj, elapsed, [(elapsed, body)])
+        return body, robj
+
+    def request_stream(self, full_path, params, headers):
+        start = api._clock()
+        chunks, robj = self.transport.request_stream(full_path, params, headers)
+        latency = api._clock() - start
+        return self._recorded(full_path, params, robj, latency, chunks, start), robj
+
+    def _recorded(self, full_path, params, robj, latency, chunks, start):
+        timed = []
+        try:
+            for chunk in chunks:
+                timed.append((api._clock() - start, chunk))
+                yield chunk
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+        self._record(full_path, params, robj, latency, timed)
+
+    def _record(self, full_path, params, robj, latency, timed):
+        path, params_key = request_key(full_path, params)
+        line = json.dumps({
+            'path': path,
+            'params': params_key,
+            'status': api._http_status(robj) or 200,
+            'latency': latency,
+            'chunks': [(t, base64.b64encode(chunk).decode('ascii'))
+                       for t, chunk in timed],
+        }, sort_keys=True)
+        with self._lock:
+            with open(self.filename, 'a') as f:
+                f.write(line + '\n')
+
+    def close(self):
+        self.transport.close()
+
+
+class _Recording(object):
+    __slots__ = ('status', 'latency', 'chunks')
+
+    def __init__(self, status, latency, chunks):
+        self.status = status
+        self.latency = latency
+        self.chunks = chunks
+
+
+class ReplayTransport(api.Transport):
+    """Serves the responses recorded by a RecordingTransport.
+
+    Identical requests are served the responses recorded for them in
+    turn, and the last one again once all have been. Responses take as
+    long as they took when recorded, divided by 'speed'; with a speed
+    of None, they are served at once. Requests nothing was recorded
+    for get an empty 404 response.
+    """
+
+    def __init__(self, filename, speed=1):
+        self.filename = filename
+        self.speed = speed
+        self._recordings = collections.defaultdict(list)
+        self._served = collections.defaultdict(int)
+        self._lock = threading.Lock()
+        with open(filename) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = (entry['path'], tuple(tuple(p) for p in entry['params']))
+                self._recordings[key].append(_Recording(
+                    entry['status'], entry['latency'],
+                    [(t, base64.b64decode(chunk)) for t, chunk in entry['chunks']]))
+
+    def _next(self, full_path, params):
+        key = request_key(full_path, params)
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                return None
+            served = self._served[key]
+            self._served[key] = served + 1
+        return recordings[min(served, len(recordings) - 1)]
+
+    def _wait(self, start, elapsed):
+        """Sleep until 'elapsed' recorded seconds after 'start'."""
+        if self.speed:
+            delay = start + elapsed / self.speed - api._clock()
+            if delay > 0:
+                time.sleep(delay)
+
+    def request(self, full_path, params, headers):
+        start = api._clock()
+        recording = self._next(full_path, params)
+        if recording is None:
+            return b'', Response(full_path, 404)
+        if recording.chunks:
+            self._wait(start, recording.chunks[-1][0])
+        return (b''.join(chunk for _, chunk in recording.chunks),
+                Response(full_path, recording.status))
+
+    def request_stream(self, full_path, params, headers):
+        start = api._clock()
+        recording = self._next(full_path, params)
+        if recording is None:
+            return iter([]), Response(full_path, 404)
+        self._wait(start, recording.latency)
+        return (self._replay(recording.chunks, start),
+                Response(full_path, recording.status))
+
+    def _replay(self, chunks, start):
+        for elapsed, chunk in chunks:
+            self._wait(start, elapsed)
+            yield chunk
@@ -26,6 +26,7 @@ setup(
     packages=[
         "evelink",
         "evelink.appengine",
+        "evelink.asyncio",
         "evelink.cache",
         "evelink.parsing",
         "evelink.thirdparty",
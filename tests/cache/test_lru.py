@@ -0,0 +1,119 @@
+import mmap
+import tempfile
+import threading
+
+import mock
+
+from tests.compat import unittest
+
+from evelink.cache.lru import LRUCache
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(max_entries=3, max_bytes=10)
+
+    def test_cache(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.assertEqual(self.cache.get('foo'), 'bar')
+
+    def test_expire(self):
+        self.cache.put('baz', 'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+
+    def test_evicts_least_recently_used_entry(self):
+        self.cache.put('a', '1', 3600)
+        self.cache.put('b', '2', 3600)
+        self.cache.put('c', '3', 3600)
+        self.cache.get('a')
+        self.cache.put('d', '4', 3600)
+
+        self.assertEqual(self.cache.get('b'), None)
+        self.assertEqual(self.cache.get('a'), '1')
+        self.assertEqual(self.cache.get('c'), '3')
+        self.assertEqual(self.cache.get('d'), '4')
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_recency_after_many_hits(self):
+        self.cache.put('a', '1', 3600)
+        self.cache.put('b', '2', 3600)
+        self.cache.put('c', '3', 3600)
+        for _ in range(100):
+            self.cache.get('a')
+            self.cache.get('b')
+        self.cache.put('d', '4', 3600)
+
+        self.assertEqual(self.cache.get('c'), None)
+        self.assertEqual(['a', 'b', 'd'], sorted(self.cache.cache))
+        self.assertTrue(len(self.cache._use_heap) <= 2 * 3 + 64)
+
+    def test_byte_budget(self):
+        self.cache.put('a', 'xxxx', 3600)
+        self.cache.put('b', 'yyyy', 3600)
+        self.cache.put('c', 'zzzz', 3600)
+
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.bytes, 8)
+
+        self.cache.put('d', 'x' * 11, 3600)
+        self.assertEqual(self.cache.get('d'), None)
+        self.assertEqual(self.cache.bytes, 8)
+
+    def test_mmap_size(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b'xxxxxx')
+            f.flush()
+            value = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.cache.put('a', value, 3600)
+        self.assertEqual(self.cache.bytes, 6)
+        value.close()
+
+    def test_replace_entry(self):
+        self.cache.put('a', 'xxxx', 3600)
+        self.cache.put('a', 'yy', 3600)
+        self.assertEqual(self.cache.get('a'), 'yy')
+        self.assertEqual(self.cache.bytes, 2)
+
+    @mock.patch('time.time')
+    def test_reclaims_expired_entries_on_put(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.put('a', '1', 10)
+        self.cache.put('b', '2', 100)
+
+        mock_time.return_value = 1050
+        self.cache.put('c', '3', 100)
+
+        self.assertEqual(list(self.cache.cache.keys()), ['b', 'c'])
+        self.assertEqual(self.cache.expirations, 1)
+        self.assertEqual(self.cache.evictions, 0)
+
+    def test_stats(self):
+        self.cache.put('a', '1', 3600)
+        self.cache.get('a')
+        self.cache.get('b')
+
+        self.assertEqual(self.cache.stats(), {
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+            'expirations': 0,
+            'entries': 1,
+            'bytes': 1,
+        })
+
+    def test_threads(self):
+        cache = LRUCache(max_entries=50, max_bytes=1000)
+
+        def worker(n):
+            for i in range(500):
+                cache.put('%d-%d' % (n, i % 80), 'x' * (i % 7), 3600)
+                cache.get('%d-%d' % (n, (i * 7) % 80))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(len(cache.cache) <= 50)
+        self.assertEqual(cache.bytes, sum(e[2] for e in cache.cache.values()))
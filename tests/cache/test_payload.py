@@ -0,0 +1,50 @@
+import mmap
+import pickle
+import tempfile
+
+from tests.compat import unittest
+
+from evelink.cache import payload
+
+class PayloadTestCase(unittest.TestCase):
+
+    xml = b"<?xml version='1.0' encoding='UTF-8'?><eveapi>" + b"<row/>" * 1000 + b"</eveapi>"
+
+    def test_raw_bytes(self):
+        data = payload.encode(self.xml)
+        self.assertEqual(data, b'\x01\x00' + self.xml)
+        self.assertEqual(payload.decode(data), self.xml)
+
+    def test_zlib(self):
+        data = payload.encode(self.xml, 'zlib')
+        self.assertTrue(len(data) < len(self.xml) / 10)
+        self.assertEqual(payload.decode(data), self.xml)
+
+    @unittest.skipIf(payload.lzma is None, 'lzma not available')
+    def test_lzma(self):
+        data = payload.encode(self.xml, 'lzma')
+        self.assertTrue(len(data) < len(self.xml) / 10)
+        self.assertEqual(payload.decode(data), self.xml)
+
+    def test_mmap(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(self.xml)
+            f.flush()
+            value = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.assertEqual(payload.encode(value), payload.encode(self.xml))
+        self.assertEqual(payload.decode(payload.encode(value, 'zlib')), self.xml)
+        value.close()
+
+    def test_other_values(self):
+        for value in (u'bar', 1, True, None, {1: (2.5, [u'x'])}):
+            self.assertEqual(payload.decode(payload.encode(value)), value)
+            self.assertEqual(payload.decode(payload.encode(value, 'zlib')), value)
+
+    def test_legacy_pickle(self):
+        self.assertEqual(payload.decode(pickle.dumps(self.xml, 2)), self.xml)
+        self.assertEqual(payload.decode(pickle.dumps(('bar', 1), 0)), ('bar', 1))
+
+    def test_unknown_compression(self):
+        self.assertRaises(ValueError, payload.check_compression, 'bz2')
+        payload.check_compression(None)
+        payload.check_compression('zlib')
@@ -1,5 +1,7 @@
 import os
+import shelve
 import tempfile
+import time
 
 from tests.compat import unittest
 
@@ -30,3 +32,22 @@ class ShelveCacheTestCase(unittest.TestCase):
     def test_expire(self):
         self.cache.put('baz', 'qux', -1)
         self.assertEqual(self.cache.get('baz'), None)
+
+    def test_compression(self):
+        self.cache.cache.close()
+        self.cache = ShelveCache(self.cache_path, compression='zlib')
+        xml = b'<eveapi>' + b'<row/>' * 1000 + b'</eveapi>'
+        self.cache.put('foo', xml, 3600)
+        self.assertTrue(len(self.cache.cache['foo']) < len(xml) / 10)
+        self.assertEqual(self.cache.get('foo'), xml)
+
+    def test_legacy_shelve_entries(self):
+        self.cache.cache.close()
+        shelf = shelve.open(self.cache_path)
+        shelf['foo'] = (b'<eveapi/>', time.time() + 3600)
+        shelf['bar'] = (b'<eveapi/>', time.time() - 1)
+        shelf.close()
+
+        self.cache = ShelveCache(self.cache_path)
+        self.assertEqual(self.cache.get('foo'), b'<eveapi/>')
+        self.assertEqual(self.cache.get('bar'), None)
@@ -1,9 +1,15 @@
+import gc
 import os
+import pickle
+import shutil
+import sqlite3
 import tempfile
+import threading
+import time
 
 from tests.compat import unittest
 
-from evelink.cache.sqlite import SqliteCache
+from evelink.cache.sqlite import SqliteCache, ConcurrentSqliteCache
 
 class SqliteCacheTestCase(unittest.TestCase):
 
@@ -34,3 +40,137 @@ class SqliteCacheTestCase(unittest.TestCase):
     def test_expire(self):
         self.cache.put('baz', 'qux', -1)
         self.assertEqual(self.cache.get('baz'), None)
+
+    def test_raw_payload(self):
+        self.cache.put('foo', b'<eveapi/>', 3600)
+        value, = self.cache.connection.execute(
+            'select value from cache where "key"=?', ('foo',)).fetchone()
+        self.assertEqual(bytes(value), b'\x01\x00<eveapi/>')
+        self.assertEqual(self.cache.get('foo'), b'<eveapi/>')
+
+    def test_compression(self):
+        self.cache.connection.close()
+        self.cache = SqliteCache(self.cache_path, compression='zlib')
+        xml = b'<eveapi>' + b'<row/>' * 1000 + b'</eveapi>'
+        self.cache.put('foo', xml, 3600)
+        value, = self.cache.connection.execute(
+            'select value from cache where "key"=?', ('foo',)).fetchone()
+        self.assertTrue(len(value) < len(xml) / 10)
+        self.assertEqual(self.cache.get('foo'), xml)
+
+    def test_legacy_pickled_rows(self):
+        self.cache.connection.execute('insert into cache values (?, ?, ?)',
+            ('foo', sqlite3.Binary(pickle.dumps(b'<eveapi/>', 2)), time.time() + 3600))
+        self.assertEqual(self.cache.get('foo'), b'<eveapi/>')
+
+
+class ConcurrentSqliteCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_dir, 'sqlite')
+        self.cache = ConcurrentSqliteCache(self.cache_path, flush_interval=60)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _rows(self):
+        connection = sqlite3.connect(self.cache_path)
+        try:
+            return connection.execute('select "key" from cache order by "key"').fetchall()
+        finally:
+            connection.close()
+
+    def test_cache(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.assertEqual(self.cache.get('foo'), 'bar')
+        self.cache.flush()
+        self.assertEqual(self.cache.get('foo'), 'bar')
+
+    def test_expire(self):
+        self.cache.put('baz', 'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+        self.cache.flush()
+        self.assertEqual(self.cache.get('baz'), None)
+
+    def test_wal_mode(self):
+        mode = self.cache.connection.execute('pragma journal_mode').fetchone()[0]
+        self.assertEqual(mode.lower(), 'wal')
+
+    def test_write_behind(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.assertEqual(self._rows(), [])
+
+        self.cache.flush()
+        self.assertEqual(self._rows(), [('foo',)])
+        self.assertEqual(SqliteCache(self.cache_path).get('foo'), 'bar')
+
+    def test_flush_on_size(self):
+        cache = ConcurrentSqliteCache(self.cache_path, flush_size=2, flush_interval=60)
+        self.addCleanup(cache.close)
+        cache.put('a', 1, 3600)
+        cache.put('b', 2, 3600)
+
+        for _ in range(100):
+            if len(self._rows()) == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self._rows(), [('a',), ('b',)])
+
+    def test_close_flushes(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.cache.close()
+        self.assertEqual(self._rows(), [('foo',)])
+        self.assertRaises(ValueError, self.cache.put, 'baz', 'qux', 3600)
+
+    def test_purge_expired(self):
+        self.cache.put('foo', 'bar', 3600)
+        self.cache.put('baz', 'qux', -1)
+        self.cache.flush()
+        self.assertEqual(self._rows(), [('baz',), ('foo',)])
+
+        self.cache.purge_expired()
+        self.assertEqual(self._rows(), [('foo',)])
+
+    def test_threads(self):
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(50):
+                    self.cache.put('%d-%d' % (n, i), i, 3600)
+                    self.assertEqual(self.cache.get('%d-%d' % (n, i)), i)
+                    if i % 10 == 0:
+                        self.cache.flush()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.cache.flush()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self._rows()), 400)
+
+    def test_thread_connections_closed_on_exit(self):
+        connections = []
+
+        def worker():
+            self.cache.get('foo')
+            connections.append(self.cache.connection)
+
+        for _ in range(5):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        open_connections = list(self.cache._connections.values())
+        self.assertTrue(self.cache.connection in open_connections)
+        for connection in connections:
+            self.assertFalse(connection in open_connections)
+            self.assertRaises(sqlite3.ProgrammingError, connection.execute, 'select 1')
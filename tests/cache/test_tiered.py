@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+
+import mock
+
+from tests.compat import unittest
+
+from evelink.cache.lru import LRUCache
+from evelink.cache.shelf import ShelveCache
+from evelink.cache.sqlite import SqliteCache
+from evelink.cache.tiered import TieredCache
+
+class TieredCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.cache_dir, 'sqlite')
+        self.l2 = SqliteCache(self.cache_path)
+        self.l1 = LRUCache()
+        self.cache = TieredCache(self.l2, l1=self.l1)
+
+    def tearDown(self):
+        self.l2.connection.close()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_cache(self):
+        self.cache.put('foo', b'bar', 3600)
+        self.assertEqual(self.cache.get('foo'), b'bar')
+        self.assertEqual(self.l1.get('foo'), b'bar')
+        self.assertEqual(self.l2.get('foo'), b'bar')
+
+    def test_expire(self):
+        self.cache.put('baz', b'qux', -1)
+        self.assertEqual(self.cache.get('baz'), None)
+
+    def test_l1_hit_skips_l2(self):
+        self.cache.put('foo', b'bar', 3600)
+        self.l2.get_entry = mock.Mock()
+        self.assertEqual(self.cache.get('foo'), b'bar')
+        self.assertFalse(self.l2.get_entry.called)
+
+    @mock.patch('time.time')
+    def test_promotes_l2_hits(self, mock_time):
+        mock_time.return_value = 1000
+        self.l2.put('foo', b'bar', 100)
+
+        mock_time.return_value = 1060
+        self.assertEqual(self.cache.get('foo'), b'bar')
+        self.assertEqual(self.l1.get_entry('foo'), (b'bar', 1100))
+
+        # The promoted entry expires along with the L2 one.
+        mock_time.return_value = 1101
+        self.assertEqual(self.l1.get('foo'), None)
+
+    def test_warm_start(self):
+        self.l2.put('foo', b'bar', 3600)
+        self.l2.put('baz', b'qux', 3600)
+        self.l2.put('old', b'expired', -1)
+
+        cache = TieredCache(self.l2, warm=True)
+
+        self.assertEqual(sorted(cache.l1.cache.keys()), ['baz', 'foo'])
+        self.l2.get_entry = mock.Mock()
+        self.assertEqual(cache.get('foo'), b'bar')
+        self.assertFalse(self.l2.get_entry.called)
+
+    def test_warm_start_from_shelve(self):
+        shelf = ShelveCache(os.path.join(self.cache_dir, 'shelf'))
+        shelf.put('foo', b'bar', 3600)
+        shelf.put('old', b'expired', -1)
+
+        cache = TieredCache(shelf)
+        self.assertEqual(cache.warm(), 1)
+        self.assertEqual(cache.l1.get('foo'), b'bar')
+        shelf.cache.close()
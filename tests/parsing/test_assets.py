@@ -1,9 +1,8 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import assets as evelink_a
 
-class AssetsTestCase(unittest.TestCase):
+class AssetsTestCase(XMLBackendsTestCase):
 
     def test_parse_assets(self):
         api_result, _, _ = make_api_result("corp/assets.xml")
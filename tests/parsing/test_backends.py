@@ -0,0 +1,113 @@
+import io
+import os
+from xml.etree import ElementTree
+
+import mock
+
+from tests.compat import unittest
+
+from evelink.parsing import backends
+
+
+XML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'xml')
+
+TEST_XML = b"""<?xml version='1.0' encoding='UTF-8'?>
+<eveapi version="2">
+    <currentTime>2009-10-18 17:05:31</currentTime>
+    <result>
+        <rowset name="first">
+            <row id="1"><rowset><row id="11" /></rowset></row>
+            <row id="2" />
+        </rowset>
+        <attributes><memory>7</memory></attributes>
+    </result>
+</eveapi>
+"""
+
+
+def fixtures():
+    for dirpath, _, filenames in os.walk(XML_DIR):
+        for filename in filenames:
+            if filename.endswith('.xml'):
+                yield os.path.join(dirpath, filename)
+
+
+def dump(elem):
+    """A comparable representation of an element and its descendants."""
+    return (elem.tag, dict(elem.attrib), (elem.text or '').strip(),
+            [dump(child) for child in elem])
+
+
+class BackendTestsMixin(object):
+
+    def test_fixtures(self):
+        for path in fixtures():
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.assertEqual(dump(ElementTree.fromstring(data)),
+                             dump(self.backend.fromstring(data)), path)
+
+    def test_text(self):
+        root = self.backend.fromstring(TEST_XML.decode('utf-8'))
+        self.assertEqual('2009-10-18 17:05:31', root.find('currentTime').text)
+
+    def test_find(self):
+        result = self.backend.fromstring(TEST_XML).find('result')
+        rows = result.find('rowset').findall('row')
+        self.assertEqual(['1', '2'], [row.attrib['id'] for row in rows])
+        self.assertEqual('2', rows[1].get('id'))
+        self.assertEqual(None, rows[1].get('missing'))
+        self.assertEqual('7', result.findtext('attributes/memory'))
+        self.assertEqual(None, result.findtext('attributes/missing'))
+        self.assertEqual(None, result.find('missing'))
+        self.assertEqual(['1', '11', '2'],
+                         [row.attrib['id'] for row in result.iter('row')])
+
+    def test_iterparse(self):
+        expected = [(event, elem.tag) for event, elem in ElementTree.iterparse(
+            io.BytesIO(TEST_XML), events=('start', 'end'))]
+        events = [(event, elem.tag) for event, elem in self.backend.iterparse(
+            io.BytesIO(TEST_XML), events=('start', 'end'))]
+        self.assertEqual(expected, events)
+
+    def test_parse_error(self):
+        self.assertRaises(backends.ParseError, self.backend.fromstring, b'<eveapi>')
+        events = self.backend.iterparse(io.BytesIO(b'<eveapi><result>'))
+        self.assertRaises(backends.ParseError, list, events)
+
+
+class ElementTreeBackendTestCase(BackendTestsMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.backend = backends.get('etree')
+
+
+@unittest.skipIf(backends.lxml is None, "lxml is not installed")
+class LxmlBackendTestCase(BackendTestsMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.backend = backends.get('lxml')
+
+
+class GetTestCase(unittest.TestCase):
+
+    def test_names(self):
+        self.assertTrue(isinstance(backends.get('etree'), backends.ElementTreeBackend))
+        self.assertRaises(ValueError, backends.get, 'unknown')
+
+    def test_instance(self):
+        backend = backends.ElementTreeBackend()
+        self.assertTrue(backends.get(backend) is backend)
+
+    @mock.patch.object(backends, 'lxml', None)
+    def test_default_without_lxml(self):
+        self.assertTrue(isinstance(backends.get(), backends.ElementTreeBackend))
+        self.assertRaises(ValueError, backends.get, 'lxml')
+
+    @mock.patch.object(backends, 'lxml', mock.Mock())
+    def test_default_with_lxml(self):
+        self.assertTrue(isinstance(backends.get(), backends.LxmlBackend))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,8 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import bookmarks as evelink_b
 
-class BookmarksTestCase(unittest.TestCase):
+class BookmarksTestCase(XMLBackendsTestCase):
 
     def test_parse_bookmarks(self):
         api_result, _, _ = make_api_result("char/bookmarks.xml")
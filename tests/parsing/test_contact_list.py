@@ -1,11 +1,10 @@
 import mock
 
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import contact_list
 
-class ContactsTestCase(unittest.TestCase):
+class ContactsTestCase(XMLBackendsTestCase):
     maxDiff = 1000
 
     def test_parse_char_contact_list(self):
@@ -1,9 +1,8 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import contract_bids as evelink_c
 
-class ContractBidsTestCase(unittest.TestCase):
+class ContractBidsTestCase(XMLBackendsTestCase):
     def test_parse_contract_bids(self):
         api_result, _, _ = make_api_result("char/contract_bids.xml")
         result = evelink_c.parse_contract_bids(api_result)
@@ -1,9 +1,8 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import contract_items as evelink_c
 
-class ContractItemsTestCase(unittest.TestCase):
+class ContractItemsTestCase(XMLBackendsTestCase):
     def test_parse_contract_items(self):
         api_result, _, _ = make_api_result("char/contract_items.xml")
         result = evelink_c.parse_contract_items(api_result)
@@ -1,10 +1,9 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink import api
 from evelink.parsing import contracts as evelink_c
 
-class ContractsTestCase(unittest.TestCase):
+class ContractsTestCase(XMLBackendsTestCase):
     def test_parse_contracts(self):
         api_result, _, _ = make_api_result("corp/contracts.xml")
         result = evelink_c.parse_contracts(api_result)
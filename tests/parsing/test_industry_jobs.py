@@ -1,11 +1,10 @@
 import mock
 
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 import evelink.parsing.industry_jobs as evelink_ij
 
-class IndustryJobsTestCase(unittest.TestCase):
+class IndustryJobsTestCase(XMLBackendsTestCase):
 
     def test_parse_industry_jobs(self):
         api_result, _, _ = make_api_result("char/industry_jobs.xml")
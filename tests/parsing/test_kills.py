@@ -1,9 +1,8 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 import evelink.parsing.kills as evelink_k
 
-class KillsTestCase(unittest.TestCase):
+class KillsTestCase(XMLBackendsTestCase):
 
     def test_parse_kills(self):
         api_result, _, _ = make_api_result("char/kills.xml")
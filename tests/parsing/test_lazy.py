@@ -0,0 +1,110 @@
+import pickle
+from xml.etree import ElementTree
+
+import mock
+
+from tests.compat import unittest
+from tests.utils import XMLBackendsTestCase, make_api_result
+
+from evelink.parsing import assets as evelink_a
+from evelink.parsing import contract_items as evelink_ci
+from evelink.parsing import industry_jobs as evelink_ij
+from evelink.parsing import lazy
+from evelink.parsing import members as evelink_m
+from evelink.parsing import orders as evelink_o
+from evelink.parsing import wallet_journal as evelink_wj
+from evelink.parsing import wallet_transactions as evelink_wt
+
+
+class LazyRowTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.convert = mock.Mock(side_effect=int)
+        self.fields = lazy.Fields(
+            ('id', lazy.attr('itemID', self.convert)),
+            ('name', lazy.attr('name')),
+            ('nested', lazy.group(lazy.Fields(('id', lazy.attr('typeID', int))))),
+            ('extra', lazy.attr('extra'), lazy.has_attr('extra')),
+        )
+        self.row = lazy.LazyRow(
+            ElementTree.fromstring('<row itemID="1" name="foo" typeID="2" />'),
+            self.fields)
+        self.expected = {'id': 1, 'name': 'foo', 'nested': {'id': 2}}
+
+    def test_decodes_on_access(self):
+        self.assertFalse(self.convert.called)
+        self.assertEqual(1, self.row['id'])
+        self.assertEqual(1, self.row['id'])
+        self.assertEqual(1, self.convert.call_count)
+        self.assertEqual(2, self.row['nested']['id'])
+
+    def test_mapping(self):
+        self.assertEqual(['id', 'name', 'nested'], list(self.row))
+        self.assertEqual(3, len(self.row))
+        self.assertTrue('name' in self.row)
+        self.assertFalse('extra' in self.row)
+        self.assertRaises(KeyError, lambda: self.row['extra'])
+        self.assertEqual(None, self.row.get('extra'))
+        self.assertRaises(KeyError, lambda: self.row['unknown'])
+
+    def test_optional_field(self):
+        row = lazy.LazyRow(
+            ElementTree.fromstring('<row itemID="1" name="foo" typeID="2" extra="x" />'),
+            self.fields)
+        self.assertEqual('x', row['extra'])
+        self.assertEqual(4, len(row))
+
+    def test_equality(self):
+        self.assertEqual(self.expected, self.row)
+        self.assertEqual(self.row, self.expected)
+        self.assertNotEqual(self.row, {'id': 1})
+        self.assertFalse(self.row != self.expected)
+
+    def test_modify(self):
+        self.row['name'] = 'bar'
+        self.row['other'] = 3
+        del self.row['nested']
+        self.assertEqual({'id': 1, 'name': 'bar', 'other': 3}, self.row)
+
+    def test_pickle(self):
+        self.assertEqual(self.expected, pickle.loads(pickle.dumps(self.row)))
+
+
+class LazyParsersTestCase(XMLBackendsTestCase):
+
+    def compare(self, parse, xml_path, *args):
+        api_result, _, _ = make_api_result(xml_path)
+        eager = parse(api_result, *args)
+        with mock.patch.object(lazy, 'enabled', True):
+            result = parse(api_result, *args)
+        self.assertEqual(eager, result)
+        return result
+
+    def test_assets(self):
+        result = self.compare(evelink_a.parse_assets, 'corp/assets.xml')
+        item = result[30003719]['contents'][0]
+        self.assertTrue(isinstance(item, lazy.LazyRow))
+        self.assertTrue(isinstance(item['contents'][0], lazy.LazyRow))
+
+    def test_wallet_journal(self):
+        result = self.compare(evelink_wj.parse_wallet_journal, 'char/wallet_journal.xml')
+        self.assertTrue(isinstance(result[0], lazy.LazyRow))
+
+    def test_corp_wallet_journal(self):
+        self.compare(evelink_wj.parse_wallet_journal, 'corp/wallet_journal.xml')
+
+    def test_wallet_transactions(self):
+        self.compare(evelink_wt.parse_wallet_transactions, 'char/wallet_transactions.xml')
+
+    def test_members(self):
+        self.compare(evelink_m.parse_members, 'corp/members.xml')
+        self.compare(evelink_m.parse_members, 'corp/members.xml', False)
+
+    def test_schema_parsers(self):
+        self.compare(evelink_o.parse_market_orders, 'char/orders.xml')
+        self.compare(evelink_ij.parse_industry_jobs, 'char/industry_jobs.xml')
+        self.compare(evelink_ci.parse_contract_items, 'char/contract_items.xml')
+
+
+if __name__ == "__main__":
+    unittest.main()
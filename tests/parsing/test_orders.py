@@ -1,11 +1,10 @@
 import mock
 
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import orders as evelink_o
 
-class OrdersTestCase(unittest.TestCase):
+class OrdersTestCase(XMLBackendsTestCase):
 
     def test_parse_market_orders(self):
         api_result, _, _ = make_api_result("char/orders.xml")
@@ -44,3 +43,11 @@ class OrdersTestCase(unittest.TestCase):
                 'station_id': 60012550,
                 'type_id': 16399}
             })
+
+    def test_parse_market_orders_fields(self):
+        api_result, _, _ = make_api_result("char/orders.xml")
+
+        result = evelink_o.parse_market_orders(api_result,
+                                               fields=['price', 'status'])
+
+        self.assertEqual(result[2579890411], {'price': 5100.0, 'status': 'active'})
@@ -1,11 +1,10 @@
 import mock
 
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 import evelink.parsing.planetary_interactions as evelink_pi
 
-class PlanetaryInteractionsTestCase(unittest.TestCase):
+class PlanetaryInteractionsTestCase(XMLBackendsTestCase):
 
     def test_parse_planetary_colonies(self):
         api_result, _, _ = make_api_result("char/planetary_colonies.xml")
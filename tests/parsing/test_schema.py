@@ -0,0 +1,96 @@
+from xml.etree import ElementTree
+
+import mock
+
+from tests.compat import unittest
+
+from evelink.parsing import lazy
+from evelink.parsing.schema import Computed, Field, Group, Schema
+
+
+class SchemaTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.schema = Schema(
+            Field('id', 'itemID', int),
+            Field('name', 'name'),
+            Field('tax', 'tax', float, default='0'),
+            Computed('flag', lambda a: a['flag'] == '1'),
+            Group('type',
+                Field('id', 'typeID', int),
+                Field('name', 'typeName'),
+            ),
+            Field('extra', 'extra', int, optional=True),
+            Group('owner',
+                Field('id', 'ownerID', int),
+            optional='ownerID'),
+        )
+        self.row = ElementTree.fromstring(
+            '<row itemID="1" name="foo" tax="" flag="1" typeID="2"'
+            ' typeName="bar" />')
+        self.expected = {
+            'id': 1,
+            'name': 'foo',
+            'tax': 0.0,
+            'flag': True,
+            'type': {'id': 2, 'name': 'bar'},
+        }
+
+    def test_decode(self):
+        self.assertEqual(self.expected, self.schema.decode(self.row))
+
+    def test_optional(self):
+        self.row.attrib.update(extra='3', ownerID='4')
+        self.expected.update(extra=3, owner={'id': 4})
+        self.assertEqual(self.expected, self.schema.decode(self.row))
+
+    def test_missing_attribute(self):
+        del self.row.attrib['itemID']
+        self.assertRaises(KeyError, self.schema.decode, self.row)
+
+    def test_projection(self):
+        self.assertEqual({'id': 1, 'type': {'name': 'bar'}},
+            self.schema.decode(self.row, ['id', 'type.name']))
+        self.assertEqual({'type': {'id': 2, 'name': 'bar'}},
+            self.schema.decode(self.row, ['type']))
+        self.assertEqual({}, self.schema.decode(self.row, []))
+
+    def test_projection_errors(self):
+        self.assertRaises(ValueError, self.schema.decoder, ['unknown'])
+        self.assertRaises(ValueError, self.schema.decoder, ['type.unknown'])
+        self.assertRaises(ValueError, self.schema.decoder, ['id.value'])
+
+    def test_decoders_memoized(self):
+        self.assertTrue(self.schema.decoder() is self.schema.decoder())
+        self.assertTrue(self.schema.decoder(['id', 'name'])
+                        is self.schema.decoder(('name', 'id')))
+
+    def test_lazy(self):
+        self.schema.lazy = True
+        with mock.patch.object(lazy, 'enabled', True):
+            row = self.schema.decode(self.row)
+            projected = self.schema.decode(self.row, ['id', 'type.name'])
+        self.assertTrue(isinstance(row, lazy.LazyRow))
+        self.assertEqual(self.expected, row)
+        self.assertTrue(isinstance(projected, lazy.LazyRow))
+        self.assertEqual({'id': 1, 'type': {'name': 'bar'}}, projected)
+
+        self.row.attrib.update(extra='3', ownerID='4')
+        self.expected.update(extra=3, owner={'id': 4})
+        self.assertEqual(self.expected,
+                         lazy.LazyRow(self.row, self.schema.lazy_fields()))
+
+    def test_lazy_opt_in(self):
+        with mock.patch.object(lazy, 'enabled', True):
+            row = self.schema.decode(self.row)
+        self.assertEqual(dict, type(row))
+        self.assertRaises(TypeError, Schema, Field('id', 'id'), other=1)
+
+    def test_group_arguments(self):
+        self.assertRaises(TypeError, Group, 'g', Field('id', 'id'), other=1)
+        self.assertRaises(ValueError, Group, 'g',
+                          Field('id', 'id', optional=True), optional='id')
+
+
+if __name__ == "__main__":
+    unittest.main()
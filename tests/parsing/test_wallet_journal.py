@@ -1,9 +1,8 @@
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import wallet_journal as evelink_w
 
-class WalletJournalTestCase(unittest.TestCase):
+class WalletJournalTestCase(XMLBackendsTestCase):
     def test_wallet_journal(self):
         api_result, _, _ = make_api_result("char/wallet_journal.xml")
 
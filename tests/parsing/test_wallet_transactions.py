@@ -1,11 +1,10 @@
 import mock
 
-from tests.compat import unittest
-from tests.utils import make_api_result
+from tests.utils import XMLBackendsTestCase, make_api_result
 
 from evelink.parsing import wallet_transactions as evelink_w
 
-class TransactionsTestCase(unittest.TestCase):
+class TransactionsTestCase(XMLBackendsTestCase):
 
     def test_parse_wallet_transactions(self):
         api_result, _, _ = make_api_result("char/wallet_transactions.xml")
@@ -1,4 +1,12 @@
-import sys
+import gc
+import itertools
+import mmap
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import weakref
 import zlib
 import mock
 from xml.etree import ElementTree
@@ -8,6 +16,8 @@ from tests.compat import unittest
 from evelink.thirdparty.six import BytesIO as StringIO
 from evelink.thirdparty.six.moves import urllib
 import evelink.api as evelink_api
+from evelink.cache import lru
+from evelink.parsing import backends
 
 # Python 2.6's ElementTree raises xml.parsers.expat.ExpatError instead
 # of ElementTree.ParseError
@@ -21,12 +31,41 @@ def compress(s):
 
 class HelperTestCase(unittest.TestCase):
 
+    def test_clean(self):
+        self.assertEqual(['1', '1,2', 'a'], [evelink_api._clean(v)
+            for v in (1, [1, 2], 'a')])
+
     def test_parse_ts(self):
         self.assertEqual(
             evelink_api.parse_ts("2012-06-12 12:04:33"),
             1339502673,
         )
 
+    def test_parse_ts_sentinel(self):
+        self.assertEqual(evelink_api.parse_ts("0001-01-01 00:00:00"), None)
+        self.assertEqual(evelink_api.parse_ts(""), None)
+
+    def test_parse_ts_unpadded(self):
+        self.assertEqual(
+            evelink_api.parse_ts("2012-06-12 1:4:3"),
+            1339463043,
+        )
+
+    def test_parse_ts_invalid(self):
+        self.assertRaises(ValueError, evelink_api.parse_ts, "2012-02-30 12:04:33")
+        self.assertRaises(ValueError, evelink_api.parse_ts, "2012-06-12 24:04:33")
+        self.assertRaises(ValueError, evelink_api.parse_ts, "2012-06-12")
+
+    @mock.patch.object(evelink_api, 'ts_date_memo_size', 2)
+    @mock.patch.object(evelink_api, '_ts_dates', {})
+    def test_parse_ts_memoized_dates(self):
+        self.assertEqual(evelink_api.parse_ts("2012-06-12 12:04:33"), 1339502673)
+        self.assertEqual(evelink_api.parse_ts("2012-06-12 00:00:01"), 1339459201)
+        self.assertEqual({'2012-06-12': 1339459200}, evelink_api._ts_dates)
+        evelink_api.parse_ts("2012-06-13 00:00:00")
+        evelink_api.parse_ts("2012-06-14 00:00:00")
+        self.assertEqual({'2012-06-14': 1339632000}, evelink_api._ts_dates)
+
 class CacheTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -45,10 +84,12 @@ class APITestCase(unittest.TestCase):
     def setUp(self):
         self.custom_useragent = 'test UA'
         self.cache = mock.MagicMock(spec=evelink_api.APICache)
+        # Test with urllib2, which the mocked urlopen stands in for.
+        patcher = mock.patch.object(evelink_api, 'default_transport',
+                                    evelink_api.UrllibTransport)
+        patcher.start()
+        self.addCleanup(patcher.stop)
         self.api = evelink_api.API(cache=self.cache, user_agent=self.custom_useragent)
-        # force disable requests if enabled.
-        self._has_requests = evelink_api._has_requests
-        evelink_api._has_requests = False
 
         self.test_xml = r"""
                 <?xml version='1.0' encoding='UTF-8'?>
@@ -75,9 +116,6 @@ class APITestCase(unittest.TestCase):
                 </eveapi>
             """.strip().encode()
 
-    def tearDown(self):
-        evelink_api._has_requests = self._has_requests
-
     def test_cache_key(self):
         assert self.api._cache_key('foo/bar', {})
         assert self.api._cache_key('foo/bar', {'baz': 'qux'})
@@ -110,6 +148,26 @@ class APITestCase(unittest.TestCase):
             self.api._cache_key('foo/bar', {'a':1})
         )
 
+    def test_cache_key_memoized_value(self):
+        key = self.api._cache_key('foo/bar', {'a': '1'})
+        self.assertEqual(key, self.api._cache_key('foo/bar', {'a': '1'}))
+        self.assertEqual(
+            "%s-56cdb36bbb5ad30d7d50556509d657d05eae0250" % self.api.CACHE_VERSION,
+            self.api._cache_key('foo/bar', {'a': 1})
+        )
+        self.assertNotEqual(
+            self.api._cache_key('foo/bar', {'a': 1}),
+            self.api._cache_key('foo/bar', {'a': True}),
+        )
+
+    @mock.patch.object(evelink_api, '_cache_keys', {})
+    def test_cache_key_memoized_with_credentials(self):
+        api = evelink_api.API(api_key=(1, 'code'))
+        params = api._request_params('foo/bar', {'a': 1})
+        self.assertEqual({'a': '1', 'keyID': '1', 'vCode': 'code'}, params)
+        key = api._cache_key('foo/bar', params)
+        self.assertEqual([key], list(evelink_api._cache_keys.values()))
+
     @mock.patch('evelink.thirdparty.six.moves.urllib.request.urlopen')
     def test_get(self, mock_urlopen):
         # mock up an urlopen compatible response object and pretend to have no
@@ -133,6 +191,36 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(current, 1255885531)
         self.assertEqual(expiry, 1258563931)
 
+    def test_full_path(self):
+        self.assertEqual("https://api.eveonline.com/foo/Bar.xml.aspx",
+                         self.api._full_path('foo/Bar'))
+        api = evelink_api.API(base_url='http://127.0.0.1:8080/', cache=self.cache)
+        self.assertEqual("http://127.0.0.1:8080/foo/Bar.xml.aspx",
+                         api._full_path('foo/Bar'))
+
+    @mock.patch('evelink.thirdparty.six.moves.urllib.request.urlopen')
+    def test_get_with_xml_backend(self, mock_urlopen):
+        mock_urlopen.return_value.read.return_value = self.test_xml
+        self.cache.get.return_value = None
+
+        backend = backends.ElementTreeBackend()
+        backend.fromstring = mock.Mock(side_effect=backend.fromstring)
+        api = evelink_api.API(cache=self.cache, xml_backend=backend)
+        result, current, expiry = api.get('foo/Bar')
+
+        self.assertEqual(1, backend.fromstring.call_count)
+        rows = result.find('rowset').findall('row')
+        self.assertEqual(['bar', 'baz'], [row.attrib['foo'] for row in rows])
+        self.assertEqual((current, expiry), (1255885531, 1258563931))
+
+    @mock.patch.object(evelink_api, 'default_xml_backend', 'etree')
+    @mock.patch.object(backends, 'lxml', mock.Mock())
+    def test_default_xml_backend(self):
+        api = evelink_api.API(cache=self.cache)
+        self.assertTrue(isinstance(api.xml_backend, backends.ElementTreeBackend))
+        api = evelink_api.API(cache=self.cache, xml_backend='lxml')
+        self.assertTrue(isinstance(api.xml_backend, backends.LxmlBackend))
+
     @mock.patch('evelink.thirdparty.six.moves.urllib.request.urlopen')
     def test_useragent(self, mock_urlopen):
         mock_urlopen.return_value.read.return_value = self.test_xml
@@ -251,6 +339,38 @@ class APITestCase(unittest.TestCase):
 
         self.assertEqual(request_dict, expected_request_dict)
 
+    @mock.patch('evelink.thirdparty.six.moves.urllib.request.urlopen')
+    def test_get_public_path(self, mock_urlopen):
+        mock_urlopen.return_value.read.return_value = self.test_xml
+        self.cache.get.return_value = None
+
+        api = evelink_api.API(cache=self.cache, api_key=(1, 'code'))
+        api.get('eve/AllianceList', {'a': 1})
+
+        # Credentials are neither sent nor part of the cache key.
+        request = mock_urlopen.call_args[0][0]
+        self.assertEqual(urllib.parse.parse_qs(request.data.decode()), {'a': ['1']})
+        self.assertEqual(
+            self.cache.get.call_args[0][0],
+            self.api._cache_key('eve/AllianceList', {'a': '1'}),
+        )
+
+    def test_public_path_shares_cache_entry(self):
+        cache = evelink_api.APICache()
+        apis = [
+            evelink_api.API(cache=cache, api_key=(1, 'code')),
+            evelink_api.API(cache=cache, sso_token=(123, 'character')),
+            evelink_api.API(cache=cache),
+        ]
+        for api in apis:
+            api.send_request = mock.Mock(return_value=(self.test_xml, None))
+            api.get('server/ServerStatus')
+            api.get('char/AccountBalance')
+
+        self.assertEqual(
+            [api.send_request.call_count for api in apis], [2, 1, 1])
+        self.assertEqual(len(cache.cache), 4)
+
     @mock.patch('evelink.thirdparty.six.moves.urllib.request.urlopen')
     def test_get_with_error(self, mock_urlopen):
         # I had to go digging in the source code for urllib2 to find out
@@ -364,6 +484,668 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(current, 1255885531)
         self.assertEqual(expiry, 1258563931)
 
+class GetManyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = evelink_api.APICache()
+        self.api = evelink_api.API(cache=self.cache)
+        self.api.send_request = mock.Mock(side_effect=self._send_request)
+
+        self.xml_template = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result><value>%s</value></result>
+                    <cachedUntil>2009-11-18 17:05:31</cachedUntil>
+                </eveapi>
+            """.strip()
+
+        self.error_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <error code="123">
+                        Test error message.
+                    </error>
+                    <cachedUntil>2009-11-18 19:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+    def _send_request(self, full_path, params):
+        if 'error' in params:
+            return self.error_xml, None
+        return (self.xml_template % params['v']).encode(), None
+
+    def _values(self, results):
+        return [r.result.find('value').text for r in results]
+
+    def test_get_many(self):
+        results = self.api.get_many([
+            ('foo/Bar', {'v': 1}),
+            ('foo/Bar', {'v': 2}),
+            ('foo/Baz', {'v': 3}),
+        ])
+
+        self.assertEqual(self._values(results), ['1', '2', '3'])
+        self.assertEqual(results[0].timestamp, 1255885531)
+        self.assertEqual(results[0].expires, 1258563931)
+        self.assertEqual(self.api.send_request.call_count, 3)
+
+    def test_get_many_only_sends_misses(self):
+        self.api.get('foo/Bar', {'v': 2})
+        self.api.send_request.reset_mock()
+
+        results = self.api.get_many([
+            ('foo/Bar', {'v': 1}),
+            ('foo/Bar', {'v': 2}),
+        ])
+
+        self.assertEqual(self._values(results), ['1', '2'])
+        self.api.send_request.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'v': '1'})
+
+    def test_get_many_sends_duplicates_once(self):
+        results = self.api.get_many([
+            ('foo/Bar', {'v': 1}),
+            ('foo/Bar', {'v': [1]}),
+        ])
+
+        self.assertEqual(self._values(results), ['1', '1'])
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+    def test_get_many_with_errors(self):
+        self.api.get_many([('foo/Bar', {'v': 1, 'error': 1})])
+
+        results = self.api.get_many([
+            ('foo/Bar', {'v': 1, 'error': 1}),
+            ('foo/Bar', {'v': 2}),
+            ('foo/Bar', {'v': 3, 'error': 1}),
+        ])
+
+        self.assertTrue(isinstance(results[0], evelink_api.APIError))
+        self.assertEqual(results[0].code, '123')
+        self.assertEqual(results[1].result.find('value').text, '2')
+        self.assertTrue(isinstance(results[2], evelink_api.APIError))
+
+    def test_get_many_max_workers(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def send_request(full_path, params):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.01)
+            with lock:
+                state['running'] -= 1
+            return self._send_request(full_path, params)
+        self.api.send_request.side_effect = send_request
+
+        results = self.api.get_many(
+            [('foo/Bar', {'v': i}) for i in range(10)], max_workers=3)
+
+        self.assertEqual(self._values(results), [str(i) for i in range(10)])
+        self.assertTrue(1 <= state['peak'] <= 3)
+
+
+class Chunks(object):
+    """Closeable iterator over response chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.chunks)
+    next = __next__
+
+    def close(self):
+        self.closed = True
+
+
+class StreamTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = evelink_api.APICache()
+        self.api = evelink_api.API(cache=self.cache,
+                                   transport=evelink_api.UrllibTransport())
+        self.api.send_request_stream = mock.Mock()
+
+        self.test_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <rowset name="first">
+                            <row id="1"><rowset><row id="11" /></rowset></row>
+                            <row id="2" />
+                        </rowset>
+                        <rowset name="second">
+                            <row id="3" />
+                        </rowset>
+                    </result>
+                    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+        self.error_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <error code="123">
+                        Test error message.
+                    </error>
+                    <cachedUntil>2009-11-18 19:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+    def respond(self, body, robj=None, chunk_size=7):
+        chunks = [body[i:i+chunk_size] for i in range(0, len(body), chunk_size)]
+        self.chunks = Chunks(chunks)
+        self.api.send_request_stream.return_value = (self.chunks, robj)
+
+    def parse_row(self, row):
+        return (row.attrib['id'], [r.attrib['id'] for r in row.iter('row')][1:])
+
+    def test_stream(self):
+        self.respond(self.test_xml)
+        rows = self.api.stream('foo/Bar', {'a': 1}, self.parse_row)
+
+        # The request is sent right away, but only cached once consumed.
+        self.api.send_request_stream.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'a': '1'})
+        key = self.api._cache_key('foo/Bar', {'a': '1'})
+        self.assertEqual(None, self.cache.get(key))
+
+        self.assertEqual([('1', ['11']), ('2', [])], list(rows))
+        self.assertEqual(self.test_xml, self.cache.get(key))
+        self.assertEqual(self.api.last_timestamps, {
+            'current_time': 1255885531,
+            'cached_until': 1255889131,
+        })
+        self.assertTrue(self.chunks.closed)
+
+    def test_stream_with_xml_backend(self):
+        self.api.xml_backend = backends.ElementTreeBackend()
+        self.api.xml_backend.iterparse = mock.Mock(
+            side_effect=self.api.xml_backend.iterparse)
+        self.respond(self.test_xml)
+        rows = self.api.stream('foo/Bar', {}, self.parse_row)
+        self.assertEqual([('1', ['11']), ('2', [])], list(rows))
+        self.assertEqual(1, self.api.xml_backend.iterparse.call_count)
+        self.assertEqual(self.test_xml,
+                         self.cache.get(self.api._cache_key('foo/Bar', {})))
+
+    def test_stream_abandoned(self):
+        self.respond(self.test_xml)
+        rows = self.api.stream('foo/Bar', {}, self.parse_row)
+        self.assertEqual(('1', ['11']), next(rows))
+        rows.close()
+        self.assertTrue(self.chunks.closed)
+        self.assertEqual(None, self.cache.get(self.api._cache_key('foo/Bar', {})))
+
+    def test_stream_matches_get(self):
+        self.respond(self.test_xml)
+        streamed = list(self.api.stream('foo/Bar', {}, self.parse_row))
+        # Served from the cache filled by the stream
+        result = self.api.get('foo/Bar').result
+        self.assertEqual(
+            [self.parse_row(row) for row in result.find('rowset').findall('row')],
+            streamed)
+
+    def test_stream_discards_rows(self):
+        self.respond(self.test_xml.replace(
+            b'<row id="2" />', b'<row id="2" />' * 10))
+        rows = list(itertools.islice(
+            self.api.stream('foo/Bar', {}, weakref.ref), 10))
+        # Consumed rows are dropped from the (partial) tree, although
+        # the parser may briefly hold on to the latest ones.
+        gc.collect()
+        self.assertTrue(all(row() is None for row in rows[:5]))
+
+    def test_stream_cached(self):
+        self.cache.put(self.api._cache_key('foo/Bar', {}), self.test_xml, 3600)
+        self.assertEqual(2, len(list(self.api.stream('foo/Bar', {}, self.parse_row))))
+        self.assertFalse(self.api.send_request_stream.called)
+
+    @mock.patch('evelink.api.stream_spill_size', 100)
+    def test_stream_spills_to_file(self):
+        self.respond(self.test_xml)
+        self.assertEqual(2, len(list(self.api.stream('foo/Bar', {}, self.parse_row))))
+
+        cached = self.cache.get(self.api._cache_key('foo/Bar', {}))
+        self.assertTrue(isinstance(cached, mmap.mmap))
+        self.assertEqual(self.test_xml, cached[:])
+        self.assertEqual('1', self.api.get('foo/Bar').result.find('rowset/row').attrib['id'])
+
+    def test_stream_raise_api_error(self):
+        self.respond(self.error_xml)
+        rows = self.api.stream('eve/Error', {}, self.parse_row)
+        self.assertRaises(evelink_api.APIError, list, rows)
+        self.assertEqual(self.api.last_timestamps, {
+            'current_time': 1255885531,
+            'cached_until': 1258571131,
+        })
+        self.assertEqual(self.error_xml,
+            self.cache.get(self.api._cache_key('eve/Error', {})))
+
+    def test_stream_raise_http_error(self):
+        robj = mock.Mock()
+        self.api.maybe_raise_http_error = mock.Mock(
+            side_effect=urllib.error.HTTPError('url', 500, 'Oops', {}, None))
+        self.respond(b'Not XML', robj)
+        rows = self.api.stream('foo/Bar', {}, self.parse_row)
+        self.assertRaises(urllib.error.HTTPError, list, rows)
+        self.api.maybe_raise_http_error.assert_called_once_with(robj)
+        self.assertEqual(0, len(list(self.cache.entries())))
+
+    @mock.patch('evelink.thirdparty.six.moves.urllib.request.urlopen')
+    def test_urllib2_stream_gzip(self, mock_urlopen):
+        del self.api.send_request_stream
+        body = StringIO(compress(self.test_xml))
+        mock_urlopen.return_value.read.side_effect = body.read
+        mock_urlopen.return_value.info.return_value = {'Content-Encoding': 'gzip'}
+
+        with mock.patch('evelink.api.stream_chunk_size', 16):
+            rows = list(self.api.stream('foo/Bar', {}, self.parse_row))
+        self.assertEqual([('1', ['11']), ('2', [])], rows)
+        self.assertTrue(mock_urlopen.return_value.read.call_count > 2)
+        mock_urlopen.return_value.close.assert_called_once_with()
+
+
+class SingleFlightTestCase(unittest.TestCase):
+
+    def _run_threads(self, count, target):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_do_coalesces_concurrent_calls(self):
+        flight = evelink_api.SingleFlight()
+        release = threading.Event()
+        func = mock.Mock(side_effect=lambda: release.wait() and 'result')
+        results = []
+
+        def call():
+            results.append(flight.do('key', func))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(results, ['result'] * 5)
+
+    def test_do_shares_exceptions(self):
+        flight = evelink_api.SingleFlight()
+        release = threading.Event()
+        error = evelink_api.APIError(123, 'Test error')
+        errors = []
+
+        def func():
+            release.wait()
+            raise error
+
+        def call():
+            try:
+                flight.do('key', func)
+            except evelink_api.APIError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [error] * 3)
+
+    def test_do_sequential_calls(self):
+        flight = evelink_api.SingleFlight()
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+        self.assertEqual(flight.do('key', lambda: 2), 2)
+
+    @unittest.skipIf(evelink_api.fcntl is None, 'fcntl not available')
+    def test_do_with_lock_dir(self):
+        lock_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, lock_dir)
+        # Separate SingleFlight instances stand in for separate processes.
+        flights = [evelink_api.SingleFlight(lock_dir=lock_dir) for _ in range(2)]
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def func():
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+
+        threads = [threading.Thread(target=f.do, args=('key', func))
+                   for f in flights]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(state['peak'], 1)
+
+    def test_api_get_coalesces_concurrent_calls(self):
+        xml = r"""
+            <?xml version='1.0' encoding='UTF-8'?>
+            <eveapi version="2">
+                <currentTime>2009-10-18 17:05:31</currentTime>
+                <result><value>1</value></result>
+                <cachedUntil>2009-11-18 17:05:31</cachedUntil>
+            </eveapi>
+        """.strip().encode()
+
+        def send_request(full_path, params):
+            time.sleep(0.05)
+            return xml, None
+
+        api = evelink_api.API(cache=evelink_api.APICache())
+        api.send_request = mock.Mock(side_effect=send_request)
+        results = []
+
+        def call():
+            results.append(api.get('eve/AllianceList'))
+        self._run_threads(5, call)
+
+        self.assertEqual(api.send_request.call_count, 1)
+        self.assertEqual(len(results), 5)
+        self.assertEqual([r.result.find('value').text for r in results], ['1'] * 5)
+
+
+class ResultCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <rowset>
+                            <row foo="bar" />
+                            <row foo="baz" />
+                        </rowset>
+                    </result>
+                    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+        self.result_cache = evelink_api.APICache()
+        self.api = evelink_api.API(
+            cache=evelink_api.APICache(), result_cache=self.result_cache)
+        self.api.send_request = mock.Mock(return_value=(self.xml, None))
+        # Pretend our clock agrees with the API's.
+        self.api._clock_offset = 1255885531 - time.time()
+
+        self.parse = parse = mock.Mock()
+
+        class Client(object):
+            def __init__(self, api):
+                self.api = api
+
+            @evelink_api.auto_call('foo/Bar', map_params={'limit': 'limit'})
+            def rows(self, limit=None, api_result=None):
+                parse(limit)
+                rows = api_result.result.find('rowset').findall('row')
+                result = dict((i, {'foo': row.attrib['foo']})
+                              for i, row in enumerate(rows[:limit]))
+                return evelink_api.APIResult(
+                    result, api_result.timestamp, api_result.expires)
+
+        self.client = Client(self.api)
+
+    def test_result_cache_hit(self):
+        first = self.client.rows()
+        second = self.client.rows()
+
+        self.assertEqual(first, ({0: {'foo': 'bar'}, 1: {'foo': 'baz'}},
+                                 1255885531, 1255889131))
+        self.assertEqual(first, second)
+        self.assertTrue(isinstance(second, evelink_api.APIResult))
+        self.assertEqual(self.parse.call_count, 1)
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+    def test_result_cache_hit_sets_last_timestamps(self):
+        self.client.rows()
+        self.api._set_last_timestamps(0, 0)
+        self.client.rows()
+        self.assertEqual(self.api.last_timestamps,
+                         {'current_time': 1255885531, 'cached_until': 1255889131})
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+    def test_result_cache_returns_copies(self):
+        self.client.rows()
+        self.client.rows().result[0]['foo'] = 'qux'
+        self.assertEqual(self.client.rows().result[0], {'foo': 'bar'})
+
+    def test_result_cache_key_includes_args(self):
+        self.assertEqual(len(self.client.rows(limit=1).result), 1)
+        self.assertEqual(len(self.client.rows().result), 2)
+        self.assertEqual(len(self.client.rows(limit=1).result), 1)
+        self.assertEqual(self.parse.mock_calls,
+                         [mock.call(1), mock.call(None)])
+
+    def test_result_cache_expiry(self):
+        self.result_cache.put = mock.Mock()
+        self.client.rows()
+
+        (key, value, duration), _ = self.result_cache.put.call_args
+        self.assertTrue(key.startswith('%s.rows-' % __name__))
+        self.assertTrue(3590 < duration <= 3600)
+
+    def test_result_cache_disabled(self):
+        self.api.result_cache = None
+        self.client.rows()
+        self.client.rows()
+        self.assertEqual(self.parse.call_count, 2)
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+
+class CachePolicyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result><value>%s</value></result>
+                    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+                </eveapi>
+            """.strip()
+        self.cache = evelink_api.APICache()
+        self.policy = evelink_api.CachePolicy(
+            stale_while_revalidate=60, stale_if_error=600)
+        self.api = evelink_api.API(cache=self.cache, cache_policy=self.policy)
+        self.responses = ['old', 'new']
+        self.fetched = threading.Event()
+
+        def send_request(full_path, params):
+            response = self.responses.pop(0)
+            self.fetched.set()
+            if isinstance(response, Exception):
+                raise response
+            return (self.xml % response).encode(), None
+        self.api.send_request = mock.Mock(side_effect=send_request)
+
+        time_patcher = mock.patch('time.time', return_value=1000)
+        self.time = time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+        self.api.get('foo/Bar')
+        self.fetched.clear()
+
+    def _value(self, result):
+        return result.result.find('value').text
+
+    def test_fresh_hit(self):
+        self.time.return_value = 1000 + 3599
+        result = self.api.get('foo/Bar')
+        self.assertEqual(self._value(result), 'old')
+        self.assertFalse(result.stale)
+        self.assertEqual(self.api.send_request.call_count, 1)
+
+    def test_cache_durations(self):
+        key = self.api._cache_key('foo/Bar', {})
+        # One entry, kept for the grace period past its expiry.
+        self.assertEqual([key], [k for k, _, _ in self.cache.entries()])
+        (expires_at, _), cached_until = self.cache.get_entry(key)
+        self.assertEqual(expires_at, 1000 + 3600)
+        self.assertEqual(cached_until, 1000 + 3600 + 600)
+
+    def test_shared_with_plain_api(self):
+        plain = evelink_api.API(cache=self.cache)
+        plain.send_request = self.api.send_request
+        self.time.return_value = 1000 + 3600 + 30
+        # Expired for an API without a policy too.
+        self.assertEqual(self._value(plain.get('foo/Bar')), 'new')
+        self.assertEqual(self.api.send_request.call_count, 2)
+        # And what it fetched is fresh for this one.
+        result = self.api.get('foo/Bar')
+        self.assertEqual(self._value(result), 'new')
+        self.assertFalse(result.stale)
+        self.assertEqual(self.api.send_request.call_count, 2)
+
+    def test_cache_without_get_entry(self):
+        class DictCache(evelink_api.APICache):
+            def __init__(self):
+                self.values = {}
+
+            def get(self, key):
+                return self.values.get(key)
+
+            def put(self, key, value, duration):
+                self.values[key] = value
+
+        # Entries that are never dropped still expire.
+        self.api.cache = DictCache()
+        self.responses = ['old', urllib.error.URLError('Timed out')]
+        self.api.get('foo/Bar')
+        self.time.return_value = 1000 + 3600 + 300
+        result = self.api.get('foo/Bar')
+        self.assertEqual(self._value(result), 'old')
+        self.assertTrue(result.stale)
+
+    def test_stale_while_revalidate(self):
+        self.time.return_value = 1000 + 3600 + 30
+        result = self.api.get('foo/Bar')
+
+        self.assertEqual(self._value(result), 'old')
+        self.assertTrue(result.stale)
+        self.assertTrue(isinstance(result, evelink_api.StaleAPIResult))
+
+        self.assertTrue(self.fetched.wait(5))
+        for _ in range(100):
+            result = self.api.get('foo/Bar')
+            if not result.stale:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self._value(result), 'new')
+        self.assertEqual(self.api.send_request.call_count, 2)
+
+    def test_stale_if_error(self):
+        self.responses = [urllib.error.URLError('Timed out')]
+        self.time.return_value = 1000 + 3600 + 300
+        result = self.api.get('foo/Bar')
+
+        self.assertEqual(self._value(result), 'old')
+        self.assertTrue(result.stale)
+
+    def test_stale_if_server_api_error(self):
+        self.responses = [evelink_api.APIError('902', 'Backend disabled')]
+        self.time.return_value = 1000 + 3600 + 300
+        self.assertTrue(self.api.get('foo/Bar').stale)
+
+    def test_client_api_error_not_masked(self):
+        self.responses = [evelink_api.APIError('203', 'Authentication failure')]
+        self.time.return_value = 1000 + 3600 + 300
+        self.assertRaises(evelink_api.APIError, self.api.get, 'foo/Bar')
+
+    def test_programming_error_not_masked(self):
+        self.responses = [TypeError('oops')]
+        self.time.return_value = 1000 + 3600 + 300
+        self.assertRaises(TypeError, self.api.get, 'foo/Bar')
+
+    def test_is_upstream_error(self):
+        def http_error(code):
+            return urllib.error.HTTPError('url', code, 'msg', {}, None)
+        for e in (urllib.error.URLError('Timed out'), socket.timeout(),
+                  http_error(503), evelink_api.APIError('902', 'Backend')):
+            self.assertTrue(evelink_api._is_upstream_error(e), e)
+        for e in (http_error(404), evelink_api.APIError('203', 'Auth'),
+                  ValueError(), AttributeError()):
+            self.assertFalse(evelink_api._is_upstream_error(e), e)
+
+    def test_stale_beyond_grace(self):
+        self.responses = [urllib.error.URLError('Timed out')]
+        self.time.return_value = 1000 + 3600 + 601
+        self.assertRaises(urllib.error.URLError, self.api.get, 'foo/Bar')
+
+    def test_refetch_after_revalidate_window(self):
+        self.time.return_value = 1000 + 3600 + 300
+        result = self.api.get('foo/Bar')
+        self.assertEqual(self._value(result), 'new')
+        self.assertFalse(result.stale)
+
+    def test_get_many_stale_while_revalidate(self):
+        self.time.return_value = 1000 + 3600 + 30
+        result, = self.api.get_many([('foo/Bar', {})])
+        self.assertEqual(self._value(result), 'old')
+        self.assertTrue(result.stale)
+        self.assertTrue(self.fetched.wait(5))
+        self.assertEqual(self.api.send_request.call_count, 2)
+
+    def test_get_many_stale_if_error(self):
+        self.responses = [urllib.error.URLError('Timed out')]
+        self.time.return_value = 1000 + 3600 + 300
+        result, = self.api.get_many([('foo/Bar', {})])
+        self.assertEqual(self._value(result), 'old')
+        self.assertTrue(result.stale)
+
+    def test_get_many_stale_beyond_grace(self):
+        self.responses = [urllib.error.URLError('Timed out')]
+        self.time.return_value = 1000 + 3600 + 601
+        result, = self.api.get_many([('foo/Bar', {})])
+        self.assertTrue(isinstance(result, urllib.error.URLError))
+
+    def test_get_many_refetch_after_revalidate_window(self):
+        self.time.return_value = 1000 + 3600 + 300
+        result, = self.api.get_many([('foo/Bar', {})])
+        self.assertEqual(self._value(result), 'new')
+        self.assertFalse(result.stale)
+
+    def test_auto_call_marks_stale(self):
+        class Client(object):
+            def __init__(self, api):
+                self.api = api
+
+            @evelink_api.auto_call('foo/Bar')
+            def value(self, api_result=None):
+                return evelink_api.APIResult(
+                    api_result.result.find('value').text,
+                    api_result.timestamp, api_result.expires)
+
+        self.responses = [urllib.error.URLError('Timed out')]
+        self.time.return_value = 1000 + 3600 + 300
+        result = Client(self.api).value()
+        self.assertEqual(result, ('old', 1255885531, 1255889131))
+        self.assertTrue(result.stale)
+
+
 class AutoCallTestCase(unittest.TestCase):
 
     def test_python_func(self):
@@ -572,6 +1354,385 @@ class AutoCallTestCase(unittest.TestCase):
         )
         self.assertFalse(client.get.called)
 
+    def _plan_func(self):
+        @evelink_api.auto_call(
+            'foo/bar',
+            map_params={'char_id': 'id', 'limit': 'limit'}
+        )
+        def func(self, char_id, limit=None, api_result=None):
+            pass
+        return func
+
+    def test_call_wrapped_method_unexpected_keyword(self):
+        func = self._plan_func()
+        client = mock.Mock(name='client')
+        self.assertRaises(TypeError, func, client, 1, before_kill=3)
+        self.assertFalse(client.api.get.called)
+
+    def test_call_wrapped_method_multiple_values(self):
+        func = self._plan_func()
+        client = mock.Mock(name='client')
+        self.assertRaises(TypeError, func, client, 1, char_id=2)
+        self.assertFalse(client.api.get.called)
+
+    def test_call_wrapped_method_too_few_args(self):
+        func = self._plan_func()
+        client = mock.Mock(name='client')
+        self.assertRaises(TypeError, func, client, limit=2)
+        self.assertFalse(client.api.get.called)
+
+    def test_call_wrapped_method_all_keywords(self):
+        func = self._plan_func()
+        client = mock.Mock(name='client')
+        func(client, limit=2, char_id=1)
+        client.api.get.assert_called_once_with(
+            'foo/bar',
+            params={'id': 1, 'limit': 2}
+        )
+
+    def test_call_plan_matches_map_func_args(self):
+        func = self._plan_func()
+        specs = func._request_specs
+        client = mock.Mock(name='client')
+        for args, kw in [((1,), {}), ((1, 2), {}), ((1,), {'limit': 2}),
+                         ((), {'char_id': 1}), ((None,), {'limit': 0})]:
+            args_map = evelink_api.map_func_args(
+                args, kw, specs['args'], specs['defaults'])
+            params = evelink_api.translate_args(args_map, specs['map_params'])
+            self.assertEqual(
+                dict((k, v) for k, v in params.items() if v is not None),
+                func._call_plan(client, args, kw)
+            )
+
+    def test_call_plan_flags(self):
+        func = self._plan_func()
+        client = mock.Mock(name='client')
+        self.assertEqual({'id': 1, 'limit': 1}, func._call_plan(client, (1, True), {}))
+        self.assertEqual({'id': 1}, func._call_plan(client, (1,), {'limit': False}))
+        self.assertEqual({'id': 1, 'limit': 0}, func._call_plan(client, (1, 0), {}))
+
+
+class Recorder(evelink_api.APIObserver):
+
+    def __init__(self):
+        self.events = []
+
+    def observe(self, event):
+        self.events.append(event)
+
+
+class ObserverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <rowset>
+                            <row foo="bar" />
+                            <row foo="baz" />
+                        </rowset>
+                    </result>
+                    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+        self.error_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <error code="123">Test error message.</error>
+                    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+        self.recorder = Recorder()
+        self.api = evelink_api.API(cache=evelink_api.APICache(),
+                                   observers=[self.recorder])
+        self.robj = mock.Mock(status_code=200)
+        self.api.send_request = mock.Mock(return_value=(self.xml, self.robj))
+        self.api.send_request_stream = mock.Mock(
+            side_effect=lambda path, params: (iter([self.xml]), self.robj))
+        # Pretend our clock agrees with the API's, for the result cache.
+        self.api._clock_offset = 1255885531 - time.time()
+
+        class Client(object):
+            def __init__(self, api):
+                self.api = api
+
+            @evelink_api.auto_call('foo/Bar')
+            def rows(self, api_result=None):
+                rows = api_result.result.find('rowset').findall('row')
+                return evelink_api.APIResult(
+                    [row.attrib['foo'] for row in rows],
+                    api_result.timestamp, api_result.expires)
+
+            @evelink_api.auto_call('foo/Bar', parse_row=lambda row: row.attrib['foo'])
+            def rows_iter(self, rows=None):
+                return rows
+
+        self.client = Client(self.api)
+
+    def test_get(self):
+        self.api.get('foo/Bar')
+        self.api.get('foo/Bar')
+
+        miss, hit = self.recorder.events
+        self.assertEqual(('foo/Bar', None, 'miss', 200, len(self.xml)),
+                         (miss.path, miss.method, miss.cache, miss.status, miss.bytes))
+        self.assertTrue(miss.network_time >= 0)
+        self.assertTrue(miss.parse_time >= 0)
+        self.assertTrue(miss.total_time >= miss.network_time + miss.parse_time)
+        self.assertEqual(None, miss.result_time)
+        self.assertEqual(('hit', None, None), (hit.cache, hit.status, hit.network_time))
+        self.assertTrue(hit.parse_time >= 0)
+
+    def test_api_error(self):
+        self.api.send_request.return_value = (self.error_xml, self.robj)
+        self.assertRaises(evelink_api.APIError, self.api.get, 'foo/Bar')
+        event, = self.recorder.events
+        self.assertEqual('123', event.error_code)
+        self.assertTrue(isinstance(event.error, evelink_api.APIError))
+
+    def test_network_error(self):
+        self.api.send_request.side_effect = IOError("connection refused")
+        self.assertRaises(IOError, self.api.get, 'foo/Bar')
+        event, = self.recorder.events
+        self.assertEqual(('miss', None), (event.cache, event.error_code))
+        self.assertTrue(isinstance(event.error, IOError))
+
+    def test_auto_call(self):
+        self.assertEqual(['bar', 'baz'], self.client.rows().result)
+        event, = self.recorder.events
+        self.assertEqual(('foo/Bar', 'tests.test_api.rows', 'miss'),
+                         (event.path, event.method, event.cache))
+        self.assertTrue(event.result_time >= 0)
+
+    def test_result_cache(self):
+        self.api.result_cache = evelink_api.APICache()
+        self.client.rows()
+        self.client.rows()
+        self.assertEqual(['miss', 'result'], [e.cache for e in self.recorder.events])
+
+    def test_stream(self):
+        self.assertEqual(['bar', 'baz'], list(self.client.rows_iter()))
+        self.assertEqual(['bar', 'baz'], list(self.client.rows_iter()))
+        miss, hit = self.recorder.events
+        self.assertEqual(('foo/Bar', 'tests.test_api.rows_iter', 'miss', 200, len(self.xml)),
+                         (miss.path, miss.method, miss.cache, miss.status, miss.bytes))
+        self.assertTrue(miss.network_time >= 0)
+        self.assertEqual(('hit', len(self.xml)), (hit.cache, hit.bytes))
+
+    def test_get_many(self):
+        self.api.get('foo/Bar')
+        self.api.get_many([('foo/Bar', {}), ('foo/Baz', {})])
+        self.assertEqual([('foo/Bar', 'miss'), ('foo/Bar', 'hit'), ('foo/Baz', 'miss')],
+                         [(e.path, e.cache) for e in self.recorder.events])
+
+    def test_failing_observer(self):
+        class Failing(evelink_api.APIObserver):
+            def observe(self, event):
+                raise RuntimeError()
+        self.api.observers.insert(0, Failing())
+        self.api.get('foo/Bar')
+        self.assertEqual(1, len(self.recorder.events))
+
+    def test_invalid_observer(self):
+        self.assertRaises(ValueError, evelink_api.API, observers=[mock.Mock()])
+
+    def test_no_observers(self):
+        self.api.observers = []
+        self.client.rows()
+        self.assertEqual([], self.recorder.events)
+
+
+class ThreadSafetyTestCase(unittest.TestCase):
+    """Many threads sharing one API instance."""
+
+    threads = 16
+    calls = 200
+
+    def response(self, path, params):
+        # Each path has its own timestamps.
+        n = int(path.split('/')[-1][len('Path'):])
+        return (("<?xml version='1.0' encoding='UTF-8'?><eveapi version='2'>"
+                 "<currentTime>2009-10-18 17:%02d:00</currentTime>"
+                 "<result><n>%d</n></result>"
+                 "<cachedUntil>2009-10-18 18:%02d:00</cachedUntil></eveapi>"
+                 ) % (n, n, n)).encode(), None
+
+    def run_threads(self, target):
+        start = threading.Event()
+        errors = []
+
+        def run(i):
+            start.wait()
+            try:
+                target(i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+
+    def test_shared_instance(self):
+        cache = evelink_api.APICache()
+        api = evelink_api.API(cache=cache)
+        api.send_request = mock.Mock(side_effect=lambda full_path, params: (
+            time.sleep(0.0001), self.response(full_path[:-len('.xml.aspx')], params))[1])
+
+        def work(i):
+            for j in range(self.calls):
+                n = (i + j) % 10
+                if j % 50 == 0:
+                    # Expire everything, so threads race to refetch.
+                    for key in list(cache.cache):
+                        cache.cache[key] = (cache.cache[key][0], 0)
+                result, current, expires = api.get('foo/Path%d' % n)
+                self.assertEqual(str(n), result.find('n').text)
+                self.assertEqual(1255885200 + 60 * n, current)
+                self.assertEqual(1255888800 + 60 * n, expires)
+                self.assertEqual({'current_time': current, 'cached_until': expires},
+                                 api.last_timestamps)
+
+        self.run_threads(work)
+        self.assertTrue(api.send_request.call_count >= 10)
+
+    def test_last_timestamps_per_thread(self):
+        api = evelink_api.API(cache=evelink_api.APICache())
+        api.send_request = mock.Mock(side_effect=lambda full_path, params:
+                                     self.response(full_path[:-len('.xml.aspx')], params))
+        api.get('foo/Path1')
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(dict(api.last_timestamps)))
+        thread.start()
+        thread.join()
+        self.assertEqual([{'current_time': 0, 'cached_until': 0}], seen)
+        self.assertEqual(1255885260, api.last_timestamps['current_time'])
+
+    @unittest.skipIf(evelink_api.requests is None, '`requests` not available')
+    def test_session_created_once(self):
+        transport = evelink_api.API().transport
+        sessions = []
+
+        def new_session():
+            time.sleep(0.01)
+            sessions.append(mock.Mock())
+            return sessions[-1]
+
+        with mock.patch.object(transport, '_new_session', side_effect=new_session):
+            self.run_threads(lambda i: transport._session())
+        self.assertEqual(1, len(sessions))
+        self.assertTrue(transport.session is sessions[0])
+
+    @unittest.skipIf(evelink_api.requests is None, '`requests` not available')
+    def test_given_session(self):
+        session = mock.Mock()
+        api = evelink_api.API(session=session)
+        self.assertTrue(isinstance(api.transport, evelink_api.RequestsTransport))
+        self.assertTrue(api.transport._session() is session)
+        self.assertFalse(session.headers.update.called)
+        self.assertRaises(ValueError, evelink_api.API, session=session,
+                          transport=evelink_api.UrllibTransport())
+
+    @unittest.skipIf(evelink_api.requests is None, '`requests` not available')
+    @mock.patch.object(evelink_api, 'requests_pool_size', 32)
+    def test_pool_size(self):
+        session = evelink_api.API().transport._session()
+        self.assertEqual(32, session.get_adapter('https://api.eveonline.com')._pool_maxsize)
+        session = evelink_api.API(pool_size=4).transport._session()
+        self.assertEqual(4, session.get_adapter('https://api.eveonline.com')._pool_maxsize)
+
+    def test_default_transport(self):
+        expected = (evelink_api.PooledTransport if evelink_api.requests is None
+                    else evelink_api.RequestsTransport)
+        self.assertTrue(evelink_api.default_transport is expected)
+        self.assertTrue(isinstance(evelink_api.API().transport, expected))
+        with mock.patch.object(evelink_api, 'default_transport') as default:
+            api = evelink_api.API(pool_size=4)
+        default.assert_called_once_with(4)
+        self.assertTrue(api.transport is default.return_value)
+
+
+class AutoAPITestCase(unittest.TestCase):
+
+    def setUp(self):
+        @evelink_api.auto_api
+        def func(foo, api=None):
+            return foo, api
+        self.func = func
+
+    def test_default_api(self):
+        _, api = self.func(1)
+        self.assertTrue(isinstance(api, evelink_api.API))
+        _, api = self.func(1, api=None)
+        self.assertTrue(isinstance(api, evelink_api.API))
+        _, api = self.func(1, None)
+        self.assertTrue(isinstance(api, evelink_api.API))
+
+    def test_supplied_api(self):
+        api = mock.Mock()
+        self.assertEqual((1, api), self.func(1, api))
+        self.assertEqual((1, api), self.func(1, api=api))
+        self.assertEqual((1, api), self.func(foo=1, api=api))
+
+
+class DefaultAPITestCase(unittest.TestCase):
+
+    def setUp(self):
+        evelink_api._reset_default_api()
+
+        @evelink_api.auto_api
+        def func(api=None):
+            return api
+        self.func = func
+
+    def tearDown(self):
+        evelink_api._reset_default_api()
+
+    def test_shared(self):
+        api = self.func()
+        self.assertTrue(api is evelink_api.default_api())
+        self.assertTrue(self.func() is api)
+        self.assertTrue(self.func(None) is api)
+
+    @mock.patch.object(evelink_api, 'share_default_api', False)
+    def test_not_shared(self):
+        self.assertFalse(self.func() is self.func())
+
+    @mock.patch.object(evelink_api, 'default_cache', evelink_api.APICache())
+    @mock.patch.object(evelink_api, 'default_api_pool_size', 32)
+    def test_configuration(self):
+        api = evelink_api.default_api()
+        self.assertTrue(api.cache is evelink_api.default_cache)
+        self.assertEqual(32, api.pool_size)
+
+    def test_bounded_cache(self):
+        cache = evelink_api.default_api().cache
+        self.assertTrue(isinstance(cache, lru.LRUCache))
+        self.assertEqual(10000, cache.max_entries)
+
+    def test_after_fork(self):
+        api = evelink_api.default_api()
+        with mock.patch('os.getpid', return_value=-1):
+            child_api = evelink_api.default_api()
+            self.assertFalse(child_api is api)
+            self.assertTrue(evelink_api.default_api() is child_api)
+
+    def test_created_once(self):
+        apis = []
+        threads = [threading.Thread(target=lambda: apis.append(evelink_api.default_api()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, len(set(id(api) for api in apis)))
+
 
 if __name__ == "__main__":
     unittest.main()
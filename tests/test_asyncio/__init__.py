@@ -0,0 +1,99 @@
+import mock
+
+from tests.compat import unittest
+from tests.utils import make_api_result
+
+try:
+    import asyncio
+    from evelink.asyncio import AsyncAPI
+except (ImportError, SyntaxError):
+    NO_ASYNCIO = True
+else:
+    NO_ASYNCIO = False
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class CoroutineMock(mock.Mock):
+    """A Mock of a coroutine function (mock.AsyncMock needs Python 3.8).
+
+    Calling it records the call like a Mock and returns an awaitable
+    resolving to the Mock's return value, or raising its side effect.
+    """
+
+    def __call__(self, *args, **kw):
+        future = asyncio.Future()
+        try:
+            future.set_result(super(CoroutineMock, self).__call__(*args, **kw))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def run_gets(api_wrapper, method_name, src, *args, **kw):
+    if kw.get('_client', None) is None:
+        api = AsyncAPI()
+        client = api_wrapper(api=api)
+    else:
+        client = kw.pop('_client')
+        api = client.api
+
+    raw_resp = make_api_result(src)
+    api.get = mock.Mock(return_value=raw_resp)
+    api.get_async = CoroutineMock(return_value=raw_resp)
+
+    sync = getattr(client, method_name)
+    async_ = getattr(client, '%s_async' % method_name)
+    return api, sync(*args, **kw), run(async_(*args, **kw))
+
+
+@unittest.skipIf(NO_ASYNCIO, 'asyncio requires python 3.5+')
+class AsyncioTestCase(unittest.TestCase):
+    pass
+
+
+class auto_test_async_method(object):
+
+    def __init__(self, api_wrapper, method_list):
+        self.api_wrapper = api_wrapper
+        self.method_list = method_list
+        self.src_root = getattr(api_wrapper, '__name__', '').lower()
+
+    def __call__(self, cls):
+        if NO_ASYNCIO:
+            return cls
+
+        for name in self.method_list:
+            src = "%s/%s.xml" % (self.src_root, name)
+
+            setattr(
+                cls,
+                'test_%s_async' % name,
+                self._make_test(self.api_wrapper, name, src)
+            )
+
+        return cls
+
+    def _make_test(self, api_wrapper, method_name, src):
+        def test(instance):
+            instance.compare(api_wrapper, method_name, src)
+        return test
+
+
+class AsyncioAsyncTestCase(AsyncioTestCase):
+    """Extends AsyncioTestCase to provide helper to test async methods."""
+
+    def compare(self, api_wrapper, method_name, src, *args, **kw):
+        api, sync_r, async_r = run_gets(
+            api_wrapper, method_name, src, *args, **kw
+        )
+        self.assertEqual(sync_r, async_r)
+        self.assertEqual(1, api.get.call_count)
+        self.assertEqual(1, api.get_async.call_count)
+        self.assertEqual(api.get.call_args, api.get_async.call_args)
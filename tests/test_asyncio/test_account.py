@@ -0,0 +1,22 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import (
+    AsyncioAsyncTestCase, auto_test_async_method
+)
+
+try:
+    from evelink.asyncio.account import Account
+except (ImportError, SyntaxError):
+    Account = mock.Mock()
+
+_specs = ('status', 'key_info', 'characters',)
+
+
+@auto_test_async_method(Account, _specs)
+class AsyncioAccountTestCase(AsyncioAsyncTestCase):
+    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
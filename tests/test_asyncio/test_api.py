@@ -0,0 +1,300 @@
+import threading
+import time
+
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import AsyncioTestCase, CoroutineMock, run
+
+try:
+    import asyncio
+    from evelink.asyncio import api as evelink_asyncio_api
+except (ImportError, SyntaxError):
+    pass
+import evelink.api as evelink_api
+from evelink.thirdparty.six.moves import urllib
+from evelink import transports as evelink_transports
+
+
+class AsyncAPITestCase(AsyncioTestCase):
+
+    def setUp(self):
+        self.cache = mock.MagicMock(spec=evelink_api.APICache)
+        self.api = evelink_asyncio_api.AsyncAPI(cache=self.cache)
+
+        self.test_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <rowset>
+                            <row foo="bar" />
+                            <row foo="baz" />
+                        </rowset>
+                    </result>
+                    <cachedUntil>2009-11-18 17:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+        self.error_xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <error code="123">
+                        Test error message.
+                    </error>
+                    <cachedUntil>2009-11-18 19:05:31</cachedUntil>
+                </eveapi>
+            """.strip().encode()
+
+    def test_get_async(self):
+        self.cache.get.return_value = None
+        self.api.send_request_async = CoroutineMock(
+            return_value=(self.test_xml, None))
+
+        result, current, expiry = run(
+            self.api.get_async('foo/Bar', {'a': [1, 2, 3]}))
+
+        rows = result.find('rowset').findall('row')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0].attrib['foo'], 'bar')
+        self.assertEqual(current, 1255885531)
+        self.assertEqual(expiry, 1258563931)
+
+        self.api.send_request_async.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'a': '1,2,3'})
+        self.cache.put.assert_called_once_with(
+            self.api._cache_key('foo/Bar', {'a': '1,2,3'}),
+            self.test_xml,
+            1258563931 - 1255885531,
+        )
+
+    def test_get_async_shares_cache_key_with_get(self):
+        self.cache.get.return_value = self.test_xml
+        api = evelink_asyncio_api.AsyncAPI(
+            cache=self.cache, api_key=(1, 'code'))
+        api.send_request_async = CoroutineMock()
+        api.send_request = mock.Mock()
+
+        run(api.get_async('foo/Bar', {'a': 1}))
+        api.get('foo/Bar', {'a': 1})
+
+        self.assertFalse(api.send_request_async.called)
+        self.assertFalse(api.send_request.called)
+        async_key, sync_key = self.cache.get.call_args_list
+        self.assertEqual(async_key, sync_key)
+
+    def test_get_async_with_error(self):
+        self.cache.get.return_value = None
+        self.api.send_request_async = CoroutineMock(
+            return_value=(self.error_xml, None))
+
+        with self.assertRaises(evelink_api.APIError) as cm:
+            run(self.api.get_async('eve/Error'))
+
+        self.assertEqual(cm.exception.code, '123')
+        self.assertEqual(cm.exception.timestamp, 1255885531)
+        self.assertEqual(cm.exception.expires, 1258571131)
+        self.assertTrue(self.cache.put.called)
+
+    def test_get_async_observed(self):
+        observer = mock.Mock(spec=evelink_api.APIObserver)
+        api = evelink_asyncio_api.AsyncAPI(cache=self.cache, observers=[observer])
+        self.cache.get.return_value = None
+        api.send_request_async = CoroutineMock(
+            return_value=(self.error_xml, mock.Mock(status=403)))
+
+        with self.assertRaises(evelink_api.APIError):
+            run(api.get_async('eve/Error'))
+
+        (event,), _ = observer.observe.call_args
+        self.assertEqual(('eve/Error', 'miss', 403, '123'),
+                         (event.path, event.cache, event.status, event.error_code))
+        self.assertTrue(event.network_time >= 0)
+        self.assertTrue(event.parse_time >= 0)
+
+    def test_get_async_with_transport(self):
+        transport = evelink_transports.MemoryTransport({'foo/Bar': self.test_xml})
+        api = evelink_asyncio_api.AsyncAPI(cache=self.cache, transport=transport)
+        self.cache.get.return_value = None
+
+        result, current, expiry = run(api.get_async('foo/Bar', {'a': 1}))
+
+        self.assertEqual(2, len(result.find('rowset').findall('row')))
+        self.assertEqual([('foo/Bar', (('a', '1'),))], transport.requests)
+
+    def test_options(self):
+        api = evelink_asyncio_api.AsyncAPI(cache=self.cache, connection_limit=5)
+        self.assertEqual(5, api.connection_limit)
+        self.assertRaises(TypeError, evelink_asyncio_api.AsyncAPI, unknown=1)
+
+    def test_send_request_async_without_aiohttp(self):
+        self.api.send_request = mock.Mock(return_value=(self.test_xml, None))
+        self.api._use_aiohttp = False
+
+        response = run(self.api.send_request_async(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'a': '1'}))
+
+        self.assertEqual(response, (self.test_xml, None))
+        self.api.send_request.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', {'a': '1'})
+
+    def test_rate_limiter_with_aiohttp(self):
+        limiter = mock.Mock(spec=evelink_api.RateLimiter)
+        api = evelink_asyncio_api.AsyncAPI(cache=self.cache, api_key=(1, 'code'),
+                                           rate_limiter=limiter)
+        api._use_aiohttp = True
+        api.aiohttp_request = CoroutineMock(
+            return_value=(self.test_xml, mock.Mock(status=200)))
+        self.cache.get.return_value = None
+
+        run(api.get_async('foo/Bar'))
+
+        limiter.acquire.assert_called_once_with(
+            'api.eveonline.com', '/foo/Bar.xml.aspx', '1')
+        token, latency, status = limiter.release.call_args[0]
+        self.assertEqual((limiter.acquire.return_value, 200), (token, status))
+        self.assertTrue(latency >= 0)
+
+    def test_rate_limiter_cancelled(self):
+        acquiring = threading.Event()
+        acquired = threading.Event()
+
+        def acquire(host, path, key):
+            acquiring.set()
+            acquired.wait(5)
+            return 'token'
+        limiter = mock.Mock(spec=evelink_api.RateLimiter)
+        limiter.acquire.side_effect = acquire
+        api = evelink_asyncio_api.AsyncAPI(cache=self.cache, rate_limiter=limiter)
+        api._use_aiohttp = True
+        api.aiohttp_request = CoroutineMock()
+
+        loop = asyncio.new_event_loop()
+        try:
+            task = loop.create_task(api.send_request_async(
+                'https://api.eveonline.com/foo/Bar.xml.aspx', {}))
+            deadline = time.time() + 5
+            while not acquiring.is_set() and time.time() < deadline:
+                loop.run_until_complete(asyncio.sleep(0.001))
+            task.cancel()
+            self.assertRaises(asyncio.CancelledError, loop.run_until_complete, task)
+            # The token acquired once the call was cancelled is given back.
+            acquired.set()
+            while not limiter.cancel.called and time.time() < deadline:
+                loop.run_until_complete(asyncio.sleep(0.001))
+        finally:
+            loop.close()
+
+        limiter.cancel.assert_called_once_with('token')
+        self.assertFalse(limiter.release.called)
+        self.assertFalse(api.aiohttp_request.called)
+
+
+class AsyncAPIOptionsTestCase(AsyncioTestCase):
+    """The cache policy, single flight and result cache of AsyncAPI."""
+
+    def setUp(self):
+        self.xml = r"""
+                <?xml version='1.0' encoding='UTF-8'?>
+                <eveapi version="2">
+                    <currentTime>2009-10-18 17:05:31</currentTime>
+                    <result>
+                        <serverOpen>True</serverOpen>
+                        <onlinePlayers>%d</onlinePlayers>
+                    </result>
+                    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+                </eveapi>
+            """.strip()
+        self.responses = [1, 2]
+
+        def send_request(full_path, params):
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return (self.xml % response).encode(), None
+        self.send_request = send_request
+
+        time_patcher = mock.patch('time.time', return_value=1000)
+        self.time = time_patcher.start()
+        self.addCleanup(time_patcher.stop)
+
+        # Kept running between calls, for the tasks they leave behind.
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def run_coros(self, *coros):
+        """Run coroutines concurrently; return their results."""
+        tasks = [self.loop.create_task(coro) for coro in coros]
+        self.loop.run_until_complete(asyncio.wait(tasks))
+        return [task.result() for task in tasks]
+
+    def api(self, **kw):
+        api = evelink_asyncio_api.AsyncAPI(cache=evelink_api.APICache(), **kw)
+        api.send_request_async = CoroutineMock(side_effect=self.send_request)
+        return api
+
+    def players(self, result):
+        return int(result.result.find('onlinePlayers').text)
+
+    def test_stale_if_error(self):
+        api = self.api(cache_policy=evelink_api.CachePolicy(stale_if_error=3600))
+        self.responses = [1, urllib.error.URLError('down')]
+        self.run_coros(api.get_async('server/ServerStatus'))
+        self.time.return_value = 1000 + 3600 + 300
+
+        result, = self.run_coros(api.get_async('server/ServerStatus'))
+        self.assertEqual(1, self.players(result))
+        self.assertTrue(result.stale)
+
+        self.responses = [urllib.error.URLError('down')]
+        self.time.return_value = 1000 + 3600 + 3601
+        self.assertRaises(urllib.error.URLError, self.run_coros,
+                          api.get_async('server/ServerStatus'))
+
+    def test_stale_while_revalidate(self):
+        api = self.api(cache_policy=evelink_api.CachePolicy(stale_while_revalidate=60))
+        self.run_coros(api.get_async('server/ServerStatus'))
+        self.time.return_value = 1000 + 3600 + 30
+
+        stale, = self.run_coros(api.get_async('server/ServerStatus'))
+        for _ in range(100):
+            if not api._revalidations:
+                break
+            self.run_coros(asyncio.sleep(0.001))
+        fresh, = self.run_coros(api.get_async('server/ServerStatus'))
+        self.assertEqual((1, True), (self.players(stale), stale.stale))
+        self.assertEqual((2, False), (self.players(fresh), fresh.stale))
+        self.assertEqual(2, api.send_request_async.call_count)
+
+    def test_single_flight(self):
+        single_flight = evelink_api.SingleFlight()
+        one, two = self.api(single_flight=single_flight), self.api(single_flight=single_flight)
+        results = self.run_coros(
+            one.get_async('server/ServerStatus'),
+            two.get_async('server/ServerStatus'),
+            one.get_async('server/ServerStatus'))
+        self.assertEqual([1, 1, 1], [self.players(r) for r in results])
+        self.assertEqual(1, one.send_request_async.call_count)
+        self.assertFalse(two.send_request_async.called)
+        self.assertEqual({}, single_flight._async_flights)
+
+    def test_result_cache(self):
+        from evelink.asyncio import server
+        result_cache = evelink_api.APICache()
+        client = server.Server(api=self.api(result_cache=result_cache))
+        client.api.cache = mock.Mock(wraps=client.api.cache)
+        first, = self.run_coros(client.server_status_async())
+        second, = self.run_coros(client.server_status_async())
+        self.assertEqual(first, second)
+        self.assertEqual({'online': True, 'players': 1}, second.result)
+        # The second call was answered by the result cache alone.
+        self.assertEqual(1, client.api.cache.get.call_count)
+        self.assertEqual(1, len(list(result_cache.entries())))
+        # Shared with the synchronous method.
+        self.assertEqual(second, client.server_status())
+        self.assertEqual(1, client.api.send_request_async.call_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import AsyncioAsyncTestCase
+
+try:
+    from evelink.asyncio import AsyncAPI
+    from evelink.asyncio.char import Char
+except (ImportError, SyntaxError):
+    Char = mock.Mock()
+
+
+class AsyncioCharTestCase(AsyncioAsyncTestCase):
+
+    def setUp(self):
+        self.client = Char(1, AsyncAPI())
+
+    def test_assets_async(self):
+        self.compare(
+            Char,
+            'assets',
+            'corp/assets.xml',
+            _client=self.client
+        )
+
+    def test_calendar_attendees_async(self):
+        self.compare(
+            Char,
+            'calendar_attendees',
+            'char/calendar_attendees.xml',
+            [123, 234,],
+            _client=self.client
+        )
+
+    def test_event_attendees_async(self):
+        self.compare(
+            Char,
+            'event_attendees',
+            'char/calendar_attendees_by_id.xml',
+            234,
+            _client=self.client
+        )
+
+    def test_kills_async(self):
+        self.compare(
+            Char,
+            'kills',
+            'char/kills.xml',
+            _client=self.client
+        )
+
+    def test_orders_async(self):
+        self.compare(
+            Char,
+            'orders',
+            'char/orders.xml',
+            _client=self.client
+        )
+
+    def test_wallet_balance_async(self):
+        self.compare(
+            Char,
+            'wallet_balance',
+            'char/wallet_balance.xml',
+            _client=self.client
+        )
+
+    def test_wallet_info_async(self):
+        self.compare(
+            Char,
+            'wallet_info',
+            'char/wallet_info.xml',
+            _client=self.client
+        )
+
+    def test_wallet_journal_async(self):
+        self.compare(
+            Char,
+            'wallet_journal',
+            'char/wallet_journal.xml',
+            _client=self.client
+        )
+
+    def test_wallet_transactions_async(self):
+        self.compare(
+            Char,
+            'wallet_transactions',
+            'char/wallet_transactions.xml',
+            _client=self.client
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
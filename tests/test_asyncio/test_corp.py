@@ -0,0 +1,55 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import (
+    AsyncioAsyncTestCase, auto_test_async_method
+)
+
+try:
+    from evelink.asyncio.corp import Corp
+except (ImportError, SyntaxError):
+    Corp = mock.Mock()
+
+
+@auto_test_async_method(
+    Corp,
+    (
+        'permissions_log',
+        'faction_warfare_stats',
+        'titles',
+        'members',
+        'corporation_sheet',
+        'permissions',
+        'wallet_info',
+        'shareholders',
+        'container_log',
+        'assets',
+        'stations',
+        'member_medals',
+        'npc_standings',
+        'contracts',
+        'wallet_journal',
+        'medals',
+        'starbases',
+    )
+)
+class AsyncioCorpTestCase(AsyncioAsyncTestCase):
+
+    def test_wallet_transactions_async(self):
+        self.compare(
+            Corp,
+            'wallet_transactions',
+            "char/wallet_transactions.xml"
+        )
+
+    def test_station_services_async(self):
+        self.compare(
+            Corp,
+            'station_services',
+            "corp/station_services.xml",
+            61000368
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
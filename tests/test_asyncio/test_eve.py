@@ -0,0 +1,70 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import (
+    AsyncioAsyncTestCase, auto_test_async_method
+)
+
+try:
+    from evelink.asyncio.eve import EVE
+except (ImportError, SyntaxError):
+    EVE = mock.Mock()
+
+
+_specs = (
+    'alliances',
+    'errors',
+    'faction_warfare_stats',
+    'faction_warfare_leaderboard',
+    'conquerable_stations',
+    'skill_tree',
+    'reference_types',
+)
+
+
+@auto_test_async_method(EVE, _specs)
+class AsyncioEVETestCase(AsyncioAsyncTestCase):
+
+    def test_character_names_from_ids_async(self):
+        self.compare(
+            EVE,
+            'character_names_from_ids',
+            "eve/character_name.xml",
+            [1, 2]
+        )
+
+    def test_character_name_from_id_async(self):
+        self.compare(
+            EVE,
+            'character_name_from_id',
+            "eve/character_name_single.xml",
+            1
+        )
+
+    def test_character_ids_from_names_async(self):
+        self.compare(
+            EVE,
+            'character_ids_from_names',
+            "eve/character_id.xml",
+            ["EVE System", "EVE Central Bank"]
+        )
+
+    def test_character_id_from_name_async(self):
+        self.compare(
+            EVE,
+            'character_id_from_name',
+            "eve/character_id_single.xml",
+            "EVE System"
+        )
+
+    def test_type_name_from_id_async(self):
+        self.compare(
+            EVE,
+            'type_name_from_id',
+            "eve/typename_single.xml",
+            1
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import (
+    AsyncioAsyncTestCase, auto_test_async_method
+)
+
+try:
+    from evelink.asyncio.map import Map
+except (ImportError, SyntaxError):
+    Map = mock.Mock()
+
+
+@auto_test_async_method(
+    Map,
+    (
+        'jumps_by_system',
+        'kills_by_system',
+        'faction_warfare_systems',
+        'sov_by_system',
+    )
+)
+class AsyncioMapTestCase(AsyncioAsyncTestCase):
+    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,20 @@
+import mock
+
+from tests.compat import unittest
+from tests.test_asyncio import (
+    AsyncioAsyncTestCase, auto_test_async_method
+)
+
+try:
+    from evelink.asyncio.server import Server
+except (ImportError, SyntaxError):
+    Server = mock.Mock()
+
+
+@auto_test_async_method(Server, ('server_status',))
+class AsyncioServerTestCase(AsyncioAsyncTestCase):
+    pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import mock
+
+from tests.compat import unittest
+
+from evelink import api
+from evelink import char
+from evelink import corp
+from evelink import transports
+from evelink.thirdparty.six import StringIO
+
+from benchmarks import load
+from benchmarks import stand_in
+from benchmarks import suite
+
+
+class SuiteTestCase(unittest.TestCase):
+
+    def test_cases_run(self):
+        eve_api = suite.FixtureAPI()
+        cases = list(suite.method_cases(eve_api)) + list(suite.parser_cases())
+        cases += list(suite.scale_up_cases(eve_api, 0.0001))
+        for case in cases:
+            case.run()
+        names = set(case.name for case in cases)
+        self.assertTrue('Corp.assets_iter' in names)
+        self.assertTrue('Char.kills[kills_10k]' in names)
+
+    def test_compare(self):
+        result = {'rows': 10, 'seconds': 0.01, 'peak_bytes': 10 ** 6,
+                  'peak_bytes_per_row': 10 ** 5, 'blocks_per_row': 5.0}
+        baseline = {'results': {'a': result, 'b': result}}
+        slower = dict(result, seconds=0.02)
+        bigger = dict(result, peak_bytes=2 * 10 ** 6)
+        self.assertEqual([], suite.compare({'a': result, 'c': result}, baseline, 0.25, 0.1))
+        self.assertEqual(['a', 'b'], suite.compare({'a': slower, 'b': bigger}, baseline, 0.25, 0.1))
+
+
+BASELINE = os.path.join(os.path.dirname(suite.__file__), 'baseline.json')
+
+
+def baseline_applies():
+    with open(BASELINE) as f:
+        return suite.tracemalloc is not None and suite.same_interpreter(json.load(f))
+
+
+class BaselineTestCase(unittest.TestCase):
+
+    @unittest.skipUnless(baseline_applies(), "baseline of another Python version")
+    def test_no_memory_regressions(self):
+        with open(BASELINE) as f:
+            scale = json.load(f)['scale']
+        out = StringIO()
+        with mock.patch('sys.stdout', out):
+            status = suite.main(['--scale', str(scale), '--no-time',
+                                 '--baseline', BASELINE])
+        self.assertEqual(0, status, out.getvalue())
+
+
+class StandInTestCase(unittest.TestCase):
+
+    def get(self, server, path, params=None, transport='urllib', **kw):
+        if transport not in load.available_transports():
+            transport = 'urllib'
+        eve_api = api.API(base_url=server.base_url, cache=suite.NullCache(),
+                          api_key=(1, 'abc'),
+                          transport=load.TRANSPORT_CLASSES[transport](), **kw)
+        try:
+            return eve_api.get(path, params)
+        finally:
+            eve_api.transport.close()
+
+    def test_wrapped_calls(self):
+        with stand_in.StandInServer() as server:
+            eve_api = api.API(base_url=server.base_url, cache=suite.NullCache(),
+                              api_key=(1, 'abc'))
+            self.assertEqual(2, len(corp.Corp(eve_api).members().result))
+            journal = char.Char(1, eve_api).wallet_journal()
+        self.assertTrue(journal.result)
+        self.assertTrue(abs(journal.timestamp - time.time()) < 5)
+        self.assertEqual(2, server.requests_served)
+
+    def test_cached_until(self):
+        with stand_in.StandInServer(cached_for=600) as server:
+            first = self.get(server, 'char/WalletJournal', {'characterID': 1})
+            time.sleep(1)
+            second = self.get(server, 'char/WalletJournal', {'characterID': 1})
+        self.assertEqual(first.expires, second.expires)
+        self.assertTrue(abs(first.expires - time.time() - 600) < 5)
+
+    def test_gzip(self):
+        for gzip in (True, False):
+            with stand_in.StandInServer(gzip=gzip) as server:
+                for transport in load.TRANSPORTS:
+                    self.assertTrue(self.get(server, 'server/ServerStatus',
+                                             transport=transport).result is not None)
+
+    def test_amplify(self):
+        with stand_in.StandInServer(amplify=3) as server:
+            eve_api = api.API(base_url=server.base_url, cache=suite.NullCache(),
+                              api_key=(1, 'abc'))
+            result = char.Char(1, eve_api).wallet_journal().result
+        self.assertEqual(3 * 5, len(result))
+        self.assertEqual(3 * 5, len(set(entry['id'] for entry in result)))
+
+    def test_errors(self):
+        with stand_in.StandInServer(api_error_rate=1, api_error_code=203) as server:
+            with self.assertRaises(api.APIError) as cm:
+                self.get(server, 'server/ServerStatus')
+        self.assertEqual('203', cm.exception.code)
+        with stand_in.StandInServer(http_error_rate=1) as server:
+            self.assertRaises(Exception, self.get, server, 'server/ServerStatus')
+            self.assertRaises(Exception, self.get, server, 'unknown/Path')
+
+    def test_load(self):
+        with stand_in.StandInServer() as server:
+            stats = load.run(server.base_url, 'urllib', suite.NullCache(),
+                             threads=2, duration=0.2, characters=2)
+        self.assertTrue(stats['calls'] > 0)
+        self.assertEqual({}, stats['errors'])
+        self.assertTrue(stats['p50_ms'] <= stats['p99_ms'] <= stats['max_ms'])
+
+    @unittest.skipIf(api.requests is None, '`requests` not available')
+    def test_load_shared_session(self):
+        # Many threads sharing one API, and its requests session.
+        with stand_in.StandInServer() as server:
+            stats = load.run(server.base_url, 'requests', suite.NullCache(),
+                             threads=16, duration=0.5, characters=4)
+        self.assertTrue(stats['calls'] > 16)
+        self.assertEqual({}, stats['errors'])
+
+    def test_load_replay(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp, 'calls.jsonl')
+            with stand_in.StandInServer() as server:
+                recorded = load.run(server.base_url, transports.RecordingTransport(filename),
+                                    suite.NullCache(), threads=1, duration=0.2, characters=1)
+            replayed = load.run('http://replay', transports.ReplayTransport(filename, speed=None),
+                                suite.NullCache(), threads=1, duration=0.2, characters=1)
+        finally:
+            shutil.rmtree(tmp)
+        self.assertTrue(recorded['calls'] >= len(load.CALLS))
+        self.assertEqual({}, replayed['errors'])
+        self.assertTrue(replayed['calls'] > 0)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, load.percentile(values, 50))
+        self.assertEqual(99, load.percentile(values, 99))
+        self.assertEqual(None, load.percentile([], 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
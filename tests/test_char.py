@@ -128,6 +128,23 @@ class CharTestCase(APITestCase):
         self.assertEqual(current, 12345)
         self.assertEqual(expires, 67890)
 
+    def test_streaming_methods(self):
+        self.api.stream.return_value = mock.sentinel.rows
+        self.assertEqual(self.char.assets_iter(), mock.sentinel.rows)
+        self.assertEqual(self.char.wallet_journal_iter(before_id=1234, limit=50), mock.sentinel.rows)
+        self.assertEqual(self.char.wallet_transactions_iter(), mock.sentinel.rows)
+        self.assertEqual(self.char.kills_iter(before_kill=12345), mock.sentinel.rows)
+        self.assertEqual(self.api.mock_calls, [
+                mock.call.stream('char/AssetList', {'characterID': 1},
+                    evelink_char.parse_asset_row),
+                mock.call.stream('char/WalletJournal', {'characterID': 1, 'fromID': 1234, 'rowCount': 50},
+                    evelink_char.parse_wallet_journal_row),
+                mock.call.stream('char/WalletTransactions', {'characterID': 1},
+                    evelink_char.parse_wallet_transaction_row),
+                mock.call.stream('char/KillMails', {'characterID': 1, 'beforeKillID': 12345},
+                    evelink_char.parse_kill_row),
+            ])
+
     def test_wallet_paged(self):
         self.api.get.return_value = self.make_api_result("char/wallet_journal.xml")
 
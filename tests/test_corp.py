@@ -5,6 +5,7 @@ from tests.utils import APITestCase
 
 import evelink.api as evelink_api
 import evelink.corp as evelink_corp
+from evelink.parsing.members import parse_members
 
 
 API_RESULT_SENTINEL = evelink_api.APIResult(mock.sentinel.api_result, 12345, 67890)
@@ -612,6 +613,52 @@ class CorpTestCase(APITestCase):
         self.assertEqual(current, 12345)
         self.assertEqual(expires, 67890)
 
+    def test_streaming_methods(self):
+        self.api.stream.return_value = mock.sentinel.rows
+        self.assertEqual(self.corp.assets_iter(), mock.sentinel.rows)
+        self.assertEqual(self.corp.wallet_journal_iter(account=1001), mock.sentinel.rows)
+        self.assertEqual(self.corp.wallet_transactions_iter(before_id=1234), mock.sentinel.rows)
+        self.assertEqual(self.corp.kills_iter(), mock.sentinel.rows)
+        self.assertEqual(self.api.mock_calls, [
+                mock.call.stream('corp/AssetList', {},
+                    evelink_corp.parse_asset_row),
+                mock.call.stream('corp/WalletJournal', {'accountKey': 1001},
+                    evelink_corp.parse_wallet_journal_row),
+                mock.call.stream('corp/WalletTransactions', {'fromID': 1234},
+                    evelink_corp.parse_wallet_transaction_row),
+                mock.call.stream('corp/KillMails', {},
+                    evelink_corp.parse_kill_row),
+            ])
+
+    def test_members_iter(self):
+        self.api.stream.return_value = mock.sentinel.rows
+        self.assertEqual(self.corp.members_iter(), mock.sentinel.rows)
+        self.assertEqual(self.corp.members_iter(extended=False), mock.sentinel.rows)
+        self.assertEqual(self.corp.members_iter(extended=None), mock.sentinel.rows)
+        self.assertEqual(self.api.mock_calls, [
+                mock.call.stream('corp/MemberTracking', {'extended': 1},
+                    evelink_corp.parse_member_row),
+                mock.call.stream('corp/MemberTracking', {},
+                    evelink_corp.parse_member_row),
+                mock.call.stream('corp/MemberTracking', {},
+                    evelink_corp.parse_member_row),
+            ])
+        # The same requests as members() sends.
+        self.api.get.return_value = self.make_api_result("corp/members.xml")
+        for extended in (True, False):
+            self.corp.members(extended=extended)
+        self.assertEqual([mock.call('corp/MemberTracking', params={'extended': 1}),
+                          mock.call('corp/MemberTracking', params={})],
+                         self.api.get.call_args_list)
+
+    def test_member_rows(self):
+        result = self.make_api_result("corp/members.xml").result
+        rows = result.find('rowset').findall('row')
+        for extended, kw in ((False, {'extended': False}), (True, {})):
+            members = dict((m['id'], m) for m in
+                           (evelink_corp.parse_member_row(row, **kw) for row in rows))
+            self.assertEqual(parse_members(result, extended), members)
+
     def test_members_not_extended(self):
         self.api.get.return_value = self.make_api_result("corp/members.xml")
         result, current, expires = self.corp.members(extended=False)
@@ -0,0 +1,87 @@
+import mock
+
+from tests.compat import unittest
+
+from evelink import api
+from evelink import observers
+
+
+def event(path='foo/Bar', cache='miss', total_time=0.02, error=None, **kw):
+    e = api.CallEvent(path)
+    e.cache = cache
+    e.total_time = total_time
+    e.bytes = kw.pop('bytes', 100)
+    for attr, value in kw.items():
+        setattr(e, attr, value)
+    if error is not None:
+        e.set_error(error)
+    return e
+
+
+class HistogramTestCase(unittest.TestCase):
+
+    def test_histogram(self):
+        h = observers.Histogram(bounds=(1, 2, 5))
+        for value in (0.5, 1, 1.5, 3, 4, 7):
+            h.add(value)
+        self.assertEqual([2, 1, 2, 1], h.counts)
+        self.assertEqual(6, h.count)
+        self.assertEqual(17 / 6.0, h.mean)
+        self.assertEqual(1, h.percentile(30))
+        self.assertEqual(2, h.percentile(50))
+        self.assertEqual(5, h.percentile(80))
+        self.assertEqual(7, h.percentile(100))
+
+    def test_empty(self):
+        h = observers.Histogram()
+        self.assertEqual(None, h.mean)
+        self.assertEqual(None, h.percentile(50))
+
+
+class EndpointStatsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = observers.EndpointStats()
+
+    def test_summary(self):
+        self.stats.observe(event(network_time=0.01, parse_time=0.004))
+        self.stats.observe(event(cache='hit', total_time=0.003, parse_time=0.002))
+        self.stats.observe(event(cache='coalesced', bytes=None))
+        self.stats.observe(event(cache='result', total_time=0.0001))
+        self.stats.observe(event(error=api.APIError('203', 'Authentication failure.')))
+        self.stats.observe(event(error=IOError()))
+        self.stats.observe(event('foo/Baz'))
+
+        summary = self.stats.summary()
+        self.assertEqual(set(['foo/Bar', 'foo/Baz']), set(summary))
+        bar = summary['foo/Bar']
+        self.assertEqual(7 - 1, bar['calls'])
+        self.assertEqual({'miss': 3, 'hit': 1, 'coalesced': 1, 'result': 1}, bar['cache'])
+        self.assertEqual(0.4, bar['hit_ratio'])
+        self.assertEqual({'203': 1, IOError.__name__: 1}, bar['errors'])
+        self.assertEqual(500, bar['bytes'])
+        self.assertEqual({'p50': 0.025, 'p90': 0.025, 'p99': 0.025}, bar['latency'])
+        self.assertEqual(0.02, bar['max_latency'])
+        self.assertEqual(0.01, bar['mean_network_time'])
+        self.assertEqual(0.003, bar['mean_parse_time'])
+        self.assertEqual(None, bar['mean_result_time'])
+
+    def test_histogram(self):
+        self.assertEqual(None, self.stats.histogram('foo/Bar'))
+        self.stats.observe(event())
+        self.assertEqual(1, self.stats.histogram('foo/Bar').count)
+        self.stats.reset()
+        self.assertEqual({}, self.stats.summary())
+
+    def test_api(self):
+        eve_api = api.API(cache=api.APICache(), observers=[self.stats])
+        eve_api.send_request = mock.Mock(return_value=(
+            b'<eveapi version="2"><currentTime>2009-10-18 17:05:31</currentTime>'
+            b'<result /><cachedUntil>2009-10-18 18:05:31</cachedUntil></eveapi>', None))
+        eve_api.get('foo/Bar')
+        eve_api.get('foo/Bar')
+        self.assertEqual(0.5, self.stats.summary()['foo/Bar']['hit_ratio'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import threading
+import zlib
+
+from tests.compat import unittest
+
+from evelink.thirdparty.six.moves import BaseHTTPServer
+from evelink.thirdparty.six.moves import socketserver
+import evelink.api as evelink_api
+from evelink import pool
+
+XML = b"""<?xml version='1.0' encoding='UTF-8'?>
+<eveapi version="2">
+    <currentTime>2009-10-18 17:05:31</currentTime>
+    <result><rowset><row foo="bar" /></rowset></result>
+    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+</eveapi>"""
+
+ERROR_XML = b"""<?xml version='1.0' encoding='UTF-8'?>
+<eveapi version="2">
+    <currentTime>2009-10-18 17:05:31</currentTime>
+    <error code="203">Authentication failure.</error>
+    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+</eveapi>"""
+
+
+def gzip(data):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # path: (status, headers, body)
+    responses = {
+        '/foo/Bar.xml.aspx': (200, {}, XML),
+        '/foo/Gzip.xml.aspx': (200, {'Content-Encoding': 'gzip'}, gzip(XML)),
+        '/foo/Error.xml.aspx': (403, {}, ERROR_XML),
+        '/foo/Down.xml.aspx': (503, {}, b'Service Unavailable'),
+        '/foo/Close.xml.aspx': (200, {}, XML),
+    }
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        self.respond(b'')
+
+    def do_POST(self):
+        self.respond(self.rfile.read(int(self.headers['Content-Length'])))
+
+    def respond(self, body):
+        path = self.path.split('?')[0]
+        self.server.requests.append((self.command, self.path, body,
+                                     self.headers.get('Accept-Encoding')))
+        status, headers, content = self.responses[path]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        if path == '/foo/Close.xml.aspx':
+            # Drop the connection without saying so.
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), Handler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+
+    def url(self, path):
+        return 'http://127.0.0.1:%d%s' % (self.server_address[1], path)
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.pool = pool.ConnectionPool(size=2, timeout=5)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def get(self, path, **kw):
+        return self.pool.request('GET', self.server.url(path), **kw)
+
+    def test_keep_alive(self):
+        for _ in range(5):
+            self.assertEqual(XML, self.get('/foo/Bar.xml.aspx').read())
+        self.assertEqual(1, self.server.connections)
+        self.assertEqual(1, self.pool.idle_connections())
+
+    def test_gzip(self):
+        r = self.get('/foo/Gzip.xml.aspx', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(XML, b''.join(r.iter_content(16)))
+        self.assertEqual('gzip', self.server.requests[0][3])
+
+    def test_post(self):
+        r = self.pool.request('POST', self.server.url('/foo/Bar.xml.aspx?a=1'), b'b=2',
+                              {'Content-Type': 'application/x-www-form-urlencoded'})
+        self.assertEqual(200, r.status)
+        r.read()
+        self.assertEqual(('POST', '/foo/Bar.xml.aspx?a=1', b'b=2'), self.server.requests[0][:3])
+
+    def test_raise_for_status(self):
+        r = self.get('/foo/Down.xml.aspx')
+        r.read()
+        with self.assertRaises(pool.HTTPError) as cm:
+            r.raise_for_status()
+        self.assertEqual(503, cm.exception.code)
+        self.get('/foo/Bar.xml.aspx').raise_for_status()
+
+    def test_bounded(self):
+        responses = [self.get('/foo/Bar.xml.aspx') for _ in range(4)]
+        for r in responses:
+            r.read()
+        self.assertEqual(4, self.server.connections)
+        self.assertEqual(2, self.pool.idle_connections())
+
+    def test_closed_early(self):
+        r = self.get('/foo/Bar.xml.aspx')
+        r.close()
+        self.assertEqual(0, self.pool.idle_connections())
+
+    def test_stale_connection(self):
+        self.get('/foo/Close.xml.aspx').read()
+        self.assertEqual(1, self.pool.idle_connections())
+        # The idle connection was closed by the server: a new one is used.
+        self.assertEqual(XML, self.get('/foo/Bar.xml.aspx').read())
+        self.assertEqual(2, self.server.connections)
+
+    def test_api(self):
+        transport = evelink_api.PooledTransport()
+        api = evelink_api.API(base_url=self.server.url(''), cache=evelink_api.APICache(),
+                              transport=transport)
+        result = api.get('foo/Bar', {'a': 1})
+        self.assertEqual('bar', result.result.find('rowset/row').attrib['foo'])
+        self.assertEqual(['bar'], list(api.stream(
+            'foo/Gzip', {}, lambda row: row.attrib['foo'])))
+        with self.assertRaises(evelink_api.APIError) as cm:
+            api.get('foo/Error')
+        self.assertEqual('203', cm.exception.code)
+        self.assertRaises(pool.HTTPError, api.get, 'foo/Down')
+        self.assertEqual(1, self.server.connections)
+        self.assertEqual(1, transport.pool.idle_connections())
+        transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,240 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import mock
+
+from tests.compat import unittest
+
+from evelink import api
+from evelink import ratelimit
+from evelink import transports
+
+XML = b"""<?xml version='1.0' encoding='UTF-8'?>
+<eveapi version="2">
+    <currentTime>2009-10-18 17:05:31</currentTime>
+    <result><rowset><row foo="bar" /></rowset></result>
+    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+</eveapi>"""
+
+
+class TokenBucketsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.now = 1000.0
+        patcher = mock.patch.object(ratelimit.time, 'time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def reserve(self, buckets, count, name='b', rate=10, burst=3):
+        return [buckets.reserve([(name, rate, burst)]) for _ in range(count)]
+
+    def assertWaits(self, expected, waits):
+        self.assertEqual(len(expected), len(waits))
+        for e, w in zip(expected, waits):
+            self.assertAlmostEqual(e, w)
+
+    def test_burst_then_rate(self):
+        buckets = ratelimit.TokenBuckets()
+        # Requests told to wait take no token.
+        self.assertWaits([0, 0, 0, 0.1, 0.1], self.reserve(buckets, 5))
+        # The bucket refills at 'rate' tokens per second.
+        self.now += 0.15
+        self.assertWaits([0, 0.05], self.reserve(buckets, 2))
+        self.now += 10
+        self.assertWaits([0, 0, 0, 0.1], self.reserve(buckets, 4))
+
+    def test_several_buckets(self):
+        buckets = ratelimit.TokenBuckets()
+        waits = [buckets.reserve([('host', 10, 10), ('key', 2, 1)]) for _ in range(3)]
+        self.assertWaits([0, 0.5, 0.5], waits)
+        # Those held back by the key's bucket left the host's alone.
+        self.assertWaits([0] * 9 + [0.1], self.reserve(buckets, 10, 'host', 10, 10))
+
+    def test_shared_file(self):
+        state_file = os.path.join(self.tmp, 'buckets.json')
+        one = ratelimit.TokenBuckets(state_file)
+        two = ratelimit.TokenBuckets(state_file)
+        self.assertWaits([0, 0], self.reserve(one, 2))
+        self.assertWaits([0, 0.1], self.reserve(two, 2))
+        # Full buckets are dropped from the file.
+        self.now += 10
+        one.reserve([('other', 10, 3)])
+        with open(state_file) as f:
+            self.assertEqual(['other'], list(json.loads(f.read())))
+
+
+class AdaptiveConcurrencyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.limit = ratelimit.AdaptiveConcurrency(initial=2, maximum=4)
+
+    def call(self, latency=0.05, status=200, path='/foo'):
+        token = self.limit.acquire(path)
+        self.limit.release(token, latency, status)
+
+    def test_increase_when_limited(self):
+        for _ in range(10):
+            self.call()
+        # Never more than one request in flight: no need for more.
+        self.assertEqual(2, self.limit.limit)
+
+        tokens = [self.limit.acquire() for _ in range(2)]
+        for token in tokens:
+            self.limit.release(token, 0.05, 200)
+        self.assertEqual(2.5, self.limit.limit)
+
+    def test_decrease(self):
+        self.limit.limit = 4.0
+        tokens = [self.limit.acquire() for _ in range(4)]
+        for token in tokens:
+            self.limit.release(token, 0.05, 503)
+        # Once for all the requests sent before the first decrease.
+        self.assertEqual(2, self.limit.limit)
+        self.call(status=None)
+        self.assertEqual(1, self.limit.limit)
+        self.call(status=429)
+        self.assertEqual(1, self.limit.limit)
+        self.assertEqual(0, self.limit.in_flight)
+
+    def test_latency_rise(self):
+        self.limit.limit = 4.0
+        for _ in range(5):
+            self.call(latency=0.05)
+        self.call(latency=0.08)
+        self.assertEqual(4, self.limit.limit)
+        self.call(latency=0.5)
+        self.assertEqual(2, self.limit.limit)
+
+    def test_latency_per_path(self):
+        for _ in range(5):
+            self.call(latency=0.05, path='/fast')
+        # A slower endpoint isn't taken for an overloaded server...
+        self.call(latency=0.5, path='/slow')
+        self.call(latency=0.5, path='/slow')
+        self.assertEqual(2, self.limit.limit)
+        # ...but an endpoint slowing down is.
+        self.call(latency=0.5, path='/fast')
+        self.assertEqual(1, self.limit.limit)
+
+    def test_blocks(self):
+        limit = ratelimit.AdaptiveConcurrency(initial=1)
+        limit.acquire()
+        acquired = threading.Event()
+
+        def acquire():
+            limit.acquire()
+            acquired.set()
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limit.cancel()
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+        self.assertEqual(1, limit.in_flight)
+
+
+class LimiterTestCase(unittest.TestCase):
+
+    def test_reservations(self):
+        limiter = ratelimit.Limiter(host_rate=30, key_rate=5)
+        limiter.buckets = mock.Mock()
+        limiter.buckets.reserve.side_effect = [0.25, 0, 0]
+        with mock.patch.object(ratelimit.time, 'sleep') as sleep:
+            token = limiter.acquire('api.eveonline.com', '/foo', 1)
+            other = limiter.acquire('api.eveonline.com', '/foo', None)
+        # Reserved again after the wait.
+        sleep.assert_called_once_with(0.25)
+        self.assertEqual([
+            mock.call([('host:api.eveonline.com', 30, 30),
+                       ('key:api.eveonline.com:1', 5, 5)]),
+            mock.call([('host:api.eveonline.com', 30, 30),
+                       ('key:api.eveonline.com:1', 5, 5)]),
+            mock.call([('host:api.eveonline.com', 30, 30)]),
+        ], limiter.buckets.reserve.call_args_list)
+
+        concurrency = limiter.concurrency('api.eveonline.com')
+        self.assertEqual(2, concurrency.in_flight)
+        limiter.release(token, 0.05, 200)
+        limiter.cancel(other)
+        self.assertEqual((0, 4), (concurrency.in_flight, concurrency.limit))
+
+    def test_failed_reservation(self):
+        limiter = ratelimit.Limiter()
+        limiter.buckets = mock.Mock()
+        limiter.buckets.reserve.side_effect = IOError()
+        self.assertRaises(IOError, limiter.acquire, 'api.eveonline.com', '/foo', None)
+        concurrency = limiter.concurrency('api.eveonline.com')
+        self.assertEqual((0, 4), (concurrency.in_flight, concurrency.limit))
+
+    def test_without_concurrency(self):
+        limiter = ratelimit.Limiter(host_rate=None, concurrency=None)
+        token = limiter.acquire('api.eveonline.com', '/foo', None)
+        limiter.release(token, 0.05, 503)
+        self.assertEqual(None, limiter.concurrency('api.eveonline.com'))
+
+    def test_paces_threads(self):
+        limiter = ratelimit.Limiter(host_rate=50, host_burst=1)
+        start = time.time()
+        threads = [threading.Thread(target=lambda: limiter.release(
+            limiter.acquire('h', '/foo', None), 0.001, 200)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(time.time() - start >= 0.09)
+
+
+class APIRateLimiterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = mock.Mock(spec=api.RateLimiter)
+        self.transport = transports.MemoryTransport({
+            'foo/Bar': XML, 'server/ServerStatus': XML})
+        self.transport.add('foo/Down', 'Service Unavailable', status=503)
+
+    def api(self, **kw):
+        return api.API(transport=self.transport, rate_limiter=self.limiter,
+                       cache=api.APICache(), **kw)
+
+    def test_bad_rate_limiter(self):
+        self.assertRaises(ValueError, api.API, rate_limiter=object())
+
+    def test_get(self):
+        eve_api = self.api(api_key=(1, 'abc'))
+        eve_api.get('foo/Bar')
+        eve_api.get('server/ServerStatus')
+        self.assertEqual([mock.call('api.eveonline.com', '/foo/Bar.xml.aspx', '1'),
+                          mock.call('api.eveonline.com', '/server/ServerStatus.xml.aspx', None)],
+                         self.limiter.acquire.call_args_list)
+        token, latency, status = self.limiter.release.call_args[0]
+        self.assertEqual((self.limiter.acquire.return_value, 200), (token, status))
+        self.assertTrue(latency >= 0)
+
+    def test_stream_and_errors(self):
+        eve_api = self.api(sso_token=('token', 'character'))
+        self.assertEqual(['bar'], list(eve_api.stream(
+            'foo/Bar', {}, lambda row: row.attrib['foo'])))
+        self.assertRaises(Exception, eve_api.get, 'foo/Down')
+        self.assertEqual(2, self.limiter.release.call_count)
+        self.assertEqual(503, self.limiter.release.call_args[0][2])
+
+        (host, path, key), _ = self.limiter.acquire.call_args
+        self.assertTrue(key.startswith('sso-'))
+        self.assertFalse('token' in key)
+
+    def test_failed_request(self):
+        self.transport.request = mock.Mock(side_effect=IOError())
+        self.assertRaises(IOError, self.api().get, 'foo/Bar')
+        self.assertEqual(None, self.limiter.release.call_args[0][2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,8 +24,16 @@ class DummyResponse(object):
         if self.status_code != 200:
           raise DummyException("HTTP {0}".format(self.status_code))
 
+    def iter_content(self, chunk_size):
+        content = self.content.encode()
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i+chunk_size]
 
-@unittest.skipIf(not evelink_api._has_requests, '`requests` not available')
+    def close(self):
+        self.closed = True
+
+
+@unittest.skipIf(evelink_api.requests is None, '`requests` not available')
 class RequestsAPITestCase(unittest.TestCase):
 
     def setUp(self):
@@ -124,7 +132,7 @@ class RequestsAPITestCase(unittest.TestCase):
         called_param_dict = call_kwargs["data"]
 
         expected_url = 'https://api.eveonline.com/foo.xml.aspx'
-        expected_param_dict = {'a': '2,3,4', 'vCode': 'code', 'keyID': 1}
+        expected_param_dict = {'a': '2,3,4', 'vCode': 'code', 'keyID': '1'}
 
         self.assertEqual(called_url, expected_url)
         self.assertEqual(called_param_dict, expected_param_dict)
@@ -137,7 +145,8 @@ class RequestsAPITestCase(unittest.TestCase):
 
         test_useragent = '%s %s' % (evelink_api._user_agent, self.custom_useragent)
 
-        self.assertEqual(self.mock_sessions.headers.update.call_args[0][0]['User-Agent'], test_useragent)
+        headers = self.mock_sessions.post.call_args[1]['headers']
+        self.assertEqual(headers['User-Agent'], test_useragent)
 
     def test_get_with_error(self):
         self.mock_sessions.get.return_value = DummyResponse(self.error_xml)
@@ -180,6 +189,27 @@ class RequestsAPITestCase(unittest.TestCase):
             'cached_until': 1258571131,
         })
 
+    def test_stream(self):
+        self.mock_sessions.get.return_value = DummyResponse(self.test_xml)
+        self.cache.get.return_value = None
+
+        rows = self.api.stream('foo/Bar', {}, lambda row: row.attrib['foo'])
+        self.mock_sessions.get.assert_called_once_with(
+            'https://api.eveonline.com/foo/Bar.xml.aspx', headers=mock.ANY,
+            timeout=evelink_api.http_request_timeout, stream=True)
+        self.assertEqual(['bar', 'baz'], list(rows))
+        self.assertTrue(self.mock_sessions.get.return_value.closed)
+        self.assertEqual(self.cache.put.call_args[0][1], self.test_xml.encode())
+
+    def test_stream_with_http_error(self):
+        self.mock_sessions.get.return_value = DummyResponse("Not XML")
+        self.mock_sessions.get.return_value.status_code = 500
+        self.cache.get.return_value = None
+
+        rows = self.api.stream('foo/Bar', {}, lambda row: row)
+        self.assertRaises(DummyException, list, rows)
+        self.assertFalse(self.cache.put.called)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from tests.compat import unittest
+
+from evelink import api
+from evelink import pool
+from evelink import transports
+
+XML = b"""<?xml version='1.0' encoding='UTF-8'?>
+<eveapi version="2">
+    <currentTime>2009-10-18 17:05:31</currentTime>
+    <result><rowset><row foo="%s" /></rowset></result>
+    <cachedUntil>2009-10-18 18:05:31</cachedUntil>
+</eveapi>"""
+
+
+def body(foo):
+    return XML.replace(b'%s', foo)
+
+
+class NullCache(api.APICache):
+    """So that every call reaches the transport."""
+
+    def put(self, key, value, duration):
+        pass
+
+
+class SlowTransport(transports.MemoryTransport):
+
+    def request(self, full_path, params, headers):
+        time.sleep(0.05)
+        return super(SlowTransport, self).request(full_path, params, headers)
+
+
+class TransportTestCase(unittest.TestCase):
+
+    def test_bad_transport(self):
+        self.assertRaises(ValueError, api.API, transport=object())
+
+    def test_default_stream(self):
+        memory = transports.MemoryTransport({'foo/Bar': body(b'bar')})
+        chunks, robj = api.Transport.request_stream(
+            memory, 'https://api.eveonline.com/foo/Bar.xml.aspx', {}, {})
+        self.assertEqual(body(b'bar'), b''.join(chunks))
+        self.assertEqual(200, robj.status)
+
+    def test_request_key(self):
+        self.assertEqual(
+            ('char/AssetList', (('IDs', '1,2'), ('characterID', '3'))),
+            transports.request_key('http://127.0.0.1:8080/char/AssetList.xml.aspx',
+                                   {'characterID': 3, 'IDs': [1, 2], 'vCode': 'secret'}))
+
+
+class MemoryTransportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.memory = transports.MemoryTransport({'foo/Bar': body(b'any')})
+        self.memory.add('foo/Bar', body(b'two'), params={'a': 2})
+        self.memory.add('foo/Error', 'Not found', status=404)
+
+    def api(self, transport):
+        return api.API(api_key=(1, 'secret'), transport=transport,
+                       cache=api.APICache())
+
+    def test_get(self):
+        eve_api = self.api(self.memory)
+        for a, foo in ((1, 'any'), (2, 'two')):
+            result = eve_api.get('foo/Bar', {'a': a})
+            self.assertEqual(foo, result.result.find('rowset/row').attrib['foo'])
+        self.assertEqual([('foo/Bar', (('a', '1'),)), ('foo/Bar', (('a', '2'),))],
+                         self.memory.requests)
+
+    def test_stream(self):
+        rows = self.api(self.memory).stream('foo/Bar', {'a': 2},
+                                            lambda row: row.attrib['foo'])
+        self.assertEqual(['two'], list(rows))
+
+    def test_http_error(self):
+        eve_api = self.api(self.memory)
+        with self.assertRaises(pool.HTTPError) as cm:
+            eve_api.get('foo/Error')
+        self.assertEqual(404, cm.exception.code)
+        with self.assertRaises(pool.HTTPError) as cm:
+            eve_api.get('foo/Unknown')
+        self.assertEqual(404, cm.exception.code)
+
+
+class RecordReplayTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp, 'calls.jsonl')
+        self.memory = transports.MemoryTransport()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def record(self, calls, transport=None):
+        recorder = transports.RecordingTransport(self.filename, transport or self.memory)
+        eve_api = api.API(api_key=(1, 'secret'), transport=recorder,
+                          cache=NullCache())
+        for path, params in calls:
+            try:
+                eve_api.get(path, params)
+            except Exception:
+                pass
+
+    def test_replay(self):
+        self.memory.add('foo/Bar', body(b'one'))
+        self.record([('foo/Bar', {'a': 1})])
+        self.memory.add('foo/Bar', body(b'two'))
+        self.record([('foo/Bar', {'a': 1}), ('foo/Down', None)])
+
+        with open(self.filename) as f:
+            recorded = f.read()
+        self.assertFalse('secret' in recorded)
+        self.assertEqual(3, len(recorded.splitlines()))
+        self.assertEqual(404, json.loads(recorded.splitlines()[2])['status'])
+
+        replay = transports.ReplayTransport(self.filename)
+        eve_api = api.API(api_key=(2, 'other'), transport=replay,
+                          cache=NullCache())
+        foos = [eve_api.get('foo/Bar', {'a': 1}).result.find('rowset/row').attrib['foo']
+                for _ in range(3)]
+        self.assertEqual(['one', 'two', 'two'], foos)
+        self.assertRaises(pool.HTTPError, eve_api.get, 'foo/Down')
+        self.assertRaises(pool.HTTPError, eve_api.get, 'foo/Bar', {'a': 2})
+
+    def test_stream(self):
+        self.memory.add('foo/Bar', body(b'bar'))
+        recorder = transports.RecordingTransport(self.filename, self.memory)
+        eve_api = api.API(transport=recorder, cache=NullCache())
+        rows = eve_api.stream('foo/Bar', {}, lambda row: row.attrib['foo'])
+        rows.close()
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertEqual(['bar'], list(
+            eve_api.stream('foo/Bar', {}, lambda row: row.attrib['foo'])))
+
+        eve_api = api.API(transport=transports.ReplayTransport(self.filename),
+                          cache=NullCache())
+        self.assertEqual(['bar'], list(
+            eve_api.stream('foo/Bar', {}, lambda row: row.attrib['foo'])))
+
+    def test_timing(self):
+        slow = SlowTransport({'foo/Bar': body(b'bar')})
+        self.record([('foo/Bar', None)], slow)
+
+        for speed, fast in ((1, False), (None, True)):
+            replay = transports.ReplayTransport(self.filename, speed=speed)
+            start = time.time()
+            content, robj = replay.request(
+                'https://api.eveonline.com/foo/Bar.xml.aspx', {}, {})
+            self.assertEqual(body(b'bar'), content)
+            self.assertEqual(fast, time.time() - start < 0.04)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,60 @@
+import functools
 import os
 import unittest
-from xml.etree import ElementTree
 
 import mock
 
 import evelink.api as evelink_api
+from evelink.parsing import backends
+
+# The XML backends parser tests run with, see XMLBackendsTestCase.
+XML_BACKENDS = ['etree']
+if backends.lxml is not None:
+    XML_BACKENDS.append('lxml')
+
+# The XML backend make_api_result parses with.
+xml_backend = 'etree'
 
 
 def make_api_result(xml_path):
     xml_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'xml')
-    with open(os.path.join(xml_dir, xml_path)) as f:
-        return evelink_api.APIResult(ElementTree.parse(f), 12345, 67890)
+    with open(os.path.join(xml_dir, xml_path), 'rb') as f:
+        root = backends.get(xml_backend).fromstring(f.read())
+    return evelink_api.APIResult(root, 12345, 67890)
+
+
+class XMLBackendsTestCase(unittest.TestCase):
+    """Runs each test once with each of XML_BACKENDS.
+
+    The backend is the one make_api_result parses with. The test is set
+    up again before each run after the first.
+    """
+
+    def __init__(self, methodName='runTest'):
+        super(XMLBackendsTestCase, self).__init__(methodName)
+        test = getattr(self, methodName, None)
+        if test is not None:
+            setattr(self, methodName, self._with_each_backend(test))
+
+    def _with_each_backend(self, test):
+        @functools.wraps(test)
+        def run():
+            global xml_backend
+            for i, name in enumerate(XML_BACKENDS):
+                if i:
+                    self.tearDown()
+                    self.setUp()
+                xml_backend = name
+                try:
+                    test()
+                except AssertionError as e:
+                    raise AssertionError('%s (with the %s backend)' % (e, name))
+                finally:
+                    xml_backend = 'etree'
+        return run
 
 
-class APITestCase(unittest.TestCase):
+class APITestCase(XMLBackendsTestCase):
     def setUp(self):
         super(APITestCase, self).setUp()
         self.api = mock.MagicMock(spec=evelink_api.API)